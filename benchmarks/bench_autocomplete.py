@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش زمان پیشنهاد خودکار اعضا از ایندکس پیشوندی درون‌حافظه
+زمان ساخت اولیه، به‌روزرسانی جزئی پس از ویرایش یک عضو و هر پیشنهاد برای تعداد دلخواه عضو
+
+اجرا: python benchmarks/bench_autocomplete.py [تعداد_اعضا]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+from core.prefix_index import MemberPrefixIndex
+
+FIRST_NAMES = ("علی", "رضا", "محمد", "مریم", "زهرا", "حسین", "فاطمه", "مهدی", "سارا", "امیر")
+LAST_NAMES = ("احمدی", "رضایی", "محمدی", "حسینی", "کریمی", "موسوی", "جعفری", "صادقی", "رحیمی", "نوری")
+QUERIES = ("ع", "علي", "کریم", "مریم نو", "M0012", "0912", "۰۹۳۵۱", "+98919")
+
+def main(members: int = 50000, iterations: int = 200) -> None:
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        with DatabaseManager() as db:
+            db.execute_many(
+                "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+                [
+                    (f"M{i:06d}", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                     f"09{rng.choice((12, 35, 19))}{rng.randrange(10 ** 7):07d}", "1400/01/01")
+                    for i in range(members)
+                ]
+            )
+            start = time.perf_counter()
+            index = MemberPrefixIndex.load(db)
+            built = time.perf_counter() - start
+
+            db.execute_query("UPDATE members SET name = 'نام تازه' WHERE id = 1")
+            start = time.perf_counter()
+            index.refresh(db, [1])
+            partial = time.perf_counter() - start
+            start = time.perf_counter()
+            index.refresh(db)
+            full = time.perf_counter() - start
+        ConnectionPool.close_all()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in QUERIES:
+            index.suggest(text)
+    suggest = (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+    print(f"تعداد اعضا: {members}")
+    print(f"ساخت اولیه:                 {built * 1000:10.1f} میلی‌ثانیه")
+    print(f"به‌روزرسانی یک عضو:          {partial * 1000:10.2f} میلی‌ثانیه")
+    print(f"همگام‌سازی کامل (بدون تغییر): {full * 1000:10.1f} میلی‌ثانیه")
+    print(f"هر پیشنهاد:                 {suggest * 1000:10.3f} میلی‌ثانیه")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
\ No newline at end of file
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش توقف رابط کاربری هنگام به‌روزرسانی کامل پنجره اصلی
+بیشترین فاصله بین تیک‌های یک تایمر ۵ میلی‌ثانیه‌ای (زمان یخ‌زدگی حلقه رویداد) در بارگذاری همزمان
+قبلی و بارگذاری پس‌زمینه با DataLoader، به همراه زمان کل تا نمایش همه داده‌ها
+
+اجرا: python benchmarks/bench_background_refresh.py [تعداد_اعضا]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import date_key
+from core.pool import ConnectionPool
+
+def _populate(members: int, rng: random.Random) -> None:
+    with DatabaseManager() as db:
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+            [(f"M{i:06d}", f"عضو {i}", f"0912{i:07d}", "1399/01/01") for i in range(members)]
+        )
+        rows = []
+        for _ in range(members * 20):
+            date = f"{rng.randint(1399, 1403)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+            rows.append((rng.randint(1, members), date, date_key(date), rng.randint(1, 50) * 100000, "عضویت"))
+        db.execute_many(
+            "INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+class _StallMeter:
+    """بیشترین فاصله بین دو تیک تایمر در حین اجرا"""
+
+    def __init__(self, interval_ms: int = 5):
+        self.worst = 0.0
+        self._last = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start()
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self._last)
+        self._last = now
+
+    def stop(self) -> float:
+        self._timer.stop()
+        return self.worst
+
+def _synchronous(app: QApplication, window) -> tuple:
+    """رفتار قبلی: همه بخش‌ها پشت سر هم در رشته رابط کاربری"""
+    meter = _StallMeter()
+    start = time.perf_counter()
+
+    def run():
+        with DatabaseManager() as db:
+            for part, fetch in window.data_loader._fetchers.items():
+                args = {"transactions": window._transactions_filter(), "loans": window._loans_filter()}.get(part)
+                window._on_data_loaded(part, window.data_loader._generations[part], fetch(db, args))
+
+    QTimer.singleShot(0, run)
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline or not meter.worst:
+        app.processEvents()
+    return time.perf_counter() - start, meter.stop()
+
+def _background(app: QApplication, window) -> tuple:
+    meter = _StallMeter()
+    start = time.perf_counter()
+    window._refresh_all()
+    while window.data_loader.is_busy():
+        app.processEvents()
+    app.processEvents()
+    return time.perf_counter() - start, meter.stop()
+
+def main(members: int = 20000) -> None:
+    rng = random.Random(3)
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        _populate(members, rng)
+        from ui.main_window import MainWindow
+        window = MainWindow()
+        window.data_loader.wait_idle()
+        app.processEvents()
+
+        sync_total, sync_stall = _synchronous(app, window)
+        background_total, background_stall = _background(app, window)
+        window.data_loader.stop()
+        ConnectionPool.close_all()
+
+    print(f"تعداد اعضا: {members}، تعداد تراکنش‌ها: {members * 20}")
+    print(f"همزمان:   کل {sync_total * 1000:8.1f} میلی‌ثانیه، بیشترین توقف رابط {sync_stall * 1000:8.1f} میلی‌ثانیه")
+    print(f"پس‌زمینه: کل {background_total * 1000:8.1f} میلی‌ثانیه، بیشترین توقف رابط {background_stall * 1000:8.1f} میلی‌ثانیه")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
\ No newline at end of file
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش مخزن پشتیبان تکه‌ای (BackupStore)
+حجم نوشته‌شده و زمان نسخه اول، نسخه دوم بدون تغییر و نسخه پس از یک ویرایش کوچک؛
+نسخه بدون تغییر باید تقریباً هیچ بایتی ننویسد و نسخه آخر باید همان دیتابیس را بازسازی کند.
+
+اجرا: python benchmarks/bench_backup_store.py [تعداد_تراکنش]
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.backup_store import BackupStore
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+
+def _populate(count: int) -> None:
+    with DatabaseManager() as db:
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, join_date) VALUES (?, ?, ?)",
+            [(f"M{i:05d}", f"عضو {i}", "1399/01/01") for i in range(1000)]
+        )
+        db.execute_many(
+            "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, '1402/01/01', ?, 'عضویت')",
+            [(i % 1000 + 1, (i % 50 + 1) * 100000) for i in range(count)]
+        )
+
+def _print(title: str, info) -> None:
+    print(
+        f"{title}: {info.chunks} تکه، {info.new_chunks} تکه جدید، "
+        f"{info.stored_bytes / 1024:10.1f} کیلوبایت نوشته شد از {info.size_bytes / 1024:.1f} کیلوبایت، "
+        f"{info.seconds * 1000:8.1f} میلی‌ثانیه"
+    )
+
+def main(count: int = 200000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        _populate(count)
+        store = BackupStore(Path(tmp) / "store", codec="zlib")
+        with DatabaseManager() as db:
+            first = store.snapshot(db.conn)
+            unchanged = store.snapshot(db.conn)
+            db.execute_query("UPDATE members SET phone = '09120000000' WHERE id = 1")
+            edited = store.snapshot(db.conn)
+            expected = db.execute_query("SELECT COUNT(*), SUM(amount) FROM transactions", fetch=True)[0]
+        leftovers = [path.name for path in (Path(tmp) / "store").glob("*.tmp")]
+
+        restored = store.restore(edited.name, Path(tmp) / "restored.db")
+        conn = sqlite3.connect(str(restored))
+        actual = conn.execute("SELECT COUNT(*), SUM(amount) FROM transactions").fetchone()
+        phone = conn.execute("SELECT phone FROM members WHERE id = 1").fetchone()[0]
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        conn.close()
+        ConnectionPool.close_all()
+
+    _print("نسخه اول        ", first)
+    _print("نسخه بدون تغییر ", unchanged)
+    _print("پس از یک ویرایش ", edited)
+    # نسخه بدون تغییر حداکثر تکه هدر را دوباره می‌نویسد و هیچ فایل موقت کاملی ساخته نمی‌شود
+    assert unchanged.new_chunks <= 1 and unchanged.stored_bytes < first.stored_bytes / 100, unchanged
+    assert edited.new_chunks < edited.chunks / 10, edited
+    assert not leftovers, leftovers
+    assert tuple(actual) == tuple(expected) and phone == "09120000000" and integrity == "ok"
+    print("بازسازی آخرین نسخه: سالم")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
\ No newline at end of file
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش هزینه به‌روزرسانی پنجره اصلی پس از ذخیره تراکنش‌های یک عضو
+مقایسه بارگذاری دوباره همه بخش‌ها با به‌روزرسانی هدفمند از روی رویداد ChangeBus
+
+اجرا: python benchmarks/bench_change_bus.py [تعداد_اعضا]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from core.changes import transactions_changed
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import key_from_jalali
+from core.pool import ConnectionPool
+
+def _populate(members: int) -> None:
+    with DatabaseManager() as db:
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+            [(f"M{i:06d}", f"عضو {i}", f"0912{i:07d}", "1399/01/01") for i in range(members)]
+        )
+        db.execute_many(
+            "INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, 'عضویت')",
+            [(i % members + 1, "1402/05/01", key_from_jalali(1402, 5), 1000000) for i in range(members * 5)]
+        )
+
+def _full(app: QApplication, window) -> float:
+    """رفتار قبلی: همه بخش‌ها دوباره خوانده و اعمال می‌شوند"""
+    start = time.perf_counter()
+    window._refresh_all()
+    window.data_loader.wait_idle()
+    app.processEvents()
+    return time.perf_counter() - start
+
+def _targeted(app: QApplication, window, rounds: int = 20) -> float:
+    start = time.perf_counter()
+    for member_id in range(1, rounds + 1):
+        with DatabaseManager() as db:
+            db.execute_query(
+                "INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, 'عضویت')",
+                (member_id, "1402/06/01", key_from_jalali(1402, 6), 500000)
+            )
+        window._on_changes([transactions_changed(member_id, "1402")])
+        window.data_loader.wait_idle()
+        app.processEvents()
+    return (time.perf_counter() - start) / rounds
+
+def main(members: int = 20000) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        _populate(members)
+        from ui.main_window import MainWindow
+        window = MainWindow()
+        window.data_loader.wait_idle()
+        app.processEvents()
+
+        full = _full(app, window)
+        targeted = _targeted(app, window)
+        window.data_loader.stop()
+        ConnectionPool.close_all()
+
+    print(f"تعداد اعضا: {members}")
+    print(f"بارگذاری دوباره همه بخش‌ها: {full * 1000:10.1f} میلی‌ثانیه")
+    print(f"به‌روزرسانی هدفمند:        {targeted * 1000:10.1f} میلی‌ثانیه")
+    print(f"بهبود: {full / targeted:.1f} برابر")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
\ No newline at end of file
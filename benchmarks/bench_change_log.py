@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش change_log: هزینه تریگرهای ثبت تغییرات در درج انبوه تراکنش‌ها و هزینه پرسیدن
+«تغییرات بعد از seq N» در مقایسه با خواندن دوباره کل فهرست اعضا برای پیدا کردن تغییرات
+
+اجرا: python benchmarks/bench_change_log.py [تعداد_اعضا]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import date_key
+from core.pool import ConnectionPool
+
+def _insert(members: int, with_log: bool) -> float:
+    """زمان درج تراکنش‌ها (۱۰ برای هر عضو) با یا بدون تریگرهای change_log"""
+    with DatabaseManager() as db:
+        if not with_log:
+            triggers = db.execute_query(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg^_%^_log^_%' ESCAPE '^'", fetch=True
+            )
+            for (name,) in triggers:
+                db.execute_query(f"DROP TRIGGER {name}")
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+            [(f"M{i:06d}", f"عضو {i}", f"0912{i:07d}", "1399/01/01") for i in range(members)]
+        )
+        # مانند برنامه، کلید تاریخ همراه ردیف نوشته می‌شود
+        dates = [f"140{i % 4}/0{i % 9 + 1}/01" for i in range(36)]
+        rows = [(i % members + 1, dates[i % 36], date_key(dates[i % 36]), 100000, "عضویت") for i in range(members * 10)]
+        start = time.perf_counter()
+        db.execute_many("INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, ?)", rows)
+        return time.perf_counter() - start
+
+def _poll(rounds: int = 200) -> tuple:
+    """پس از ده ویرایش: خواندن تغییرات از change_log در برابر خواندن دوباره همه اعضا"""
+    from ui.main_window import MainWindow
+    with DatabaseManager() as db:
+        seq = db.latest_change_seq()
+        for member_id in range(1, 11):
+            db.execute_query("UPDATE transactions SET amount = amount + 1 WHERE id = ?", (member_id,))
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            _, changes = db.get_changes_since(seq)
+        incremental = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(5):
+            db.execute_query(MainWindow.MEMBERS_QUERY, fetch=True)
+        full = (time.perf_counter() - start) / 5
+    return len(changes), incremental, full
+
+def _check_compaction() -> None:
+    """فشرده‌سازی بدون مصرف‌کننده چیزی حذف نمی‌کند و با مصرف‌کننده فقط تا جایگاه کندترین آن‌ها پیش می‌رود"""
+    with DatabaseManager() as db:
+        db.execute_query("DELETE FROM change_log_consumers")
+        before = db.execute_query("SELECT COUNT(*) FROM change_log", fetch=True)[0][0]
+        assert db.compact_change_log() == 0, "فشرده‌سازی بدون مصرف‌کننده ردیف حذف کرد"
+        assert db.execute_query("SELECT COUNT(*) FROM change_log", fetch=True)[0][0] == before
+
+        floor = db.latest_change_seq() - 5
+        db.register_change_consumer("bench-slow", floor)
+        db.register_change_consumer("bench-fast")
+        db.compact_change_log()
+        remaining = db.execute_query("SELECT MIN(seq), COUNT(*) FROM change_log", fetch=True)[0]
+        assert remaining == (floor + 1, 5), remaining
+        db.execute_query("DELETE FROM change_log_consumers")
+
+def main(members: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "plain.db")
+        plain = _insert(members, with_log=False)
+        ConnectionPool.close_all()
+
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "logged.db")
+        logged = _insert(members, with_log=True)
+        count, incremental, full = _poll()
+        _check_compaction()
+        with DatabaseManager() as db:
+            log_rows = db.execute_query("SELECT COUNT(*) FROM change_log", fetch=True)[0][0]
+        ConnectionPool.close_all()
+
+    print(f"تعداد اعضا: {members}، تعداد تراکنش‌ها: {members * 10}، ردیف‌های change_log: {log_rows}")
+    print(f"درج بدون change_log:   {plain * 1000:10.1f} میلی‌ثانیه")
+    print(f"درج با change_log:     {logged * 1000:10.1f} میلی‌ثانیه ({(logged / plain - 1) * 100:+.0f}٪)")
+    print(f"تغییرات بعد از seq:   {incremental * 1000:10.3f} میلی‌ثانیه ({count} تغییر)")
+    print(f"خواندن دوباره اعضا:   {full * 1000:10.1f} میلی‌ثانیه")
+    print(f"بهبود: {full / incremental:.0f} برابر")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
\ No newline at end of file
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش هزینه هر بار گرفتن DatabaseManager
+مقایسه روش قدیمی (اتصال تازه + آماده‌سازی کامل ساختار) با استخر اتصال اشتراکی
+
+اجرا: python benchmarks/bench_connection.py [تعداد_تکرار]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+
+def _legacy_call() -> None:
+    """شبیه‌سازی رفتار قبلی: اتصال جدید و اجرای کامل آماده‌سازی در هر فراخوانی"""
+    ConnectionPool.close_all()
+    with DatabaseManager() as db:
+        db.get_setting("share_price", "2000000")
+
+def _pooled_call() -> None:
+    with DatabaseManager() as db:
+        db.get_setting("share_price", "2000000")
+
+def _measure(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+def main(iterations: int = 500) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        _pooled_call()  # ساخت اولیه دیتابیس
+
+        legacy = _measure(_legacy_call, iterations)
+        ConnectionPool.close_all()
+        _pooled_call()
+        pooled = _measure(_pooled_call, iterations)
+        ConnectionPool.close_all()
+
+    print(f"تعداد تکرار: {iterations}")
+    print(f"روش قدیمی:  {legacy * 1e6:10.1f} میکروثانیه در هر فراخوانی")
+    print(f"استخر اتصال: {pooled * 1e6:10.1f} میکروثانیه در هر فراخوانی")
+    print(f"بهبود: {legacy / pooled:.1f} برابر")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
\ No newline at end of file
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش زمان بررسی اقساط معوق کل صندوق
+ساخت صندوق آزمایشی با تعداد دلخواه عضو، وام‌های فعال با شروع‌های مختلف و پرداخت ناقص اقساط،
+سپس اندازه‌گیری scan_delinquency
+
+اجرا: python benchmarks/bench_delinquency.py [تعداد_اعضا]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import add_months, format_key, key_today
+from core.delinquency import scan_delinquency
+from core.pool import ConnectionPool
+
+def _populate(db: DatabaseManager, members: int, rng: random.Random) -> None:
+    """درج گروهی اعضا، وام‌ها (برای حدود ۶۰٪ اعضا) و اقساط پرداخت‌شده"""
+    today = key_today()
+    with db.transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+            [(f"M{i:06d}", f"عضو {i}", f"0912{i:07d}", "1400/01/01") for i in range(1, members + 1)]
+        )
+        loans = []
+        for member_id in range(1, members + 1):
+            if rng.random() < 0.6:
+                installments = rng.choice((10, 12, 20, 24))
+                start = format_key(add_months(today, -rng.randint(1, installments)))
+                amount = 1_000_000 * rng.randint(5, 50)
+                loans.append((member_id, amount, start, installments, -(-amount // installments)))
+        cursor.executemany(
+            "INSERT INTO loans (member_id, amount, start_date, installments, monthly_payment) VALUES (?, ?, ?, ?, ?)",
+            loans
+        )
+
+        payments = []
+        for loan_id, member_id, amount, installments, start_key in cursor.execute(
+            "SELECT id, member_id, amount, installments, start_date_key FROM loans"
+        ).fetchall():
+            due = sum(1 for seq in range(1, installments + 1) if add_months(start_key, seq) < today)
+            # بیشتر وام‌ها به‌روز هستند؛ بقیه یک تا چند قسط عقب افتاده‌اند
+            paid = due if rng.random() < 0.7 else max(0, due - rng.randint(1, 4))
+            payment = -(-amount // installments)
+            payments.extend((member_id, start_key, payment) for _ in range(paid))
+        cursor.executemany(
+            "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, ?, ?, 'پرداخت')",
+            [(member_id, format_key(key), amount) for member_id, key, amount in payments]
+        )
+
+def main(members: int = 10000, iterations: int = 5) -> None:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        with DatabaseManager() as db:
+            start = time.perf_counter()
+            _populate(db, members, rng)
+            populated = time.perf_counter() - start
+
+            report = scan_delinquency(db)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                scan_delinquency(db)
+            elapsed = (time.perf_counter() - start) / iterations
+        ConnectionPool.close_all()
+
+    print(f"تعداد اعضا: {members} (ساخت داده: {populated:.1f} ثانیه)")
+    print(f"اعضای دارای معوقه: {len(report)}، اقساط معوق: {sum(r.installments for r in report)}")
+    print(f"زمان بررسی: {elapsed * 1000:10.1f} میلی‌ثانیه در هر اجرا")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
\ No newline at end of file
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش زمان باز کردن تب تراکنش‌ها روی دفتر چندساله
+مقایسه روش قبلی (خواندن همه ردیف‌ها و ساختن QTreeWidgetItem برای هر کدام) با مدل صفحه‌ای و صفحه‌بندی کلیدی
+
+اجرا: python benchmarks/bench_ledger_pages.py [تعداد_تراکنش]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QTableView, QTreeWidget, QTreeWidgetItem
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import date_key
+from core.pool import ConnectionPool
+from core.utils import format_persian_number, get_persian_date
+from ui.models import TransactionTableModel
+
+TYPES = ("عضویت", "پرداخت", "وام")
+
+def _legacy(app: QApplication, start_key: int, end_key: int) -> float:
+    """رفتار قبلی _load_transactions"""
+    start = time.perf_counter()
+    tree = QTreeWidget()
+    tree.setColumnCount(6)
+    with DatabaseManager() as db:
+        rows = db.execute_query(
+            """SELECT t.id, t.date, m.name, t.amount, t.type, t.description
+            FROM transactions t JOIN members m ON t.member_id = m.id
+            WHERE t.date_key BETWEEN ? AND ? ORDER BY t.id DESC""",
+            (start_key, end_key), fetch=True
+        )
+    for idx, row in enumerate(rows, 1):
+        item = QTreeWidgetItem(tree)
+        item.setText(0, str(idx))
+        item.setText(1, get_persian_date(row[1]))
+        item.setText(2, row[2])
+        item.setText(3, format_persian_number(str(row[3])))
+        item.setText(4, row[4])
+        item.setText(5, row[5] or "-")
+    tree.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    tree.deleteLater()
+    return elapsed
+
+def _paged(app: QApplication, start_key: int, end_key: int) -> tuple:
+    start = time.perf_counter()
+    model = TransactionTableModel()
+    view = QTableView()
+    view.setModel(model)
+    model.set_filter(start_key, end_key)
+    view.show()
+    app.processEvents()
+    opened = time.perf_counter() - start
+
+    # پیمایش تا انتهای جدول: هر صفحه مستقل از عمق آن خوانده می‌شود
+    start = time.perf_counter()
+    pages = 0
+    while model.canFetchMore() and pages < 50:
+        model.fetchMore()
+        pages += 1
+    per_page = (time.perf_counter() - start) / max(pages, 1)
+    view.deleteLater()
+    return opened, per_page
+
+def main(count: int = 200000) -> None:
+    rng = random.Random(5)
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        with DatabaseManager() as db:
+            db.execute_many(
+                "INSERT INTO members (membership_code, name, join_date) VALUES (?, ?, ?)",
+                [(f"M{i:05d}", f"عضو {i}", "1398/01/01") for i in range(500)]
+            )
+            rows = []
+            for _ in range(count):
+                date = f"{rng.randint(1398, 1403)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+                rows.append((rng.randint(1, 500), date, date_key(date), rng.randint(1, 50) * 100000, rng.choice(TYPES)))
+            db.execute_many(
+                "INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, ?)", rows
+            )
+        start_key, end_key = date_key("1398/01/01"), date_key("1403/12/29")
+        legacy = _legacy(app, start_key, end_key)
+        opened, per_page = _paged(app, start_key, end_key)
+        ConnectionPool.close_all()
+
+    print(f"تعداد تراکنش‌ها: {count}")
+    print(f"روش قبلی:            {legacy * 1000:10.1f} میلی‌ثانیه")
+    print(f"مدل صفحه‌ای (باز کردن): {opened * 1000:10.1f} میلی‌ثانیه")
+    print(f"هر صفحه بعدی:         {per_page * 1000:10.1f} میلی‌ثانیه")
+    print(f"بهبود: {legacy / opened:.1f} برابر")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
\ No newline at end of file
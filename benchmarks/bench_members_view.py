@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش زمان نمایش فهرست اعضا
+مقایسه روش قبلی (QTreeWidgetItem و QPushButton برای هر ردیف) با مدل ستونی و QTableView
+
+اجرا: python benchmarks/bench_members_view.py [تعداد_اعضا]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QPushButton, QTableView, QTreeWidget, QTreeWidgetItem
+
+from core.utils import format_persian_number, get_persian_date
+from ui.models import ButtonDelegate, MemberFilterProxy, MemberTableModel
+
+def _rows(count: int):
+    return [
+        (i, f"عضو {i}", f"M{i:06d}", f"0912{i:07d}", None, "2024-03-20", "فعال" if i % 7 else "غیرفعال", 4000000 * (i % 50))
+        for i in range(1, count + 1)
+    ]
+
+def _legacy(app: QApplication, rows, share_price: int) -> float:
+    """رفتار قبلی _load_members"""
+    start = time.perf_counter()
+    tree = QTreeWidget()
+    tree.setColumnCount(9)
+    for idx, member in enumerate(rows, 1):
+        item = QTreeWidgetItem(tree)
+        item.setText(0, str(idx))
+        item.setText(1, member[1])
+        item.setText(2, member[2])
+        item.setText(3, member[3] or "-")
+        item.setText(4, member[4] or "-")
+        item.setText(5, get_persian_date(member[5]))
+        item.setText(6, member[6])
+        item.setText(7, format_persian_number(str(member[7] / share_price)))
+        item.setData(0, Qt.UserRole, member[0])
+        tree.setItemWidget(item, 8, QPushButton("✏️"))
+    tree.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    tree.deleteLater()
+    return elapsed
+
+def _model(app: QApplication, rows, share_price: int) -> float:
+    start = time.perf_counter()
+    model = MemberTableModel()
+    proxy = MemberFilterProxy()
+    proxy.setSourceModel(model)
+    view = QTableView()
+    view.setModel(proxy)
+    view.setItemDelegateForColumn(MemberTableModel.EDIT_COLUMN, ButtonDelegate("✏️"))
+    model.set_members(rows, share_price)
+    view.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    view.deleteLater()
+    return elapsed
+
+def main(count: int = 5000) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    rows = _rows(count)
+    legacy = _legacy(app, rows, 2000000)
+    model = _model(app, rows, 2000000)
+    print(f"تعداد اعضا: {count}")
+    print(f"روش قبلی:   {legacy * 1000:10.1f} میلی‌ثانیه")
+    print(f"مدل ستونی:  {model * 1000:10.1f} میلی‌ثانیه")
+    print(f"بهبود: {legacy / model:.1f} برابر")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
\ No newline at end of file
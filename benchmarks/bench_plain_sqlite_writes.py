@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+هزینه تریگرها در نوشتن برنامه (کلیدها همراه ردیف) و درستی نوشتن از اتصال sqlite3 ساده
+هیچ تریگری نباید date_key، normalize_text یا normalize_phone را صدا بزند؛ درج، ویرایش و حذف از اتصال
+ساده (بدون کلید) باید کلید تاریخ، جمع‌های اعضا، جدول ماهانه، کلیدهای جستجو، جدول اقساط وام‌ها و change_log
+را درست نگه دارد.
+
+اجرا: python benchmarks/bench_plain_sqlite_writes.py [تعداد_تراکنش]
+"""
+
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.dates import date_key
+from core.loan_schedule import build_schedule
+from core.normalize import normalize_phone, normalize_text
+from core.pool import ConnectionPool
+from core.search import member_keys
+
+_PYTHON_FUNCTION = re.compile(r"\b(date_key|normalize_text|normalize_phone)\s*\(")
+
+DATES = ("1403/05/01", "1403/7/9", "۱۴۰۲/۱۲/۲۹", "2024-05-05", " 2025/01/01", "1403/11", "تاریخ نامعتبر")
+TYPES = ("عضویت", "وام", "پرداخت")
+
+def _plain_writes(path: str, count: int) -> float:
+    """نوشتن با sqlite3 ساده؛ زمان درج تراکنش‌ها را برمی‌گرداند"""
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executemany(
+        "INSERT INTO members (membership_code, name, family_name, phone, join_date) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("M9001", "علي‌رضا", "كريمی", "+98 912 ۱۲۳ ۴۵۶۷", "1403/01/01"),
+            ("M9002", "  Sara  ", None, "0912-765-4321", "2024-03-20"),
+        ]
+    )
+    member_ids = [row[0] for row in conn.execute("SELECT id FROM members WHERE membership_code IN ('M9001', 'M9002') ORDER BY id")]
+    conn.execute(
+        "INSERT INTO loans (member_id, amount, start_date, installments, monthly_payment) VALUES (?, 1200000, '1403/01/01', 12, 100000)",
+        (member_ids[0],)
+    )
+    conn.execute("INSERT INTO notes (member_id, date, note) VALUES (?, '1403/05/02', 'يادداشت آزمايشی')", (member_ids[0],))
+    start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, ?, ?, ?)",
+        [
+            (rng.choice(member_ids), rng.choice(DATES), rng.randint(1, 50) * 10000, rng.choice(TYPES))
+            for _ in range(count)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+    conn.execute("UPDATE transactions SET date = '2024-09-30' WHERE id % 7 = 0")
+    conn.execute("UPDATE transactions SET amount = amount + 1, type = 'عضویت' WHERE id % 11 = 0")
+    conn.execute("DELETE FROM transactions WHERE id % 13 = 0")
+    conn.execute("UPDATE members SET name = 'عليرضا', phone = '00989121110000' WHERE id = ?", (member_ids[0],))
+    conn.execute("UPDATE notes SET date = '2024-10-01'")
+    conn.execute(
+        "INSERT INTO loans (member_id, amount, start_date, installments, monthly_payment) VALUES (?, 1000001, '1403/06/31', 7, 142858)",
+        (member_ids[1],)
+    )
+    conn.execute("UPDATE loans SET amount = 900000, installments = 9 WHERE start_date = '1403/01/01'")
+    conn.commit()
+    conn.close()
+    return elapsed
+
+def _timed(label: str, count: int, action) -> None:
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed * 1000:.1f} میلی‌ثانیه ({elapsed / count * 1e6:.1f} میکروثانیه برای هر ردیف)")
+
+def _keyed_writes(db: DatabaseManager, count: int) -> None:
+    """نوشتن مانند DatabaseManager: کلید تاریخ و کلیدهای عضو همراه ردیف"""
+    rng = random.Random(3)
+    members = [
+        (f"K{i:05d}", f"عضو {i}", f"0912{i:07d}", "1400/01/01", *member_keys(f"عضو {i}", None, f"K{i:05d}", f"0912{i:07d}").values())
+        for i in range(count // 5)
+    ]
+    _timed(f"درج {len(members)} عضو با کلید", len(members), lambda: db.execute_many(
+        "INSERT INTO members (membership_code, name, phone, join_date, name_key, code_key, phone_key, account_key) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", members
+    ))
+    ids = [row[0] for row in db.execute_query("SELECT id FROM members WHERE membership_code LIKE 'K%'", fetch=True)]
+    dates = [f"140{rng.randint(0, 3)}/{rng.randint(1, 12):02d}/{rng.randint(1, 29):02d}" for _ in range(count)]
+    rows = [(rng.choice(ids), date, date_key(date), rng.randint(1, 50) * 10000, rng.choice(TYPES)) for date in dates]
+    _timed(f"درج {count} تراکنش با کلید", count, lambda: db.execute_many(
+        "INSERT INTO transactions (member_id, date, date_key, amount, type) VALUES (?, ?, ?, ?, ?)", rows
+    ))
+    tx_ids = [row[0] for row in db.execute_query("SELECT id FROM transactions ORDER BY id DESC LIMIT ?", (count,), fetch=True)]
+    changed = rng.sample(tx_ids, len(members))
+    _timed(f"ویرایش تاریخ و مبلغ {len(changed)} تراکنش", len(changed), lambda: db.execute_many(
+        "UPDATE transactions SET date = ?, date_key = ?, amount = amount + 1 WHERE id = ?",
+        [("1403/02/02", date_key("1403/02/02"), tx_id) for tx_id in changed]
+    ))
+    _timed(f"حذف {len(changed)} تراکنش", len(changed), lambda: db.execute_many(
+        "DELETE FROM transactions WHERE id = ?", [(tx_id,) for tx_id in changed]
+    ))
+
+def main(count: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        with DatabaseManager() as db:
+            triggers = db.execute_query("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'", fetch=True)
+            _keyed_writes(db, count // 2)
+        ConnectionPool.close_all()
+        calling = [name for name, sql in triggers if _PYTHON_FUNCTION.search(sql)]
+
+        elapsed = _plain_writes(DatabaseConfig.CONFIG["path"], count)
+
+        with DatabaseManager() as db:
+            wrong_keys = [
+                (text, key) for table in ("transactions", "notes") for text, key in db.execute_query(
+                    f"SELECT DISTINCT date, date_key FROM {table}", fetch=True
+                ) if key != date_key(text)
+            ]
+            wrong_members = [
+                row for row in db.execute_query(
+                    "SELECT name, family_name, phone, name_key, phone_key FROM members", fetch=True
+                )
+                if row[3] != normalize_text(f"{row[0]} {row[1] or ''}") or row[4] != normalize_phone(row[2])
+            ]
+            mismatched_totals = db.verify_member_totals(repair=False)
+            monthly = db.execute_query("SELECT * FROM transaction_monthly ORDER BY 1, 2, 3, 4", fetch=True)
+            db.rebuild_monthly_rollup()
+            rebuilt = db.execute_query("SELECT * FROM transaction_monthly ORDER BY 1, 2, 3, 4", fetch=True)
+            # جدول اقساط ساخته‌شده در تریگر باید با محاسبه پایتونی (seq, due_key, expected, paid) یکی باشد
+            schedules = [
+                (db.get_loan_schedule(loan[0]), [(row[1], row[2], row[3], row[5]) for row in build_schedule(*loan)])
+                for loan in db.execute_query(
+                    "SELECT id, amount, installments, start_date_key, paid_amount FROM loans", fetch=True
+                )
+            ]
+            incomplete_loans = db.verify_loan_schedule(repair=False)
+            found = db.search_members("علیرضا کریمی") + db.search_members("09121110000")
+            db.execute_query("CREATE INDEX bench_change_log_row ON change_log(table_name, row_id)")
+            # هر تراکنش باید با سال فعلی خود (یا بدون سال، یعنی همه سال‌ها) در change_log ثبت شده باشد
+            wrong_years = db.execute_query(
+                "SELECT COUNT(*) FROM transactions t WHERE NOT EXISTS ("
+                "SELECT 1 FROM change_log c WHERE c.table_name = 'transactions' AND c.row_id = t.id "
+                "AND (c.year IS NULL OR c.year = t.date_key / 10000))",
+                fetch=True
+            )[0][0]
+        ConnectionPool.close_all()
+
+    print(f"تریگرها: {len(triggers)}، تریگر وابسته به تابع پایتونی: {len(calling)}")
+    print(f"درج {count} تراکنش از اتصال ساده: {elapsed * 1000:.1f} میلی‌ثانیه ({elapsed / count * 1e6:.1f} میکروثانیه برای هر ردیف)")
+    print(f"کلید تاریخ نادرست: {len(wrong_keys)}، کلید جستجوی نادرست: {len(wrong_members)}، جمع ناهمخوان: {len(mismatched_totals)}")
+    assert not calling, calling
+    assert not wrong_keys and not wrong_members and not mismatched_totals, (wrong_keys, wrong_members, mismatched_totals)
+    assert monthly == rebuilt, "جدول ماهانه با بازسازی کامل همخوان نیست"
+    assert len(found) == 2 and found[0] == found[1], found
+    assert wrong_years == 0, wrong_years
+    assert len(schedules) == 2 and all(stored == expected for stored, expected in schedules), schedules
+    assert not incomplete_loans, incomplete_loans
+    print("نوشتن از اتصال ساده: سالم")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
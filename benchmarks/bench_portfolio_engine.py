@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش و مقایسه PortfolioEngine با مسیر تک‌عضوی
+سهام و سقف وام همه اعضا با یک بارگذاری موتور، در برابر calculate_member_shares و
+calculate_loan_capacity برای تک‌تک اعضا (مسیر تب عضو) و یک محاسبه مرجع با SQL ساده؛
+قیمت پایه تنظیمات عمداً با قیمت ماه جاری تاریخچه فرق دارد و نتیجه‌ها باید دقیقاً برابر باشند.
+
+اجرا: python benchmarks/bench_portfolio_engine.py [تعداد_اعضا]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.analytics import PortfolioEngine
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+from core.utils import calculate_loan_capacity, calculate_member_shares
+
+def _populate(members: int) -> None:
+    with DatabaseManager() as db:
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, join_date) VALUES (?, ?, ?)",
+            [(f"M{i:05d}", f"عضو {i}", "1399/01/01") for i in range(members)]
+        )
+        db.execute_many(
+            "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, ?, ?, 'عضویت')",
+            [(i % members + 1, f"140{i % 5}/0{i % 9 + 1}/01", (i % 37 + 1) * 700000) for i in range(members * 4)]
+        )
+        # قیمت پایه با قیمت ماه جاری تاریخچه (با افزایش ماهانه) متفاوت است
+        db.set_share_price_schedule(1000000, 40000, "1403/01/01")
+        db.set_setting("share_price", 1000000, "قیمت پایه سهام")
+        for member_id in range(1, members + 1, 7):
+            db.add_loan(member_id, (member_id % 5 + 1) * 3000000, 12, "1404/02/01")
+
+def _reference(db: DatabaseManager, member_id: int) -> tuple:
+    """قاعده مستند: سهام کامل = جمع عضویت // قیمت ماه جاری؛ سقف = سهام × قیمت × ضریب − وام‌های فعال"""
+    price = db.get_share_price()
+    membership = db.get_member_totals(member_id)["membership"]
+    whole = membership // price
+    active = db.execute_query(
+        "SELECT COALESCE(SUM(amount), 0) FROM loans WHERE member_id=? AND status='فعال' AND installments > 0",
+        (member_id,), fetch=True
+    )[0][0]
+    return whole, max(0, whole * price * int(db.get_setting("loan_factor", 2.0, float)) - active)
+
+def main(members: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        _populate(members)
+        with DatabaseManager() as db:
+            start = time.perf_counter()
+            engine = PortfolioEngine.load(db)
+            vectorized = time.perf_counter() - start
+            expected = {member_id: _reference(db, member_id) for member_id in range(1, members + 1)}
+
+        start = time.perf_counter()
+        single = {
+            member_id: (calculate_member_shares(member_id)[0], calculate_loan_capacity(member_id))
+            for member_id in range(1, members + 1)
+        }
+        per_member = time.perf_counter() - start
+        ConnectionPool.close_all()
+
+    batch = {
+        member_id: (int(whole), int(capacity))
+        for member_id, whole, capacity in zip(engine.member_ids.tolist(), engine.whole_shares, engine.capacity)
+    }
+    mismatched = [member_id for member_id in expected if not expected[member_id] == batch[member_id] == single[member_id]]
+    print(f"تعداد اعضا: {members}، قیمت سهم ماه جاری: {engine.share_price}")
+    print(f"موتور برای همه اعضا: {vectorized * 1000:10.1f} میلی‌ثانیه")
+    print(f"مسیر تک‌عضوی:       {per_member * 1000:10.1f} میلی‌ثانیه")
+    print(f"اختلاف با محاسبه مرجع: {len(mismatched)} عضو")
+    assert engine.share_price != 1000000, "قیمت ماه جاری باید با قیمت پایه فرق کند"
+    assert not mismatched, [(m, expected[m], batch[m], single[m]) for m in mismatched[:5]]
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
\ No newline at end of file
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش هزینه ساخت گزارش اعضا به ازای تعداد اعضا
+مقایسه روش قبلی (یک کوئری اعضا و سه SUM برای هر عضو، یعنی 3N+1 دستور) با تصویر گزارش
+(ReportSnapshot، یک کوئری) و به‌روزرسانی یک عضو با اعمال اختلاف به جمع‌ها
+
+اجرا: python benchmarks/bench_report_snapshot.py [تعداد_اعضا ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+from core.utils import format_persian_number
+
+TYPES = ("عضویت", "وام", "پرداخت")
+
+def _populate(members: int) -> None:
+    with DatabaseManager() as db:
+        db.execute_many(
+            "INSERT INTO members (membership_code, name, join_date) VALUES (?, ?, ?)",
+            [(f"M{i:06d}", f"عضو {i}", "1399/01/01") for i in range(members)]
+        )
+        db.execute_many(
+            "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, '1402/01/01', ?, ?)",
+            [(i % members + 1, (i % 40 + 1) * 500000, TYPES[i % 3]) for i in range(members * 6)]
+        )
+
+def _legacy(db: DatabaseManager) -> float:
+    """رفتار قبلی load_data بدون ساختن ویجت‌ها"""
+    start = time.perf_counter()
+    totals = [0, 0, 0]
+    for member_id, name, code in db.execute_query("SELECT id, name, membership_code FROM members", fetch=True):
+        sums = [
+            db.execute_query(
+                "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type=?",
+                (member_id, type_), fetch=True
+            )[0][0]
+            for type_ in TYPES
+        ]
+        for value in (sums[0], max(0, sums[1] - sums[2]), sums[2]):
+            format_persian_number(str(value))
+        totals = [total + value for total, value in zip(totals, sums)]
+    return time.perf_counter() - start
+
+def _measure(members: int) -> tuple:
+    from ui.report_tab import ReportTab
+    _populate(members)
+    with DatabaseManager() as db:
+        legacy = _legacy(db)
+
+        start = time.perf_counter()
+        report = ReportTab.fetch_report(db)
+        snapshot = time.perf_counter() - start
+
+        tab = ReportTab()
+        tab.show_report(report)
+        start = time.perf_counter()
+        for member_id in range(1, 21):
+            db.execute_query(
+                "INSERT INTO transactions (member_id, date, amount, type) VALUES (?, '1402/02/01', 100000, 'عضویت')",
+                (member_id,)
+            )
+            tab.update_members(db, [member_id])
+        delta = (time.perf_counter() - start) / 20
+        tab.deleteLater()
+    return legacy, snapshot, delta
+
+def main(sizes=(1000, 5000, 20000)) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'اعضا':>8} {'روش قبلی':>12} {'تصویر گزارش':>12} {'تغییر یک عضو':>12}  (میلی‌ثانیه)")
+    for members in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+            legacy, snapshot, delta = _measure(members)
+            ConnectionPool.close_all()
+        print(f"{members:>8} {legacy * 1000:>12.1f} {snapshot * 1000:>12.1f} {delta * 1000:>12.2f}")
+        app.processEvents()
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or (1000, 5000, 20000))
\ No newline at end of file
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش زمان جستجوی اعضا با افزایش تعداد اعضا
+مقایسه جستجوی قبلی (LIKE '%x%' روی سه ستون) با ایندکس متنی members_fts
+
+اجرا: python benchmarks/bench_search.py [تعداد_تکرار]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+from core.search import match_expression, SEARCH_LIMIT
+
+SIZES = (1000, 10000, 50000)
+FIRST_NAMES = ("علی", "رضا", "محمد", "مریم", "زهرا", "حسین", "فاطمه", "مهدی", "سارا", "امیر")
+LAST_NAMES = ("احمدی", "رضایی", "محمدی", "حسینی", "کریمی", "موسوی", "جعفری", "صادقی", "رحیمی", "نوری")
+QUERIES = ("M000123", "M0042", "09121", "مریم نور", "علی کریمی")
+
+def _like_search(db: DatabaseManager, text: str) -> int:
+    pattern = f"%{text}%"
+    return len(db.execute_query(
+        "SELECT id FROM members WHERE name LIKE ? OR membership_code LIKE ? OR phone LIKE ? ORDER BY join_date DESC",
+        (pattern, pattern, pattern), fetch=True
+    ))
+
+def _fts_search(db: DatabaseManager, text: str) -> int:
+    return len(db.execute_query(
+        "SELECT rowid FROM members_fts WHERE members_fts MATCH ? ORDER BY rank LIMIT ?",
+        (match_expression(text), SEARCH_LIMIT), fetch=True
+    ))
+
+def _measure(func, db: DatabaseManager, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in QUERIES:
+            func(db, text)
+    return (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+def main(iterations: int = 20) -> None:
+    rng = random.Random(7)
+    print(f"{'اعضا':>8} {'LIKE (ms)':>12} {'FTS5 (ms)':>12}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+            with DatabaseManager() as db:
+                db.execute_many(
+                    "INSERT INTO members (membership_code, name, phone, join_date) VALUES (?, ?, ?, ?)",
+                    [
+                        (f"M{i:06d}", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                         f"09{rng.choice((12, 35, 19))}{rng.randrange(10 ** 7):07d}", "1400/01/01")
+                        for i in range(size)
+                    ]
+                )
+                like = _measure(_like_search, db, iterations)
+                fts = _measure(_fts_search, db, iterations)
+            ConnectionPool.close_all()
+        print(f"{size:>8} {like * 1000:12.2f} {fts * 1000:12.2f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
\ No newline at end of file
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+سنجش هزینه خواندن تنظیمات
+مقایسه کوئری مستقیم روی جدول settings با خواندن از حافظه موقت DatabaseManager (بیرون و داخل batch)،
+و بررسی اینکه تغییر تنظیم از اتصال دیگر در خواندن بعدی همان نمونه دیده می‌شود
+
+اجرا: python benchmarks/bench_settings.py [تعداد_تکرار]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.config import DatabaseConfig
+from core.database import DatabaseManager
+from core.pool import ConnectionPool
+
+KEYS = ("share_price", "monthly_increase", "share_price_start_date", "loan_factor")
+
+def _query_call(db: DatabaseManager) -> None:
+    """رفتار قبلی: یک کوئری و commit برای هر تنظیم"""
+    for key in KEYS:
+        db.execute_query("SELECT value FROM settings WHERE key = ?", (key,), fetch=True)
+
+def _cached_call(db: DatabaseManager) -> None:
+    for key in KEYS:
+        db.get_setting(key)
+
+def _measure(func, db: DatabaseManager, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(db)
+    return (time.perf_counter() - start) / iterations
+
+def _batched_call(db: DatabaseManager) -> None:
+    with db.batch():
+        _cached_call(db)
+
+def _sees_external_write(db: DatabaseManager) -> bool:
+    """تغییر share_price از یک اتصال sqlite3 جدا؛ نمونه باز DatabaseManager باید مقدار تازه را بخواند"""
+    db.get_setting("share_price")
+    other = sqlite3.connect(DatabaseConfig.CONFIG["path"])
+    with other:
+        other.execute("UPDATE settings SET value = '3500000' WHERE key = 'share_price'")
+    other.close()
+    return db.get_setting("share_price") == "3500000"
+
+def main(iterations: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        DatabaseConfig.CONFIG["path"] = str(Path(tmp) / "bench.db")
+        with DatabaseManager() as db:
+            queried = _measure(_query_call, db, iterations)
+            db.get_setting("share_price")
+            cached = _measure(_cached_call, db, iterations)
+            batched = _measure(_batched_call, db, iterations)
+            fresh = _sees_external_write(db)
+        ConnectionPool.close_all()
+
+    print(f"تعداد تکرار: {iterations} (هر تکرار {len(KEYS)} تنظیم)")
+    print(f"کوئری مستقیم:  {queried * 1e6:10.1f} میکروثانیه در هر تکرار")
+    print(f"حافظه موقت:    {cached * 1e6:10.1f} میکروثانیه در هر تکرار")
+    print(f"داخل batch:    {batched * 1e6:10.1f} میکروثانیه در هر تکرار")
+    print(f"بهبود: {queried / cached:.1f} برابر")
+    assert fresh, "تغییر تنظیم از اتصال دیگر دیده نشد"
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
\ No newline at end of file
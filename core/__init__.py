@@ -1,6 +1,7 @@
 """پکیج هسته برنامه شامل دیتابیس، تنظیمات و توابع کمکی"""
 
 from .database import DatabaseManager
+from .pool import ConnectionPool
 from .config import AppConfig, BACKUP_DIR  # DB_PATH حذف شده اگه استفاده نمی‌شه
 from .utils import (
     format_persian_number,
@@ -12,7 +13,7 @@ from .utils import (
 )
 
 __all__ = [
-    'DatabaseManager',
+    'DatabaseManager', 'ConnectionPool',
     'AppConfig', 'BACKUP_DIR',  # DB_PATH حذف شده
     'format_persian_number', 'validate_phone_number',
     'calculate_loan_capacity', 'get_persian_date',
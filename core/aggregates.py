@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+جداول تجمیعی که با تریگرهای SQLite همگام نگه داشته می‌شوند
+تریگرها در مهاجرت‌ها (core.migrations) تعریف شده‌اند و ستون‌های کلید ذخیره‌شده (date_key) را می‌خوانند؛
+اینجا دستورات بازسازی کامل و خودآزمایی برای ابزار نگهداری نگهداری می‌شود.
+"""
+
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def rebuild_monthly_rollup(cursor: sqlite3.Cursor) -> int:
+    """پر کردن دوباره transaction_monthly از روی کل تراکنش‌ها؛ تعداد ردیف‌ها را برمی‌گرداند"""
+    cursor.execute("DELETE FROM transaction_monthly")
+    cursor.execute("""
+        INSERT INTO transaction_monthly (member_id, year, month, type, total, tx_count)
+        SELECT member_id, date_key / 10000, date_key / 100 % 100, type, SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE member_id IS NOT NULL AND date_key IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+    count = cursor.execute("SELECT COUNT(*) FROM transaction_monthly").fetchone()[0]
+    logger.info(f"جدول transaction_monthly با {count} ردیف بازسازی شد")
+    return count
+
+# ستون مقصد در member_totals برای هر نوع تراکنش
+TOTAL_COLUMNS = {
+    "عضویت": "membership_total",
+    "وام": "loan_total",
+    "پرداخت": "installment_total",
+}
+
+# آخرین فعالیت: بزرگ‌ترین کلید شمسی تاریخ و سپس خود متن؛ تاریخ نامعتبر (بدون کلید) از همه قدیمی‌تر است
+_LATEST_ACTIVITY = "substr(MAX(printf('%08d', COALESCE(date_key, 0)) || date), 9)"
+
+_MEMBER_TOTALS_SELECT = f"""
+    SELECT member_id,
+           SUM(CASE WHEN type = 'عضویت' THEN amount ELSE 0 END),
+           SUM(CASE WHEN type = 'وام' THEN amount ELSE 0 END),
+           SUM(CASE WHEN type = 'پرداخت' THEN amount ELSE 0 END),
+           COUNT(*),
+           {_LATEST_ACTIVITY}
+    FROM transactions
+    WHERE member_id IS NOT NULL
+    GROUP BY member_id
+"""
+
+def rebuild_member_totals(cursor: sqlite3.Cursor) -> int:
+    """محاسبه دوباره member_totals از روی کل تراکنش‌ها"""
+    cursor.execute("DELETE FROM member_totals")
+    cursor.execute(f"""
+        INSERT INTO member_totals (member_id, membership_total, loan_total, installment_total, tx_count, last_activity)
+        {_MEMBER_TOTALS_SELECT}
+    """)
+    count = cursor.execute("SELECT COUNT(*) FROM member_totals").fetchone()[0]
+    logger.info(f"جدول member_totals برای {count} عضو بازسازی شد")
+    return count
+
+def verify_member_totals(cursor: sqlite3.Cursor, repair: bool = True) -> List[int]:
+    """مقایسه جمع‌های نگهداری‌شده با محاسبه کامل؛ شناسه اعضای ناهمخوان را برمی‌گرداند
+
+    در صورت repair، جدول در صورت وجود اختلاف کامل بازسازی می‌شود.
+    """
+    cursor.execute(f"""
+        WITH fresh (member_id, membership_total, loan_total, installment_total, tx_count, last_activity) AS (
+            {_MEMBER_TOTALS_SELECT}
+        )
+        SELECT f.member_id
+        FROM fresh f LEFT JOIN member_totals t ON t.member_id = f.member_id
+        WHERE t.member_id IS NULL
+           OR f.membership_total != t.membership_total
+           OR f.loan_total != t.loan_total
+           OR f.installment_total != t.installment_total
+           OR f.tx_count != t.tx_count
+           OR f.last_activity IS NOT t.last_activity
+        UNION
+        SELECT member_id FROM member_totals
+        WHERE tx_count > 0 AND member_id NOT IN (SELECT member_id FROM fresh)
+    """)
+    mismatched = [row[0] for row in cursor.fetchall()]
+    if mismatched:
+        logger.warning(f"جمع‌های ذخیره‌شده {len(mismatched)} عضو با تراکنش‌ها همخوان نیست: {mismatched[:20]}")
+        if repair:
+            rebuild_member_totals(cursor)
+    return mismatched
+
+# دفتر وام: هر قسط با loan_id به وام خودش وصل است و جمع پرداخت‌ها روی ردیف وام نگهداری می‌شود
+LOAN_PAYMENT_TYPE = "پرداخت"
+
+def rebuild_loan_ledger(cursor: sqlite3.Cursor) -> int:
+    """محاسبه دوباره جمع مبلغ و تعداد اقساط هر وام از روی تراکنش‌های متصل"""
+    cursor.execute(f"""
+        UPDATE loans SET
+            paid_amount = COALESCE((
+                SELECT SUM(amount) FROM transactions
+                WHERE loan_id = loans.id AND type = '{LOAN_PAYMENT_TYPE}'
+            ), 0),
+            paid_installments = (
+                SELECT COUNT(*) FROM transactions
+                WHERE loan_id = loans.id AND type = '{LOAN_PAYMENT_TYPE}'
+            )
+    """)
+    count = cursor.rowcount
+    logger.info(f"جمع اقساط {count} وام بازسازی شد")
+    return count
+
+def attribute_payments(cursor: sqlite3.Cursor) -> int:
+    """نسبت دادن اقساط قدیمی بدون loan_id به وام‌ها؛ تعداد اقساط نسبت‌داده‌شده را برمی‌گرداند
+
+    اقساط هر عضو به ترتیب تاریخ به قدیمی‌ترین وامی داده می‌شوند که شروع شده و هنوز تسویه نشده است؛
+    برخلاف تریگر، وام‌هایی که وضعیتشان دیگر فعال نیست هم اقساط گذشته خود را می‌گیرند.
+    """
+    loans: Dict[int, List[List[int]]] = {}
+    for loan_id, member_id, amount, start_key, paid in cursor.execute(f"""
+        SELECT l.id, l.member_id, l.amount, l.start_date_key,
+               COALESCE((SELECT SUM(amount) FROM transactions WHERE loan_id = l.id AND type = '{LOAN_PAYMENT_TYPE}'), 0)
+        FROM loans l
+        WHERE l.member_id IS NOT NULL AND l.start_date_key IS NOT NULL
+        ORDER BY l.member_id, l.start_date_key, l.id
+    """).fetchall():
+        loans.setdefault(member_id, []).append([loan_id, start_key, amount - paid])
+
+    assignments = []
+    for tx_id, member_id, amount, key in cursor.execute(f"""
+        SELECT id, member_id, amount, date_key FROM transactions
+        WHERE type = '{LOAN_PAYMENT_TYPE}' AND loan_id IS NULL AND member_id IS NOT NULL AND date_key IS NOT NULL
+        ORDER BY member_id, date_key, id
+    """).fetchall():
+        loan = _first_open_loan(loans.get(member_id, ()), key)
+        if loan is not None:
+            loan[2] -= amount
+            assignments.append((loan[0], tx_id))
+
+    cursor.executemany("UPDATE transactions SET loan_id = ? WHERE id = ?", assignments)
+    logger.info(f"{len(assignments)} قسط قدیمی به وام‌ها نسبت داده شد")
+    return len(assignments)
+
+def _first_open_loan(loans, key: int) -> Optional[List[int]]:
+    for loan in loans:
+        if loan[1] > key:
+            return None
+        if loan[2] > 0:
+            return loan
+    return None
\ No newline at end of file
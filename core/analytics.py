@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+موتور محاسبات گروهی صندوق با آرایه‌های NumPy
+کل دفتر (اعضا، جمع‌ها و وام‌های فعال با جمع اقساطشان) یک بار به صورت ستونی خوانده می‌شود
+و سهام، سقف وام، مانده وام و پیشرفت اقساط همه اعضا با یک محاسبه برداری به دست می‌آید.
+قیمت سهم از تاریخچه قیمت (DatabaseManager.get_share_price) گرفته می‌شود؛ calculate_member_shares،
+calculate_loan_capacity و تب عضو همین موتور را برای یک عضو بارگذاری می‌کنند تا فقط یک قاعده محاسبه باشد.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+class PortfolioEngine:
+    """تصویر ستونی دفتر صندوق و محاسبات برداری روی همه اعضا"""
+
+    def __init__(
+        self,
+        member_ids: np.ndarray,
+        names: List[str],
+        codes: List[str],
+        membership: np.ndarray,
+        loan_total: np.ndarray,
+        installment_total: np.ndarray,
+        loans: np.ndarray,
+        share_price: int,
+        loan_factor: float
+    ):
+        self.member_ids = member_ids
+        self.names = names
+        self.codes = codes
+        self.membership = membership
+        self.loan_total = loan_total
+        self.installment_total = installment_total
+        self.share_price = share_price
+        self.loan_factor = loan_factor
+        self._compute(loans)
+
+    @classmethod
+    def load(
+        cls,
+        db: Optional[DatabaseManager] = None,
+        month_key: Optional[int] = None,
+        member_ids: Optional[Iterable[int]] = None
+    ) -> "PortfolioEngine":
+        """خواندن دفتر همه اعضا یا فقط member_ids؛ month_key (yyyymm) قیمت سهم ماه دلخواه را انتخاب می‌کند"""
+        if db is None:
+            with DatabaseManager() as db:
+                return cls.load(db, month_key, member_ids)
+
+        member_filter = loan_filter = ""
+        params: tuple = ()
+        if member_ids is not None:
+            params = tuple(member_ids)
+            placeholders = ", ".join("?" * len(params)) or "NULL"
+            member_filter = f"WHERE m.id IN ({placeholders})"
+            loan_filter = f"AND member_id IN ({placeholders})"
+        members = db.execute_query(f"""
+            SELECT m.id, m.name, m.membership_code,
+                   COALESCE(t.membership_total, 0), COALESCE(t.loan_total, 0), COALESCE(t.installment_total, 0)
+            FROM members m LEFT JOIN member_totals t ON t.member_id = m.id
+            {member_filter}
+            ORDER BY m.id
+        """, params, fetch=True)
+        loans = db.execute_query(f"""
+            SELECT member_id, amount, installments, paid_amount, paid_installments
+            FROM loans WHERE status='فعال' AND installments > 0 AND member_id IS NOT NULL {loan_filter}
+        """, params, fetch=True)
+
+        columns = list(zip(*members)) if members else [(), (), (), (), (), ()]
+        engine = cls(
+            member_ids=np.array(columns[0], dtype=np.int64),
+            names=list(columns[1]),
+            codes=list(columns[2]),
+            membership=np.array(columns[3], dtype=np.int64),
+            loan_total=np.array(columns[4], dtype=np.int64),
+            installment_total=np.array(columns[5], dtype=np.int64),
+            loans=np.array(loans, dtype=np.int64).reshape(-1, 5),
+            share_price=db.get_share_price(month_key),
+            loan_factor=db.get_setting("loan_factor", 2.0, float)
+        )
+        logger.debug(f"دفتر {len(engine)} عضو و {len(loans)} وام فعال بارگذاری شد")
+        return engine
+
+    def __len__(self) -> int:
+        return len(self.member_ids)
+
+    def _compute(self, loans: np.ndarray) -> None:
+        count = len(self.member_ids)
+        price = self.share_price
+
+        self.shares = self.membership / price if price > 0 else np.zeros(count)
+        self.whole_shares = self.membership // price if price > 0 else np.zeros(count, dtype=np.int64)
+        self.balance = np.maximum(0, self.loan_total - self.installment_total)
+
+        loan_members, amounts, installments, paid_amounts, paid_counts = loans.T
+        paid = np.minimum(paid_counts, installments)
+        remaining = np.maximum(0, amounts - paid_amounts)
+
+        positions, known = self._lookup(loan_members)
+        positions = positions[known]
+
+        self.outstanding = np.zeros(count, dtype=np.int64)
+        self.active_loans = np.zeros(count, dtype=np.int64)
+        paid_total = np.zeros(count, dtype=np.int64)
+        installments_total = np.zeros(count, dtype=np.int64)
+        np.add.at(self.outstanding, positions, remaining[known])
+        np.add.at(self.active_loans, positions, amounts[known])
+        np.add.at(paid_total, positions, paid[known])
+        np.add.at(installments_total, positions, installments[known])
+
+        self.progress = np.divide(
+            paid_total, installments_total,
+            out=np.zeros(count), where=installments_total > 0
+        )
+        # ضریب وام مانند calculate_loan_capacity به عدد صحیح گرد می‌شود
+        max_loan = self.whole_shares * price * int(self.loan_factor)
+        self.capacity = np.maximum(0, max_loan - self.active_loans)
+
+    def _lookup(self, ids: np.ndarray):
+        """جایگاه هر شناسه در member_ids (مرتب) و اینکه آیا آن عضو وجود دارد"""
+        if not len(self.member_ids):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.member_ids, ids), len(self.member_ids) - 1)
+        return positions, self.member_ids[positions] == ids
+
+    def _positions(self, member_ids: Optional[Iterable[int]]) -> np.ndarray:
+        if member_ids is None:
+            return np.arange(len(self.member_ids))
+        ids = np.fromiter(member_ids, dtype=np.int64)
+        positions, known = self._lookup(ids)
+        if not known.all():
+            raise KeyError(f"عضو یافت نشد: {ids[~known].tolist()}")
+        return positions
+
+    def shares_of(self, member_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """تعداد سهام (اعشاری) اعضا به ترتیب شناسه‌های داده‌شده"""
+        return self.shares[self._positions(member_ids)]
+
+    def capacities(self, member_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """سقف وام قابل دریافت (سهام کامل × قیمت × ضریب، منهای وام‌های فعال)"""
+        return self.capacity[self._positions(member_ids)]
+
+    def debts(self, member_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """مانده وام‌های فعال (مبلغ وام منهای جمع اقساط متصل به آن)"""
+        return self.outstanding[self._positions(member_ids)]
+
+    def balances(self, member_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """مانده قابل پرداخت از روی تراکنش‌ها (جمع وام منهای جمع اقساط)"""
+        return self.balance[self._positions(member_ids)]
+
+    def installment_progress(self, member_ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """نسبت اقساط پرداخت‌شده وام‌های فعال (بین ۰ و ۱)"""
+        return self.progress[self._positions(member_ids)]
+
+    def totals(self) -> Dict[str, int]:
+        """جمع کل صندوق برای گزارش‌ها"""
+        return {
+            'membership': int(self.membership.sum()),
+            'loan': int(self.loan_total.sum()),
+            'installment': int(self.installment_total.sum()),
+            'balance': int(self.balance.sum()),
+            'outstanding': int(self.outstanding.sum()),
+            'capacity': int(self.capacity.sum())
+        }
+
+if __name__ == "__main__":
+    engine = PortfolioEngine.load()
+    print(f"تعداد اعضا: {len(engine)}")
+    print(f"جمع کل: {engine.totals()}")
\ No newline at end of file
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+پشتیبان‌گیری آنلاین با API داخلی SQLite
+اتصال اصلی باز می‌ماند و صفحات (شامل محتوای فایل WAL) به صورت دسته‌ای کپی می‌شوند
+"""
+
+import os
+import sqlite3
+import time
+import logging
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+class BackupResult(NamedTuple):
+    path: Path
+    pages: int
+    size_bytes: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """سرعت پشتیبان‌گیری به مگابایت بر ثانیه"""
+        return (self.size_bytes / (1024 * 1024)) / self.seconds if self.seconds > 0 else 0.0
+
+def hot_backup(
+    source: sqlite3.Connection,
+    target_path: Union[str, Path],
+    pages_per_step: int = 256,
+    progress: Optional[ProgressCallback] = None,
+    sleep: float = 0.0
+) -> BackupResult:
+    """کپی کامل دیتابیس از روی اتصال باز به فایل مقصد
+
+    progress با (صفحات کپی‌شده، کل صفحات) بعد از هر مرحله فراخوانی می‌شود.
+    فایل ابتدا با پسوند موقت نوشته و بعد جایگزین می‌شود تا نسخه ناقص باقی نماند.
+    """
+    target_path = Path(target_path)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target_path.with_name(target_path.name + ".tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+
+    def _on_step(status: int, remaining: int, total: int) -> None:
+        if progress:
+            progress(total - remaining, total)
+
+    start = time.perf_counter()
+    dest = sqlite3.connect(str(temp_path))
+    try:
+        source.backup(dest, pages=pages_per_step, progress=_on_step, sleep=sleep)
+        # نسخه پشتیبان باید یک فایل مستقل باشد، نه وابسته به فایل WAL جداگانه
+        dest.execute("PRAGMA journal_mode=DELETE")
+        pages = dest.execute("PRAGMA page_count").fetchone()[0]
+        page_size = dest.execute("PRAGMA page_size").fetchone()[0]
+    except Exception:
+        dest.close()
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    dest.close()
+    os.replace(temp_path, target_path)
+
+    result = BackupResult(target_path, pages, pages * page_size, time.perf_counter() - start)
+    logger.info(
+        f"پشتیبان آنلاین {target_path.name}: {result.pages} صفحه، "
+        f"{result.size_bytes / 1024:.1f} کیلوبایت در {result.seconds * 1000:.1f} میلی‌ثانیه "
+        f"({result.throughput:.1f} مگابایت بر ثانیه)"
+    )
+    return result
\ No newline at end of file
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+مخزن پشتیبان فشرده با حذف داده‌های تکراری
+تصویر دیتابیس (از serialize اتصال باز) در تکه‌های هم‌اندازه با مرز صفحه‌های SQLite تقسیم می‌شود؛ هر تکه یکتا
+فقط یک بار (با نام هش خودش) ذخیره و هر نسخه پشتیبان با یک فهرست JSON بازسازی می‌شود.
+چون SQLite صفحات را در جای خود بازنویسی می‌کند، تکه‌های تغییرنکرده بین نسخه‌ها مشترک می‌مانند.
+"""
+
+import os
+import json
+import lzma
+import zlib
+import sqlite3
+import hashlib
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Union
+
+from core.config import DatabaseConfig, BACKUP_DIR
+
+logger = logging.getLogger(__name__)
+
+# یک بایت ابتدای هر فایل تکه، روش فشرده‌سازی آن را مشخص می‌کند
+_CODECS = {
+    "zlib": (b"z", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (b"x", lzma.compress, lzma.decompress),
+    None: (b"r", lambda data: data, lambda data: data),
+}
+_DECODERS = {marker: decode for marker, _, decode in _CODECS.values()}
+
+class SnapshotInfo(NamedTuple):
+    name: str
+    manifest_path: Path
+    size_bytes: int
+    chunks: int
+    new_chunks: int
+    stored_bytes: int
+    seconds: float
+
+def default_codec() -> Optional[str]:
+    """روش فشرده‌سازی بر اساس DatabaseConfig.CONFIG["backup"]["compress"]"""
+    compress = DatabaseConfig.CONFIG["backup"].get("compress", False)
+    if isinstance(compress, str):
+        return compress.lower() if compress.lower() in _CODECS else "zlib"
+    return "zlib" if compress else None
+
+def _standalone_header(data: memoryview) -> bytes:
+    """نسخه پشتیبان فایل مستقل و بدون وابستگی به WAL باشد (بایت‌های ۱۸ و ۱۹ هدر: حالت ژورنال قدیمی)"""
+    header = bytearray(data)
+    header[18:20] = b"\x01\x01"
+    return bytes(header)
+
+class BackupStore:
+    """نگهداری نسخه‌های پشتیبان به صورت تکه‌های یکتا و قابل بازسازی"""
+
+    def __init__(
+        self,
+        root: Union[str, Path, None] = None,
+        codec: Optional[str] = "default",
+        pages_per_chunk: int = 16
+    ):
+        self.root = Path(root) if root else BACKUP_DIR / "store"
+        self.codec = default_codec() if codec == "default" else codec
+        if self.codec not in _CODECS:
+            raise ValueError(f"روش فشرده‌سازی ناشناخته: {self.codec}")
+        self.pages_per_chunk = pages_per_chunk
+        self.chunks_dir = self.root / "chunks"
+        self.snapshots_dir = self.root / "snapshots"
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _write_chunk(self, digest: str, data: bytes) -> int:
+        """ذخیره تکه در صورت نبود؛ تعداد بایت نوشته‌شده را برمی‌گرداند"""
+        path = self._chunk_path(digest)
+        if path.exists():
+            return 0
+        marker, encode, _ = _CODECS[self.codec]
+        payload = marker + encode(data)
+        path.parent.mkdir(exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+        return len(payload)
+
+    def _read_chunk(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), "rb") as f:
+            payload = f.read()
+        data = _DECODERS[payload[:1]](payload[1:])
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"تکه پشتیبان {digest} آسیب دیده است")
+        return data
+
+    def _latest_digests(self) -> Set[str]:
+        """تکه‌های آخرین نسخه؛ تکه‌های تکراری بدون مراجعه به دیسک شناخته می‌شوند"""
+        snapshots = self.list_snapshots()
+        return set(snapshots[-1]["chunks"]) if snapshots else set()
+
+    def snapshot(self, conn: sqlite3.Connection, label: str = "backup") -> SnapshotInfo:
+        """گرفتن نسخه پشتیبان از اتصال باز و ذخیره فقط تکه‌های جدید
+
+        صفحات با serialize مستقیم از اتصال (همراه محتوای WAL و در یک تصویر سازگار) در حافظه
+        خوانده می‌شوند و هیچ کپی کامل روی دیسک ساخته نمی‌شود؛ فقط تکه‌هایی که در نسخه قبل
+        نبوده‌اند نوشته می‌شوند.
+        """
+        start = time.perf_counter()
+        name = f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        image = memoryview(conn.serialize())
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        chunk_size = page_size * self.pages_per_chunk
+        known = self._latest_digests()
+        digests: List[str] = []
+        whole = hashlib.sha256()
+        new_chunks = stored = 0
+        for offset in range(0, len(image), chunk_size):
+            data = image[offset:offset + chunk_size]
+            if offset == 0:
+                data = _standalone_header(data)
+            whole.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in known:
+                written = self._write_chunk(digest, bytes(data))
+                if written:
+                    new_chunks += 1
+                    stored += written
+                known.add(digest)
+            digests.append(digest)
+        size = len(image)
+
+        manifest = {
+            "name": name,
+            "label": label,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "size": size,
+            "page_size": page_size,
+            "chunk_size": chunk_size,
+            "sha256": whole.hexdigest(),
+            "chunks": digests
+        }
+        manifest_path = self.snapshots_dir / f"{name}.json"
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        info = SnapshotInfo(name, manifest_path, size, len(digests), new_chunks, stored, time.perf_counter() - start)
+        logger.info(
+            f"نسخه پشتیبان {name}: {info.chunks} تکه، {info.new_chunks} تکه جدید، "
+            f"{info.stored_bytes / 1024:.1f} کیلوبایت نوشته شد از {info.size_bytes / 1024:.1f} کیلوبایت "
+            f"در {info.seconds * 1000:.1f} میلی‌ثانیه"
+        )
+        return info
+
+    def list_snapshots(self) -> List[Dict]:
+        """فهرست نسخه‌ها از قدیمی به جدید"""
+        snapshots = []
+        for path in self.snapshots_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                manifest["manifest_path"] = str(path)
+                snapshots.append(manifest)
+            except (OSError, ValueError) as e:
+                logger.error(f"فهرست پشتیبان نامعتبر {path}: {str(e)}")
+        return sorted(snapshots, key=lambda m: (m.get("created", ""), m["name"]))
+
+    def restore(self, name: str, target_path: Union[str, Path]) -> Path:
+        """بازسازی فایل کامل دیتابیس از روی یک نسخه"""
+        with open(self.snapshots_dir / f"{name}.json", "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        target_path = Path(target_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target_path.with_name(target_path.name + ".tmp")
+        whole = hashlib.sha256()
+        with open(temp_path, "wb") as out:
+            for digest in manifest["chunks"]:
+                data = self._read_chunk(digest)
+                whole.update(data)
+                out.write(data)
+        if whole.hexdigest() != manifest["sha256"]:
+            temp_path.unlink(missing_ok=True)
+            raise ValueError(f"نسخه پشتیبان {name} قابل بازسازی نیست")
+        os.replace(temp_path, target_path)
+        logger.info(f"نسخه پشتیبان {name} در {target_path} بازسازی شد")
+        return target_path
+
+    def prune(self, max_files: Optional[int] = None) -> int:
+        """حذف نسخه‌های قدیمی‌تر از سقف max_files و پاک کردن تکه‌های بی‌استفاده"""
+        if max_files is None:
+            max_files = DatabaseConfig.CONFIG["backup"]["max_files"]
+        snapshots = self.list_snapshots()
+        removed = 0
+        while len(snapshots) > max_files:
+            Path(snapshots.pop(0)["manifest_path"]).unlink(missing_ok=True)
+            removed += 1
+        if removed:
+            self._collect_garbage({d for m in snapshots for d in m["chunks"]})
+        return removed
+
+    def _collect_garbage(self, referenced: Set[str]) -> None:
+        freed = 0
+        for path in self.chunks_dir.glob("*/*"):
+            if path.name not in referenced and not path.name.endswith(".tmp"):
+                freed += path.stat().st_size
+                path.unlink()
+        logger.info(f"{freed / 1024:.1f} کیلوبایت تکه بی‌استفاده از مخزن پشتیبان حذف شد")
\ No newline at end of file
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+ثبت تغییرات ردیف‌ها (change data capture) در جدول change_log با تریگرهای SQLite
+هر درج، ویرایش یا حذف در members، transactions، loans، notes و settings یک ردیف با شماره
+ترتیبی صعودی (seq) می‌نویسد؛ مصرف‌کننده‌ها (به‌روزرسانی رابط، خروجی افزایشی، حافظه‌های موقت)
+فقط «تغییرات بعد از seq N» را با جستجوی بازه‌ای روی کلید اصلی می‌خوانند. جایگاه هر مصرف‌کننده
+در change_log_consumers ثبت می‌شود و ردیف‌هایی که همه مصرف‌کننده‌ها خوانده‌اند فشرده (حذف) می‌شوند.
+جدول و تریگرها در مهاجرت‌ها (core.migrations) تعریف شده‌اند؛ سال ردیف از ستون کلید تاریخ خوانده می‌شود.
+"""
+
+import sqlite3
+import logging
+from typing import List, NamedTuple, Optional, Tuple
+
+from core.changes import (
+    Change, member_changed, transactions_changed, loans_changed, notes_changed, setting_changed
+)
+
+logger = logging.getLogger(__name__)
+
+class LogEntry(NamedTuple):
+    seq: int
+    table_name: str
+    op: str
+    row_id: Optional[int]
+    member_id: Optional[int]
+    year: Optional[int]
+    key: Optional[str]
+
+def latest_seq(cursor: sqlite3.Cursor) -> int:
+    """آخرین شماره ثبت‌شده (حتی اگر ردیف آن فشرده شده باشد)"""
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def entries_since(cursor: sqlite3.Cursor, seq: int, limit: Optional[int] = None) -> List[LogEntry]:
+    """ردیف‌های خام بعد از seq به ترتیب ثبت"""
+    cursor.execute(
+        "SELECT seq, table_name, op, row_id, member_id, year, key FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+        (seq, -1 if limit is None else limit)
+    )
+    return [LogEntry(*row) for row in cursor.fetchall()]
+
+def _as_change(table_name: str, member_id: Optional[int], year: Optional[int], key: Optional[str]) -> Change:
+    year = None if year is None else str(year)
+    if table_name == "members":
+        return member_changed(member_id)
+    if table_name == "transactions":
+        return transactions_changed(member_id, year)
+    if table_name == "loans":
+        return loans_changed(member_id)
+    if table_name == "notes":
+        return notes_changed(member_id)
+    return setting_changed(key)
+
+def changes_since(cursor: sqlite3.Cursor, seq: int) -> Tuple[int, List[Change]]:
+    """(آخرین seq، فهرست بدون تکرار Change ها) برای تغییرات بعد از seq
+
+    تکرارها در خود SQL حذف می‌شوند؛ هزار ویرایش تراکنش یک عضو در یک سال یک Change است.
+    """
+    last = latest_seq(cursor)
+    if last <= seq:
+        return seq, []
+    cursor.execute(
+        "SELECT DISTINCT table_name, member_id, year, key FROM change_log WHERE seq > ? AND seq <= ?",
+        (seq, last)
+    )
+    return last, [_as_change(*row) for row in cursor.fetchall()]
+
+def register_consumer(cursor: sqlite3.Cursor, name: str, seq: Optional[int] = None) -> int:
+    """ثبت مصرف‌کننده (در صورت نبود) از seq یا آخرین شماره؛ جایگاه فعلی او را برمی‌گرداند"""
+    cursor.execute(
+        "INSERT OR IGNORE INTO change_log_consumers (name, seq) VALUES (?, ?)",
+        (name, latest_seq(cursor) if seq is None else seq)
+    )
+    cursor.execute("SELECT seq FROM change_log_consumers WHERE name = ?", (name,))
+    return cursor.fetchone()[0]
+
+def acknowledge(cursor: sqlite3.Cursor, name: str, seq: int) -> None:
+    """ثبت اینکه مصرف‌کننده تغییرات تا seq را پردازش کرده است"""
+    cursor.execute("UPDATE change_log_consumers SET seq = MAX(seq, ?) WHERE name = ?", (seq, name))
+
+def unregister_consumer(cursor: sqlite3.Cursor, name: str) -> None:
+    cursor.execute("DELETE FROM change_log_consumers WHERE name = ?", (name,))
+
+def compact_change_log(cursor: sqlite3.Cursor) -> int:
+    """حذف ردیف‌هایی که همه مصرف‌کننده‌ها خوانده‌اند؛ تعداد ردیف‌های حذف‌شده را برمی‌گرداند
+
+    بدون مصرف‌کننده ثبت‌شده چیزی حذف نمی‌شود، تا مصرف‌کننده‌ای که بعداً از seq قدیمی‌تری ثبت می‌شود تغییری را از دست ندهد.
+    """
+    cursor.execute("SELECT MIN(seq) FROM change_log_consumers")
+    floor = cursor.fetchone()[0]
+    if floor is None:
+        return 0
+    cursor.execute("DELETE FROM change_log WHERE seq <= ?", (floor,))
+    removed = cursor.rowcount
+    if removed:
+        logger.info(f"{removed} ردیف تا شماره {floor} از change_log حذف شد")
+    return removed
\ No newline at end of file
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+رویدادهای تغییر داده برای به‌روزرسانی هدفمند نماها
+هر ذخیره به جای «همه چیز را دوباره بخوان» اعلام می‌کند دقیقاً چه چیزی تغییر کرده است
+(مثلاً «تراکنش‌های سال ۱۴۰۳ عضو ۴۲» یا «تنظیم share_price»)؛ هر نما فقط ردیف‌ها و جمع‌های
+متأثر را دوباره محاسبه می‌کند.
+"""
+
+from typing import Iterable, NamedTuple, Optional, Set
+
+MEMBER = "member"
+TRANSACTIONS = "transactions"
+LOANS = "loans"
+NOTES = "notes"
+SETTING = "setting"
+
+# تنظیماتی که سهام و سقف وام اعضا را تغییر می‌دهند
+SHARE_SETTINGS = frozenset({"share_price", "monthly_increase", "share_price_start_date", "loan_factor"})
+
+class Change(NamedTuple):
+    kind: str
+    member_id: Optional[int] = None
+    year: Optional[str] = None
+    key: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.kind == TRANSACTIONS:
+            return f"تراکنش‌های سال {self.year} عضو {self.member_id}"
+        if self.kind == MEMBER:
+            return f"اطلاعات عضو {self.member_id}"
+        if self.kind == LOANS:
+            return f"وام‌های عضو {self.member_id}"
+        if self.kind == NOTES:
+            return f"یادداشت‌های عضو {self.member_id}"
+        return f"تنظیم {self.key}"
+
+def member_changed(member_id: int) -> Change:
+    """اطلاعات پایه عضو (نام، تلفن، حساب، وضعیت) یا عضو جدید"""
+    return Change(MEMBER, member_id=member_id)
+
+def transactions_changed(member_id: int, year: Optional[str] = None) -> Change:
+    """تراکنش‌های یک عضو (و جمع‌های او)؛ year خالی یعنی همه سال‌ها"""
+    return Change(TRANSACTIONS, member_id=member_id, year=None if year is None else str(year))
+
+def loans_changed(member_id: int) -> Change:
+    return Change(LOANS, member_id=member_id)
+
+def notes_changed(member_id: int) -> Change:
+    return Change(NOTES, member_id=member_id)
+
+def setting_changed(key: str) -> Change:
+    return Change(SETTING, key=key)
+
+def affected_members(changes: Iterable[Change], kinds: Iterable[str] = (MEMBER, TRANSACTIONS)) -> Set[int]:
+    """شناسه اعضایی که ردیفشان در یکی از انواع داده‌شده تغییر کرده است"""
+    kinds = set(kinds)
+    return {change.member_id for change in changes if change.kind in kinds and change.member_id is not None}
+
+def changed_settings(changes: Iterable[Change]) -> Set[str]:
+    return {change.key for change in changes if change.kind == SETTING}
+
+def changed_years(changes: Iterable[Change]) -> Optional[Set[str]]:
+    """سال‌های تراکنش‌های تغییرکرده؛ None یعنی حداقل یک تغییر بدون سال مشخص"""
+    years = set()
+    for change in changes:
+        if change.kind == TRANSACTIONS:
+            if change.year is None:
+                return None
+            years.add(change.year)
+    return years
\ No newline at end of file
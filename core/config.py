@@ -101,6 +101,12 @@ class AppConfig:
         "database": "%Y-%m-%d %H:%M:%S"
     }
     
+    # جستجوی اعضا: تأخیر پس از آخرین کلید و تعداد پیشنهادهای خودکار
+    SEARCH: Dict[str, Any] = {
+        "debounce_ms": 200,
+        "suggestions": 10
+    }
+    
     SYSTEM: Dict[str, Any] = {
         "auto_backup": True,
         "backup_interval": 24,
@@ -122,7 +128,7 @@ class DatabaseConfig:
         "backup": {
             "enabled": True,
             "max_files": 30,
-            "compress": False
+            "compress": True  # True/"zlib" یا "lzma" برای مخزن پشتیبان؛ False یعنی تکه‌های بدون فشرده‌سازی
         }
     }
 
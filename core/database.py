@@ -3,41 +3,60 @@
 
 import sqlite3
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any, Tuple, Union
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterable, Sequence, Callable
 from pathlib import Path
 import logging
 from datetime import datetime
-import shutil
 import os
 
 from core.config import DatabaseConfig, BACKUP_DIR, LOG_DIR
+from core.pool import ConnectionPool
+from core.migrations import migrate
+from core.aggregates import rebuild_monthly_rollup, verify_member_totals, rebuild_loan_ledger, attribute_payments
+from core.dates import date_key, format_key, key_today, year_range, key_from_jalali
+from core.share_price import current_month, price_at, rewrite_share_price_history
+from core.loan_schedule import write_loan_schedule, verify_loan_schedule
+from core.search import search_members, search_notes, rebuild_search_index, find_member, member_keys
+from core.ledger import PAGE_SIZE, PageKey, transactions_page, count_transactions, loans_page, count_loans
+from core.change_log import (
+    LogEntry, latest_seq, entries_since, changes_since, register_consumer, acknowledge, compact_change_log
+)
+from core.changes import Change
+from core.backup import hot_backup, ProgressCallback
+from core.backup_store import BackupStore
 
 logger = logging.getLogger(__name__)
 
+# توضیح ردیف‌هایی که جدول ماهانه تب عضو ثبت می‌کند
+GRID_DESCRIPTION = "ثبت از تب عضو"
+
 class DatabaseManager:
     """کلاس مدیریت پایگاه داده با بهبودهای ساختاری"""
     
     def __init__(self):
         self.db_path = Path(DatabaseConfig.CONFIG["path"])
-        self.conn = None
-        self._initialize_db()
+        self.pool = ConnectionPool.for_path(self.db_path, DatabaseConfig.CONFIG["timeout"])
+        self.conn = self.pool.acquire(self._apply_pragmas)
+        # آیا data_version در batch جاری بررسی شده است
+        self._settings_checked = False
+        try:
+            self.pool.bootstrap_once(self._initialize_db)
+        except Exception:
+            self.close()
+            raise
 
     def _initialize_db(self):
-        """مقداردهی اولیه با مدیریت خطا و اضافه کردن ستون‌های جدید"""
+        """مقداردهی اولیه با اجرای مهاجرت‌های باقی‌مانده (یک بار برای هر فرایند)"""
         try:
-            self.db_path.parent.mkdir(parents=True, exist_ok=True)
-            self.conn = sqlite3.connect(str(self.db_path))
-            self._apply_pragmas()
-            self._create_tables()
-            self._update_schema()  # به‌روزرسانی ساختار جدول‌ها
-            self._insert_default_settings()
-            logger.info("پایگاه داده با موفقیت مقداردهی شد")
+            version = migrate(self.conn)
+            logger.info(f"پایگاه داده با موفقیت مقداردهی شد (نسخه ساختار: {version})")
         except Exception as e:
             logger.critical(f"خطا در مقداردهی اولیه دیتابیس: {str(e)}")
             raise
 
-    def _apply_pragmas(self):
-        """تنظیمات بهینه‌سازی SQLite"""
+    @staticmethod
+    def _apply_pragmas(conn: sqlite3.Connection):
+        """تنظیمات بهینه‌سازی SQLite (هنگام ساخت هر اتصال)"""
         pragmas = {
             'journal_mode': DatabaseConfig.CONFIG['journal_mode'],
             'foreign_keys': int(DatabaseConfig.CONFIG['foreign_keys']),
@@ -47,114 +66,58 @@ class DatabaseManager:
             'busy_timeout': DatabaseConfig.CONFIG['timeout'] * 1000
         }
         for name, value in pragmas.items():
-            self.conn.execute(f"PRAGMA {name}={value}")
-
-    def _create_tables(self):
-        """ایجاد جداول اولیه"""
-        with self.transaction() as cursor:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS members (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    membership_code TEXT UNIQUE NOT NULL,
-                    name TEXT NOT NULL,
-                    family_name TEXT,
-                    phone TEXT,
-                    account_number TEXT,
-                    join_date TEXT NOT NULL,
-                    balance REAL DEFAULT 0.0,
-                    status TEXT DEFAULT 'فعال'
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    member_id INTEGER,
-                    date TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    type TEXT NOT NULL,
-                    description TEXT,
-                    FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS loans (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    member_id INTEGER,
-                    amount REAL NOT NULL,
-                    start_date TEXT NOT NULL,
-                    end_date TEXT,
-                    installments INTEGER NOT NULL,
-                    monthly_payment REAL NOT NULL,
-                    status TEXT DEFAULT 'فعال',
-                    FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    member_id INTEGER,
-                    date TEXT NOT NULL,
-                    note TEXT NOT NULL,
-                    linked_cell TEXT,  -- ستون جدید برای لینک به سلول
-                    FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    description TEXT
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_member_date ON transactions(member_id, date)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_loans_member ON loans(member_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_member_date ON notes(member_id, date)")
+            conn.execute(f"PRAGMA {name}={value}")
 
-    def _update_schema(self):
-        """به‌روزرسانی ساختار جدول‌ها (اضافه کردن ستون‌های جدید اگر وجود نداشته باشند)"""
-        with self.transaction() as cursor:
-            # چک کردن جدول loans برای ستون end_date
-            cursor.execute("PRAGMA table_info(loans)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if "end_date" not in columns:
-                cursor.execute("ALTER TABLE loans ADD COLUMN end_date TEXT")
-                logger.info("ستون end_date به جدول loans اضافه شد")
-
-            # چک کردن جدول notes برای ستون linked_cell
-            cursor.execute("PRAGMA table_info(notes)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if "linked_cell" not in columns:
-                cursor.execute("ALTER TABLE notes ADD COLUMN linked_cell TEXT")
-                logger.info("ستون linked_cell به جدول notes اضافه شد")
-
-    def _insert_default_settings(self):
-        """درج تنظیمات پیش‌فرض"""
-        default_settings = [
-            ("share_price", "2000000", "قیمت هر سهم به ریال"),
-            ("monthly_increase", "0", "افزایش ماهانه سهام"),
-            ("loan_factor", "2", "ضریب وام"),
-            ("share_price_start_date", "", "تاریخ شروع قیمت سهام"),
-            ("fund_balance", "0", "موجودی صندوق"),
-            ("backup_enabled", "1", "فعال بودن بکاپ خودکار")
-        ]
-        with self.transaction() as cursor:
-            for key, value, desc in default_settings:
-                cursor.execute(
-                    "INSERT OR IGNORE INTO settings (key, value, description) VALUES (?, ?, ?)",
-                    (key, value, desc)
-                )
+    def init_db(self):
+        """اجرای دوباره آماده‌سازی ساختار دیتابیس (برای تعمیر)"""
+        self.pool.bootstrap_once(self._initialize_db, force=True)
 
     @contextmanager
     def transaction(self):
-        """مدیریت تراکنش‌ها"""
+        """مدیریت تراکنش‌ها؛ داخل batch فقط یک savepoint است و commit جداگانه ندارد"""
         cursor = self.conn.cursor()
         try:
-            yield cursor
-            self.conn.commit()
+            with self.batch():
+                yield cursor
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"ترکنش ناموفق: {str(e)}")
             raise
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def batch(self):
+        """واحد کار: همه دستورات داخل آن با یک commit (یک fsync) ثبت می‌شوند
+
+        batch های تو در تو (حتی از DatabaseManager دیگری روی همین رشته) به صورت
+        SAVEPOINT اجرا می‌شوند و خطای داخلی فقط بخش خودش را برمی‌گرداند.
+        """
+        depth = self.pool.batch_depth
+        savepoint = f"batch_{depth}"
+        if depth == 0:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self._settings_checked = False
+        else:
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+        self.pool.batch_depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self.pool.batch_depth = depth
+            if depth == 0:
+                self.conn.rollback()
+            else:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            # ممکن است set_setting داخل همین batch حافظه موقت را تغییر داده باشد
+            self.pool.settings.invalidate()
+            raise
+        self.pool.batch_depth = depth
+        if depth == 0:
+            self.conn.commit()
+        else:
+            self.conn.execute(f"RELEASE {savepoint}")
 
     def execute_query(self, query: str, params: tuple = (), fetch: bool = False):
         """اجرای کوئری‌ها"""
@@ -163,21 +126,49 @@ class DatabaseManager:
             if fetch:
                 return cursor.fetchall()
 
-    def add_member(self, name: str, membership_number: str, **kwargs):
-        """اضافه کردن عضو"""
+    def execute_many(self, query: str, params_seq: Iterable[Sequence[Any]]) -> int:
+        """اجرای یک دستور برای چند ردیف در یک تراکنش؛ تعداد ردیف‌های تغییرکرده را برمی‌گرداند"""
+        with self.transaction() as cursor:
+            cursor.executemany(query, params_seq)
+            return cursor.rowcount
+
+    def add_member(self, name: str, membership_number: str, **kwargs) -> Optional[int]:
+        """اضافه کردن عضو همراه کلیدهای جستجو؛ شناسه عضو یا None برای کد تکراری"""
         try:
             join_date = kwargs.get('join_date', datetime.now().strftime("%Y-%m-%d"))
+            phone, account = kwargs.get('phone'), kwargs.get('account_number')
+            keys = member_keys(name, None, membership_number, phone, account)
             with self.transaction() as cursor:
                 cursor.execute(
-                    """INSERT INTO members 
-                    (name, membership_code, phone, account_number, join_date) 
-                    VALUES (?, ?, ?, ?, ?)""",
-                    (name, membership_number, kwargs.get('phone'), kwargs.get('account_number'), join_date)
+                    f"""INSERT INTO members
+                    (name, membership_code, phone, account_number, join_date, balance, status, {', '.join(keys)})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, {', '.join('?' * len(keys))})""",
+                    (name, membership_number, phone, account, join_date,
+                     kwargs.get('balance', 0), kwargs.get('status', 'فعال'), *keys.values())
                 )
-            return True
+                return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             logger.error(f"عضویت تکراری: {str(e)}")
-            return False
+            return None
+
+    def update_member(self, member_id: int, **fields) -> None:
+        """ویرایش اطلاعات پایه عضو (نام، کد، تلفن، حساب و ...) همراه کلیدهای جستجو"""
+        with self.transaction() as cursor:
+            current = cursor.execute(
+                "SELECT name, family_name, membership_code, phone, account_number FROM members WHERE id=?",
+                (member_id,)
+            ).fetchone()
+            if current is None:
+                raise ValueError(f"عضو {member_id} وجود ندارد")
+            values = dict(zip(("name", "family_name", "membership_code", "phone", "account_number"), current))
+            values.update(fields)
+            fields = {**fields, **member_keys(
+                values["name"], values["family_name"], values["membership_code"], values["phone"], values["account_number"]
+            )}
+            cursor.execute(
+                f"UPDATE members SET {', '.join(f'{column}=?' for column in fields)} WHERE id=?",
+                (*fields.values(), member_id)
+            )
 
     def get_member(self, member_id: int):
         """دریافت اطلاعات عضو"""
@@ -188,45 +179,233 @@ class DatabaseManager:
         )
         return result[0] if result else None
 
-    def calculate_loan_balance(self, member_id: int):
-        """محاسبه مانده وام"""
-        result = self.execute_query("""
-            SELECT SUM(amount - (amount / installments) * (
-                SELECT COUNT(*) FROM transactions t 
-                WHERE t.member_id = loans.member_id 
-                AND t.type = 'پرداخت' 
-                AND t.date >= loans.start_date
-            ))
-            FROM loans WHERE member_id=? AND status='فعال'
-        """, (member_id,), fetch=True)
+    def search_members(self, text: str, limit: Optional[int] = None) -> List[int]:
+        """شناسه اعضای منطبق با متن جستجو (نام، کد، تلفن یا شماره حساب) به ترتیب انطباق"""
+        with self.transaction() as cursor:
+            return search_members(cursor, text, limit)
+
+    def search_notes(self, text: str, member_id: Optional[int] = None) -> List[int]:
+        """شناسه یادداشت‌های منطبق با متن جستجو"""
+        with self.transaction() as cursor:
+            return search_notes(cursor, text, member_id)
+
+    def find_member(self, text: str) -> Optional[int]:
+        """شناسه عضو با کد عضویت، نام کامل یا تلفن برابر با متن (پس از یکسان‌سازی)"""
+        with self.transaction() as cursor:
+            return find_member(cursor, text)
+
+    def rebuild_search_index(self) -> None:
+        with self.transaction() as cursor:
+            rebuild_search_index(cursor)
+
+    def get_transactions_page(
+        self, start_key: int, end_key: int, tx_type: Optional[str] = None,
+        after: Optional[PageKey] = None, limit: int = PAGE_SIZE
+    ) -> List[Tuple]:
+        """یک صفحه از تراکنش‌های بازه تاریخ، ادامه از کلید after (تاریخ، شناسه) صفحه قبل"""
+        with self.transaction() as cursor:
+            return transactions_page(cursor, start_key, end_key, tx_type, after, limit)
+
+    def count_transactions(self, start_key: int, end_key: int, tx_type: Optional[str] = None) -> int:
+        with self.transaction() as cursor:
+            return count_transactions(cursor, start_key, end_key, tx_type)
+
+    def get_loans_page(
+        self, start_key: int, end_key: int, status: Optional[str] = None,
+        after: Optional[PageKey] = None, limit: int = PAGE_SIZE
+    ) -> List[Tuple]:
+        """یک صفحه از وام‌های اعطاشده در بازه تاریخ، ادامه از کلید after صفحه قبل"""
+        with self.transaction() as cursor:
+            return loans_page(cursor, start_key, end_key, status, after, limit)
+
+    def count_loans(self, start_key: int, end_key: int, status: Optional[str] = None) -> int:
+        with self.transaction() as cursor:
+            return count_loans(cursor, start_key, end_key, status)
+
+    def latest_change_seq(self) -> int:
+        """شماره آخرین تغییر ثبت‌شده در change_log"""
+        with self.transaction() as cursor:
+            return latest_seq(cursor)
+
+    def get_change_entries(self, seq: int, limit: Optional[int] = None) -> List[LogEntry]:
+        """ردیف‌های خام change_log بعد از seq (برای خروجی افزایشی و مصرف‌کننده‌های دیگر)"""
+        with self.transaction() as cursor:
+            return entries_since(cursor, seq, limit)
+
+    def get_changes_since(self, seq: int) -> Tuple[int, List[Change]]:
+        """(آخرین seq، Change های بدون تکرار) تغییرات بعد از seq"""
+        with self.transaction() as cursor:
+            return changes_since(cursor, seq)
+
+    def register_change_consumer(self, name: str, seq: Optional[int] = None) -> int:
+        with self.transaction() as cursor:
+            return register_consumer(cursor, name, seq)
+
+    def acknowledge_changes(self, name: str, seq: int) -> None:
+        with self.transaction() as cursor:
+            acknowledge(cursor, name, seq)
+
+    def compact_change_log(self) -> int:
+        """حذف تغییراتی که همه مصرف‌کننده‌ها خوانده‌اند"""
+        with self.transaction() as cursor:
+            return compact_change_log(cursor)
+
+    def calculate_loan_balance(self, member_id: int) -> int:
+        """محاسبه مانده وام‌های فعال از جمع اقساط نگهداری‌شده روی هر وام"""
+        result = self.execute_query(
+            "SELECT SUM(MAX(0, amount - paid_amount)) FROM loans WHERE member_id=? AND status='فعال'",
+            (member_id,), fetch=True
+        )
         return int(result[0][0]) if result and result[0][0] is not None else 0
 
-    def get_member_financial_summary(self, member_id: int) -> Dict[str, float]:
+    def add_loan(self, member_id: int, amount: int, installments: int, start_date: Optional[str] = None) -> int:
+        """ثبت وام جدید؛ شناسه وام را برمی‌گرداند (جدول اقساط را تریگر درج وام می‌سازد)"""
+        if amount <= 0 or installments <= 0:
+            raise ValueError("مبلغ و تعداد اقساط وام باید مثبت باشد")
+        start_date = start_date or format_key(key_today())
+        with self.transaction() as cursor:
+            cursor.execute(
+                """INSERT INTO loans (member_id, amount, start_date, start_date_key, installments, monthly_payment)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (member_id, amount, start_date, date_key(start_date), installments, -(-amount // installments))
+            )
+            return cursor.lastrowid
+
+    def get_loan_schedule(self, loan_id: int) -> List[Tuple[int, int, int, int]]:
+        """ردیف‌های (شماره قسط، سررسید، مبلغ مورد انتظار، مبلغ پرداخت‌شده) یک وام"""
+        return self.execute_query(
+            "SELECT seq, due_key, expected, paid FROM loan_schedule WHERE loan_id=? ORDER BY seq",
+            (loan_id,), fetch=True
+        )
+
+    def rebuild_loan_schedule(self, loan_ids: Optional[Iterable[int]] = None) -> int:
+        """ساخت دوباره جدول اقساط (مثلاً بعد از ویرایش مبلغ یا تعداد اقساط وام)"""
+        with self.transaction() as cursor:
+            return write_loan_schedule(cursor, loan_ids)
+
+    def verify_loan_schedule(self, repair: bool = True) -> List[int]:
+        """خودآزمایی جدول اقساط: هر وام به تعداد اقساطش ردیف دارد؛ در صورت repair وام‌های ناقص بازسازی می‌شوند"""
+        with self.transaction() as cursor:
+            return verify_loan_schedule(cursor, repair)
+
+    def rebuild_loan_ledger(self, reattribute: bool = False) -> int:
+        """بازسازی جمع اقساط وام‌ها؛ با reattribute اقساط بدون وام هم دوباره نسبت داده می‌شوند"""
+        with self.transaction() as cursor:
+            if reattribute:
+                attribute_payments(cursor)
+            return rebuild_loan_ledger(cursor)
+
+    def get_member_financial_summary(self, member_id: int) -> Dict[str, int]:
         """خلاصه مالی عضو"""
+        totals = self.get_member_totals(member_id)
+        return {
+            'دارایی': int(totals['membership']),
+            'وام‌ها': int(totals['loan']),
+            'پرداخت‌ها': int(totals['installment'])
+        }
+
+    def get_member_totals(self, member_id: int) -> Dict[str, Any]:
+        """جمع عضویت، وام و اقساط عضو از جدول member_totals (یک خواندن با کلید اصلی)"""
+        result = self.execute_query(
+            "SELECT membership_total, loan_total, installment_total, last_activity FROM member_totals WHERE member_id=?",
+            (member_id,), fetch=True
+        )
+        membership, loan, installment, last_activity = result[0] if result else (0, 0, 0, None)
+        return {
+            'membership': membership,
+            'loan': loan,
+            'installment': installment,
+            'last_activity': last_activity
+        }
+
+    def verify_member_totals(self, repair: bool = True) -> List[int]:
+        """خودآزمایی member_totals با محاسبه کامل؛ در صورت اختلاف جدول بازسازی می‌شود"""
+        with self.transaction() as cursor:
+            return verify_member_totals(cursor, repair)
+
+    def get_monthly_grid(self, member_id: int, year: Union[int, str]) -> List[Dict[str, int]]:
+        """جدول ۱۲ ماهه جمع مبالغ هر نوع تراکنش در یک سال با یک خواندن از transaction_monthly"""
+        grid = [{} for _ in range(12)]
+        rows = self.execute_query(
+            "SELECT month, type, total FROM transaction_monthly WHERE member_id=? AND year=?",
+            (member_id, int(year)), fetch=True
+        )
+        for month, type_, total in rows:
+            if 1 <= month <= 12:
+                grid[month - 1][type_] = total
+        return grid
+
+    def save_monthly_grid(self, member_id: int, year: Union[int, str], grid: Sequence[Dict[str, int]]) -> int:
+        """ذخیره خانه‌های تغییرکرده جدول ۱۲ ماهه؛ تعداد خانه‌های تغییرکرده را برمی‌گرداند
+
+        هر خانه جمع همه تراکنش‌های آن نوع در ماه است؛ اختلاف با جمع فعلی فقط به ردیف خود جدول
+        (روز ۱ ماه با توضیح GRID_DESCRIPTION) اعمال می‌شود و تراکنش‌های روزانه، توضیح‌دار یا ثبت‌شده
+        از جای دیگر دست نمی‌خورند. اگر مقدار خانه از جمع همین تراکنش‌ها کمتر شود ValueError می‌دهد.
+        """
+        current = self.get_monthly_grid(member_id, year)
+        own: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        with self.transaction() as cursor:
+            for tx_id, date, type_, amount in cursor.execute(
+                "SELECT id, date, type, amount FROM transactions "
+                "WHERE member_id=? AND date_key BETWEEN ? AND ? AND description=? ORDER BY id",
+                (member_id, *year_range(year), GRID_DESCRIPTION)
+            ).fetchall():
+                own.setdefault((date, type_), []).append((tx_id, amount))
+
+            changed = 0
+            for index, cells in enumerate(grid):
+                date = f"{year}/{index + 1:02d}/01"
+                for type_, amount in cells.items():
+                    total = current[index].get(type_, 0)
+                    if amount == total:
+                        continue
+                    rows = own.get((date, type_), [])
+                    target = amount - (total - sum(value for _, value in rows))
+                    if target < 0:
+                        raise ValueError(
+                            f"مبلغ {type_} ماه {date[:7]} نمی‌تواند از جمع تراکنش‌های جداگانه آن ماه "
+                            f"({total - sum(value for _, value in rows)}) کمتر باشد"
+                        )
+                    # ردیف اول جدول نگه داشته و ردیف‌های تکراری قدیمی حذف می‌شوند
+                    stale = [(tx_id,) for tx_id, _ in (rows if target == 0 else rows[1:])]
+                    cursor.executemany("DELETE FROM transactions WHERE id=?", stale)
+                    if target and rows:
+                        cursor.execute("UPDATE transactions SET amount=? WHERE id=?", (target, rows[0][0]))
+                    elif target:
+                        cursor.execute(
+                            "INSERT INTO transactions (member_id, date, date_key, amount, type, description) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (member_id, date, key_from_jalali(year, index + 1), target, type_, GRID_DESCRIPTION)
+                        )
+                    changed += 1
+        logger.debug(f"{changed} خانه جدول ماهانه عضو {member_id} در سال {year} ذخیره شد")
+        return changed
+
+    def rebuild_monthly_rollup(self) -> int:
+        """بازسازی کامل جدول تجمیع ماهانه (برای دیتابیس‌های قدیمی یا بعد از ویرایش دستی)"""
+        with self.transaction() as cursor:
+            return rebuild_monthly_rollup(cursor)
+
+    def get_share_price(self, month_key: Optional[int] = None) -> int:
+        """قیمت سهم در یک ماه شمسی (yyyymm)؛ پیش‌فرض ماه جاری"""
         with self.transaction() as cursor:
-            cursor.execute("""
-                SELECT 
-                    SUM(CASE WHEN type='عضویت' THEN amount ELSE 0 END),
-                    SUM(CASE WHEN type='وام' THEN amount ELSE 0 END),
-                    SUM(CASE WHEN type='پرداخت' THEN amount ELSE 0 END)
-                FROM transactions WHERE member_id=?
-            """, (member_id,))
-            result = cursor.fetchone()
-            return {
-                'دارایی': int(result[0] or 0),
-                'وام‌ها': int(result[1] or 0),
-                'پرداخت‌ها': int(result[2] or 0)
-            }
-
-    def get_setting(self, key: str, default: Any = None) -> Any:
-        """دریافت تنظیمات"""
+            price = price_at(cursor, month_key or current_month())
+        return price if price is not None else int(self.get_setting("share_price", 2000000.0, float))
+
+    def set_share_price_schedule(self, base_price: int, monthly_increase: int, start_date: Optional[str] = None) -> int:
+        """ثبت قیمت پایه و افزایش ماهانه از تاریخ شروع؛ قیمت ماه‌های قبل حفظ می‌شود"""
+        with self.transaction() as cursor:
+            return rewrite_share_price_history(cursor, base_price, monthly_increase, start_date)
+
+    def get_setting(self, key: str, default: Any = None, cast: Optional[Callable[[str], Any]] = None) -> Any:
+        """دریافت تنظیمات از حافظه موقت؛ با cast مقدار به نوع دلخواه تبدیل می‌شود"""
         try:
-            result = self.execute_query(
-                "SELECT value FROM settings WHERE key = ?",
-                (key,),
-                fetch=True
-            )
-            return result[0][0] if result else default
+            # بیرون از batch هر خواندن data_version را بررسی می‌کند؛ داخل batch فقط اولین خواندن
+            in_batch = self.pool.batch_depth > 0
+            revalidate = not (in_batch and self._settings_checked)
+            value = self.pool.settings.get(self.conn, key, default, cast, revalidate=revalidate)
+            self._settings_checked = in_batch
+            return value
         except sqlite3.Error as e:
             logger.error(f"خطا در دریافت تنظیمات {key}: {str(e)}")
             return default
@@ -238,12 +417,13 @@ class DatabaseManager:
                 "INSERT OR REPLACE INTO settings (key, value, description) VALUES (?, ?, ?)",
                 (key, str(value), description)
             )
+            self.pool.settings.put(key, str(value))
         except sqlite3.Error as e:
             logger.error(f"خطا در ذخیره تنظیمات {key}: {str(e)}")
             raise
 
-    def backup_db(self, backup_path: str = None) -> str:
-        """ایجاد نسخه پشتیبان"""
+    def backup_db(self, backup_path: str = None, progress: Optional[ProgressCallback] = None) -> str:
+        """ایجاد نسخه پشتیبان آنلاین (بدون بستن اتصال و همراه با محتوای WAL)"""
         try:
             if not os.path.exists(BACKUP_DIR):
                 os.makedirs(BACKUP_DIR)
@@ -252,10 +432,7 @@ class DatabaseManager:
             default_backup_path = BACKUP_DIR / f"backup_{timestamp}.db"
             final_path = Path(backup_path) if backup_path else default_backup_path
             
-            self.conn.close()
-            shutil.copy2(self.db_path, final_path)
-            self.conn = sqlite3.connect(str(self.db_path))
-            self._apply_pragmas()
+            result = hot_backup(self.conn, final_path, progress=progress)
             
             max_backups = DatabaseConfig.CONFIG["backup"]["max_files"]
             backups = sorted(BACKUP_DIR.glob("backup_*.db"), key=os.path.getmtime)
@@ -263,11 +440,22 @@ class DatabaseManager:
                 os.remove(backups.pop(0))
                 
             logger.info(f"نسخه پشتیبان در {final_path} ایجاد شد")
-            return str(final_path)
+            return str(result.path)
         except Exception as e:
             logger.error(f"خطا در ایجاد نسخه پشتیبان: {str(e)}")
             raise
 
+    def snapshot(self, label: str = "backup") -> str:
+        """ثبت نسخه پشتیبان در مخزن فشرده و بدون تکرار، همراه با اعمال سقف max_files"""
+        try:
+            store = BackupStore()
+            info = store.snapshot(self.conn, label)
+            store.prune()
+            return str(info.manifest_path)
+        except Exception as e:
+            logger.error(f"خطا در ثبت نسخه پشتیبان در مخزن: {str(e)}")
+            raise
+
     def check_db_integrity(self) -> bool:
         """بررسی سلامت پایگاه داده"""
         try:
@@ -284,10 +472,15 @@ class DatabaseManager:
     def __enter__(self):
         return self
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    def close(self):
+        """برگرداندن اتصال به استخر؛ اتصال واقعی برای استفاده بعدی باز می‌ماند"""
         if self.conn:
-            self.conn.close()
-            logger.debug("اتصال دیتابیس بسته شد")
+            self.pool.release(self.conn)
+            self.conn = None
+            logger.debug("اتصال دیتابیس به استخر برگردانده شد")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 if __name__ == "__main__":
     with DatabaseManager() as db:
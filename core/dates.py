@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+کلید عددی تاریخ برای فیلتر بازه‌ای با ایندکس
+کلید همیشه تاریخ شمسی به شکل عدد yyyymmdd است (مثلاً ۱۴۰۳/۰۵/۰۱ ← 14030501).
+متن‌های ذخیره‌شده در دیتابیس چند قالب دارند؛ سال کمتر از ۱۷۰۰ شمسی و بقیه میلادی فرض می‌شود
+و جداکننده می‌تواند / یا - باشد. اگر روز نیامده باشد (مثل یادداشت‌های yyyy/mm) روز ۱ در نظر گرفته می‌شود.
+date_key_sql همین تبدیل (از جمله میلادی به شمسی) را با SQL خالص می‌سازد تا تریگرها به تابع پایتونی نیاز نداشته باشند.
+"""
+
+import re
+import sqlite3
+import logging
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+
+from jdatetime import MAXYEAR as JALALI_MAXYEAR, date as jdate
+
+from core.normalize import WHITESPACE, WHITESPACE_SQL, digit_at_sql, layer, normalize_digits
+
+logger = logging.getLogger(__name__)
+
+# سال‌های کمتر از این مقدار شمسی هستند
+JALALI_YEAR_LIMIT = 1700
+
+_DATE_PATTERN = re.compile(f"^[{WHITESPACE}]*([0-9]{{4}})[/-]([0-9]{{1,2}})(?:[/-]([0-9]{{1,2}}))?")
+
+KeyRange = Tuple[int, int]
+
+def _key(year: int, month: int, day: int) -> int:
+    return year * 10000 + month * 100 + day
+
+def key_from_jalali(year: int, month: int, day: int = 1) -> int:
+    return _key(int(year), int(month), int(day))
+
+def key_from_gregorian(value: Union[date, datetime]) -> int:
+    """کلید شمسی یک تاریخ میلادی"""
+    if isinstance(value, datetime):
+        value = value.date()
+    j = jdate.fromgregorian(date=value)
+    return _key(j.year, j.month, j.day)
+
+def date_key(text: Optional[str]) -> Optional[int]:
+    """تبدیل متن تاریخ ذخیره‌شده به کلید شمسی؛ برای متن نامعتبر None برمی‌گرداند"""
+    if not text:
+        return None
+    match = _DATE_PATTERN.match(normalize_digits(str(text)))
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    day = int(match.group(3)) if match.group(3) else 1
+    try:
+        if year < JALALI_YEAR_LIMIT:
+            if not (1 <= month <= 12 and 1 <= day <= 31):
+                return None
+            return _key(year, month, day)
+        return key_from_gregorian(date(year, month, day))
+    except ValueError:
+        return None
+
+def key_today() -> int:
+    return key_from_gregorian(date.today())
+
+def format_key(key: int) -> str:
+    """متن yyyy/mm/dd شمسی از روی کلید"""
+    return f"{key // 10000:04d}/{key // 100 % 100:02d}/{key % 100:02d}"
+
+def year_range(year: Union[int, str]) -> KeyRange:
+    """بازه کلید یک سال شمسی (برای BETWEEN)"""
+    year = int(year)
+    return _key(year, 0, 0), _key(year, 12, 99)
+
+def month_range(year: Union[int, str], month: Union[int, str]) -> KeyRange:
+    """بازه کلید یک ماه شمسی (برای BETWEEN)"""
+    year, month = int(year), int(month)
+    return _key(year, month, 0), _key(year, month, 99)
+
+def gregorian_range(start: Union[date, datetime], end: Union[date, datetime]) -> KeyRange:
+    """بازه کلید بین دو تاریخ میلادی (مثلاً مقدار QDateEdit)، شامل هر دو سر"""
+    return key_from_gregorian(start), key_from_gregorian(end)
+
+def add_months(key: int, months: int) -> int:
+    """کلید همان روز در n ماه بعد (روز بزرگ‌تر از ۲۹ در ماه‌های کوتاه‌تر به ۲۹ محدود می‌شود)"""
+    index = (key // 10000) * 12 + (key // 100 % 100 - 1) + months
+    year, month = index // 12, index % 12 + 1
+    last_day = 31 if month <= 6 else 30 if month <= 11 else 29
+    return _key(year, month, min(key % 100, last_day))
+
+def key_year(key: int) -> int:
+    return key // 10000
+
+def key_month(key: int) -> int:
+    return key // 100 % 100
+
+# روزهای گذشته از ابتدای سال میلادی تا ابتدای هر ماه (سه رقم برای هر ماه)
+_MONTH_OFFSETS = "000031059090120151181212243273304334"
+
+def date_key_sql(expr: str) -> str:
+    """عبارت SQL معادل date_key برای تریگرها و کوئری‌ها (بدون تابع پایتونی)
+
+    ده نویسه اول متن (پس از فاصله‌های ابتدا) با ارقام لاتین خوانده و الگوی yyyy/mm/dd بررسی می‌شود؛
+    تاریخ میلادی با همان محاسبه چرخه ۳۳ ساله jdatetime به شمسی تبدیل می‌شود.
+    """
+    chars = " || ".join(
+        f"COALESCE(NULLIF({digit_at_sql('t', i)}, ''), substr(t, {i}, 1))" for i in range(1, 11)
+    )
+    digit = "substr(p, {0}, 1) GLOB '[0-9]'"
+    separator = "substr(p, {0}, 1) IN ('/', '-')"
+    # طول ماه (۱ یا ۲ رقم) و سپس روز اختیاری بعد از جداکننده دوم؛ لایه‌ها کم نگه داشته شده‌اند تا
+    # عبارت داخل تریگرهای تو در تو از عمق مجاز پارسر SQLite بیشتر نشود
+    month_length = f"(1 + ({digit.format(7)}))"
+    parts = f"""
+        SELECT CASE WHEN {digit.format(1)} AND {digit.format(2)} AND {digit.format(3)} AND {digit.format(4)}
+                         AND {separator.format(5)} AND {digit.format(6)}
+                    THEN CAST(substr(p, 1, 4) AS INTEGER) END AS y,
+               CAST(substr(p, 6, {month_length}) AS INTEGER) AS m,
+               CASE WHEN {separator.format(f"6 + {month_length}")} AND {digit.format(f"7 + {month_length}")}
+                    THEN CAST(substr(p, 7 + {month_length}, 1 + ({digit.format(f"8 + {month_length}")})) AS INTEGER)
+                    ELSE 1 END AS d
+        FROM {layer(f"SELECT {chars} AS p FROM {layer(f'SELECT ltrim({expr}, {WHITESPACE_SQL}) AS t')}")}
+    """
+    # روزشمار میلادی و سپس چرخه‌های ۳۳ ساله و ۴ ساله شمسی
+    days = (
+        f"(355666 + 365 * y + (y + (m > 2) + 3) / 4 - (y + (m > 2) + 99) / 100 + (y + (m > 2) + 399) / 400"
+        f" + d + CAST(substr('{_MONTH_OFFSETS}', m * 3 - 2, 3) AS INTEGER))"
+    )
+    cycles = f"""
+        SELECT y, m, d, -1595 + 33 * ({days} / 12053) + 4 * ({days} % 12053 / 1461) AS jy, {days} % 12053 % 1461 AS r
+        FROM {layer(parts)}
+    """
+    year = "jy + CASE WHEN r > 365 THEN (r - 1) / 365 ELSE 0 END"
+    day = "CASE WHEN r > 365 THEN (r - 1) % 365 ELSE r END"
+    iso = "printf('%04d-%02d-%02d', y, m, d)"
+    return f"""(SELECT CASE
+            WHEN y IS NULL THEN NULL
+            WHEN y < {JALALI_YEAR_LIMIT} THEN CASE WHEN m BETWEEN 1 AND 12 AND d BETWEEN 1 AND 31 THEN y * 10000 + m * 100 + d END
+            WHEN date(julianday({iso})) IS {iso} AND {year} <= {JALALI_MAXYEAR} THEN ({year}) * 10000 + CASE
+                WHEN {day} < 186 THEN (1 + ({day}) / 31) * 100 + 1 + ({day}) % 31
+                ELSE (7 + ({day} - 186) / 30) * 100 + 1 + ({day} - 186) % 30 END
+        END FROM {layer(cycles)})"""
+
+def register_sql_functions(conn: sqlite3.Connection) -> None:
+    """ثبت date_key(text) روی اتصال (فقط برای تریگرهای نسخه‌های قدیمی در زمان مهاجرت)"""
+    conn.create_function("date_key", 1, date_key, deterministic=True)
+
+if __name__ == "__main__":
+    print(date_key("1403/05/01"))  # 14030501
+    print(date_key("2025-04-02"))  # 14040113
+    print(date_key("1403/07"))  # 14030701
+    print(year_range(1403))  # (14030000, 14031299)
\ No newline at end of file
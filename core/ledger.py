@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+خواندن صفحه‌ای تراکنش‌ها و وام‌ها با صفحه‌بندی کلیدی (keyset)
+هر صفحه از آخرین کلید (تاریخ، شناسه) صفحه قبل ادامه می‌یابد؛ پس هزینه هر صفحه مستقل از
+تعداد ردیف‌های قبلی است و روی ایندکس تاریخ (که شناسه ردیف را هم دارد) بدون مرتب‌سازی اجرا می‌شود.
+با فیلتر نوع، ایندکس (نوع، تاریخ) همان ترتیب را می‌دهد و شمارش هم فقط از ایندکس خوانده می‌شود.
+وضعیت وام از دفتر اقساط (paid_amount و paid_installments) به دست می‌آید، چون ستون status با پرداخت آخرین قسط عوض نمی‌شود.
+"""
+
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+PAGE_SIZE = 200
+
+# (date_key, id) آخرین ردیف صفحه قبل
+PageKey = Tuple[int, int]
+
+_TRANSACTIONS = (
+    "SELECT t.id, t.date, m.name, t.amount, t.type, t.description, t.date_key "
+    "FROM transactions t JOIN members m ON t.member_id = m.id"
+)
+# وامی که مبلغ یا تعداد اقساطش کامل پرداخت شده، تسویه‌شده است
+_LOAN_SETTLED = "(l.paid_amount >= l.amount OR l.paid_installments >= l.installments)"
+_LOAN_STATUS_FILTERS = {
+    "فعال": f"l.status = 'فعال' AND NOT {_LOAN_SETTLED}",
+    "تسویه‌شده": f"(l.status IS NOT 'فعال' OR {_LOAN_SETTLED})",
+}
+
+_LOANS = (
+    "SELECT l.id, m.name, l.amount, l.start_date, l.end_date, l.installments, l.monthly_payment, "
+    f"CASE WHEN {_LOAN_SETTLED} THEN 'تسویه‌شده' ELSE l.status END, "
+    "l.start_date_key FROM loans l JOIN members m ON l.member_id = m.id"
+)
+
+def _filters(key_column: str, extra_column: str, start_key: int, end_key: int, extra: Optional[str]):
+    where = [f"{key_column} BETWEEN ? AND ?"]
+    params: list = [start_key, end_key]
+    if extra:
+        where.append(f"{extra_column} = ?")
+        params.append(extra)
+    return where, params
+
+def _loan_filters(start_key: int, end_key: int, status: Optional[str]):
+    """وضعیت‌های فعال و تسویه‌شده از دفتر اقساط؛ هر مقدار دیگر با ستون status مقایسه می‌شود"""
+    ledger_status = _LOAN_STATUS_FILTERS.get(status)
+    where, params = _filters("l.start_date_key", "l.status", start_key, end_key, None if ledger_status else status)
+    if ledger_status:
+        where.append(ledger_status)
+    return where, params
+
+def _page(
+    cursor: sqlite3.Cursor, select: str, key_column: str, id_column: str,
+    where: Sequence[str], params: Sequence, after: Optional[PageKey], limit: int
+) -> List[tuple]:
+    where, params = list(where), list(params)
+    if after is not None:
+        where.append(f"({key_column}, {id_column}) < (?, ?)")
+        params.extend(after)
+    cursor.execute(
+        f"{select} WHERE {' AND '.join(where)} ORDER BY {key_column} DESC, {id_column} DESC LIMIT ?",
+        (*params, limit)
+    )
+    return cursor.fetchall()
+
+def _count(cursor: sqlite3.Cursor, table: str, where: Sequence[str], params: Sequence) -> int:
+    # عضو هر ردیف با کلید خارجی (ON DELETE CASCADE) تضمین شده است؛ بدون JOIN شمارش فقط از ایندکس است
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {' AND '.join(where)}", tuple(params))
+    return cursor.fetchone()[0]
+
+def transactions_page(
+    cursor: sqlite3.Cursor, start_key: int, end_key: int, tx_type: Optional[str] = None,
+    after: Optional[PageKey] = None, limit: int = PAGE_SIZE
+) -> List[tuple]:
+    """ردیف‌های (id, date, name, amount, type, description, date_key) به ترتیب تاریخ نزولی"""
+    where, params = _filters("t.date_key", "t.type", start_key, end_key, tx_type)
+    return _page(cursor, _TRANSACTIONS, "t.date_key", "t.id", where, params, after, limit)
+
+def count_transactions(cursor: sqlite3.Cursor, start_key: int, end_key: int, tx_type: Optional[str] = None) -> int:
+    where, params = _filters("t.date_key", "t.type", start_key, end_key, tx_type)
+    return _count(cursor, "transactions t", where, params)
+
+def loans_page(
+    cursor: sqlite3.Cursor, start_key: int, end_key: int, status: Optional[str] = None,
+    after: Optional[PageKey] = None, limit: int = PAGE_SIZE
+) -> List[tuple]:
+    """ردیف‌های (id, name, amount, start_date, end_date, installments, monthly_payment, status, start_date_key)"""
+    where, params = _loan_filters(start_key, end_key, status)
+    return _page(cursor, _LOANS, "l.start_date_key", "l.id", where, params, after, limit)
+
+def count_loans(cursor: sqlite3.Cursor, start_key: int, end_key: int, status: Optional[str] = None) -> int:
+    where, params = _loan_filters(start_key, end_key, status)
+    return _count(cursor, "loans l", where, params)
+
+def page_key(row: Sequence) -> PageKey:
+    """کلید ادامه صفحه‌بندی از ردیف برگشتی (کلید تاریخ آخرین ستون است)"""
+    return row[-1], row[0]
\ No newline at end of file
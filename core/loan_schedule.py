@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+جدول اقساط پیش‌محاسبه‌شده وام‌ها
+برای هر وام یک ردیف به ازای هر قسط (سررسید، مبلغ مورد انتظار، مبلغ پرداخت‌شده) ساخته می‌شود.
+مبلغ پرداخت‌شده هر قسط از جمع کل اقساط وام (loans.paid_amount) و جمع اقساط قبلی به دست می‌آید
+و با تریگر روی loans به‌روز می‌ماند؛ پس «اقساط معوق» (core.delinquency) یک جستجوی ایندکسی است.
+ردیف‌ها را تریگرهای درج و ویرایش وام می‌سازند (core.migrations)؛ write_loan_schedule همان محاسبه برای بازسازی است.
+"""
+
+import sqlite3
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from core.dates import add_months
+
+logger = logging.getLogger(__name__)
+
+ScheduleRow = Tuple[int, int, int, int, int, int]
+
+def build_schedule(
+    loan_id: int,
+    amount: int,
+    installments: int,
+    start_key: int,
+    paid_amount: int = 0
+) -> List[ScheduleRow]:
+    """ردیف‌های اقساط یک وام؛ مبلغ به طور مساوی تقسیم و باقی‌مانده به اقساط اول اضافه می‌شود"""
+    base, extra = divmod(amount, installments)
+    rows = []
+    cumulative = 0
+    for seq in range(1, installments + 1):
+        expected = base + (1 if seq <= extra else 0)
+        paid = max(0, min(expected, paid_amount - cumulative))
+        rows.append((loan_id, seq, add_months(start_key, seq), expected, cumulative, paid))
+        cumulative += expected
+    return rows
+
+def write_loan_schedule(cursor: sqlite3.Cursor, loan_ids: Optional[Iterable[int]] = None) -> int:
+    """ساخت دوباره جدول اقساط وام‌های داده‌شده (یا همه وام‌ها) با یک درج گروهی"""
+    query = """
+        SELECT id, amount, installments, start_date_key, paid_amount FROM loans
+        WHERE installments > 0 AND amount > 0 AND start_date_key IS NOT NULL
+    """
+    params: Tuple = ()
+    if loan_ids is not None:
+        loan_ids = list(loan_ids)
+        if not loan_ids:
+            return 0
+        query += f" AND id IN ({', '.join('?' * len(loan_ids))})"
+        params = tuple(loan_ids)
+        cursor.execute(f"DELETE FROM loan_schedule WHERE loan_id IN ({', '.join('?' * len(loan_ids))})", params)
+    else:
+        cursor.execute("DELETE FROM loan_schedule")
+
+    rows: List[ScheduleRow] = []
+    for loan in cursor.execute(query, params).fetchall():
+        rows.extend(build_schedule(*loan))
+    cursor.executemany(
+        "INSERT INTO loan_schedule (loan_id, seq, due_key, expected, cumulative_before, paid) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    logger.info(f"{len(rows)} ردیف قسط در جدول اقساط وام‌ها نوشته شد")
+    return len(rows)
+
+def verify_loan_schedule(cursor: sqlite3.Cursor, repair: bool = True) -> List[int]:
+    """شناسه وام‌هایی که تعداد ردیف‌های اقساطشان با تعداد اقساط وام برابر نیست
+
+    در صورت repair، جدول اقساط همین وام‌ها دوباره ساخته می‌شود.
+    """
+    mismatched = [row[0] for row in cursor.execute("""
+        SELECT l.id FROM loans l
+        WHERE l.installments > 0 AND l.amount > 0 AND l.start_date_key IS NOT NULL
+          AND l.installments != (SELECT COUNT(*) FROM loan_schedule s WHERE s.loan_id = l.id)
+    """).fetchall()]
+    if mismatched:
+        logger.warning(f"جدول اقساط {len(mismatched)} وام ناقص است: {mismatched[:20]}")
+        if repair:
+            write_loan_schedule(cursor, mismatched)
+    return mismatched
+
+_INSTALLMENT_COLUMNS = """
+    s.loan_id, l.member_id, s.seq, s.due_key, s.expected, s.paid
+    FROM loan_schedule s JOIN loans l ON l.id = s.loan_id
+"""
+
+def overdue(cursor: sqlite3.Cursor, as_of_key: int) -> List[Tuple]:
+    """اقساط پرداخت‌نشده یا ناقص وام‌های فعال که سررسیدشان قبل از as_of_key گذشته است"""
+    return cursor.execute(f"""
+        SELECT {_INSTALLMENT_COLUMNS}
+        WHERE s.paid < s.expected AND s.due_key < ? AND l.status = 'فعال'
+        ORDER BY s.due_key, s.loan_id
+    """, (as_of_key,)).fetchall()
\ No newline at end of file
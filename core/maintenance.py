@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+ابزار نگهداری دیتابیس از خط فرمان
+
+اجرا: python -m core.maintenance <دستور>
+    rebuild-rollups   بازسازی جدول تجمیع ماهانه تراکنش‌ها
+    check-totals      مقایسه جمع‌های هر عضو با تراکنش‌ها و اصلاح اختلاف
+    rebuild-loans     نسبت دادن اقساط بدون وام و بازسازی جمع اقساط و جدول اقساط وام‌ها
+    check-schedule    بررسی اینکه هر وام به تعداد اقساطش ردیف در جدول اقساط دارد و اصلاح وام‌های ناقص
+    rebuild-search    بازسازی ایندکس جستجوی متنی اعضا و یادداشت‌ها
+    compact-changes   حذف ردیف‌هایی از change_log که همه مصرف‌کننده‌ها خوانده‌اند
+"""
+
+import sys
+import argparse
+import logging
+
+from core.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+def rebuild_rollups() -> int:
+    with DatabaseManager() as db:
+        count = db.rebuild_monthly_rollup()
+    print(f"جدول تجمیع ماهانه با {count} ردیف بازسازی شد")
+    return 0
+
+def check_totals() -> int:
+    with DatabaseManager() as db:
+        mismatched = db.verify_member_totals(repair=True)
+    if mismatched:
+        print(f"جمع‌های {len(mismatched)} عضو اصلاح شد")
+    else:
+        print("جمع‌های اعضا با تراکنش‌ها همخوان است")
+    return 0
+
+def rebuild_loans() -> int:
+    with DatabaseManager() as db:
+        count = db.rebuild_loan_ledger(reattribute=True)
+        rows = db.rebuild_loan_schedule()
+    print(f"جمع اقساط {count} وام و {rows} ردیف جدول اقساط بازسازی شد")
+    return 0
+
+def check_schedule() -> int:
+    with DatabaseManager() as db:
+        mismatched = db.verify_loan_schedule(repair=True)
+    if mismatched:
+        print(f"جدول اقساط {len(mismatched)} وام اصلاح شد")
+    else:
+        print("همه وام‌ها جدول اقساط کامل دارند")
+    return 0
+
+def rebuild_search() -> int:
+    with DatabaseManager() as db:
+        db.rebuild_search_index()
+    print("ایندکس جستجوی اعضا و یادداشت‌ها بازسازی شد")
+    return 0
+
+def compact_changes() -> int:
+    with DatabaseManager() as db:
+        removed = db.compact_change_log()
+    print(f"{removed} ردیف از change_log حذف شد")
+    return 0
+
+COMMANDS = {
+    "rebuild-rollups": (rebuild_rollups, "بازسازی جدول تجمیع ماهانه تراکنش‌ها"),
+    "check-totals": (check_totals, "خودآزمایی و بازسازی جمع‌های هر عضو"),
+    "rebuild-loans": (rebuild_loans, "نسبت دادن اقساط بدون وام و بازسازی دفتر وام‌ها"),
+    "check-schedule": (check_schedule, "خودآزمایی و اصلاح جدول اقساط وام‌ها"),
+    "rebuild-search": (rebuild_search, "بازسازی ایندکس جستجوی متنی اعضا و یادداشت‌ها"),
+    "compact-changes": (compact_changes, "فشرده‌سازی change_log تا جایگاه کندترین مصرف‌کننده"),
+}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.maintenance", description="ابزار نگهداری دیتابیس صندوق")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args(argv)
+    try:
+        return COMMANDS[args.command][0]()
+    except Exception as e:
+        logger.error(f"خطا در اجرای دستور {args.command}: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
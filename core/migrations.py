@@ -0,0 +1,1274 @@
+# -*- coding: utf-8 -*-
+"""
+مهاجرت‌های نسخه‌دار ساختار پایگاه داده
+هر مرحله شماره‌ای دارد که پس از اجرا در PRAGMA user_version ثبت می‌شود؛
+تغییرات ساختاری نسخه‌های بعدی (ستون، ایندکس، جدول) باید به صورت مرحله جدید اضافه شوند.
+DDL هر مرحله همان است که هنگام نوشتن آن اجرا می‌شد و داخل همین فایل ثابت مانده؛
+مراحل از توابع ساخت و محاسبه ماژول‌های دیگر (تاریخ، یکسان‌سازی، ماه‌ها) استفاده نمی‌کنند و نسخه ثابت
+آن‌ها در همین فایل کپی شده، تا تغییر آن ماژول‌ها پایگاه داده‌ای را که بعداً از نسخه قدیمی ارتقا می‌یابد
+به ساختار یا داده متفاوتی نبرد
+"""
+
+import sqlite3
+import logging
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str):
+    """ثبت یک مرحله مهاجرت؛ شماره‌ها باید پشت سر هم و صعودی باشند"""
+    def decorator(func: Callable[[sqlite3.Cursor], None]):
+        expected = len(MIGRATIONS) + 1
+        if version != expected:
+            raise ValueError(f"شماره مهاجرت {version} نامعتبر است؛ انتظار {expected}")
+        MIGRATIONS.append(Migration(version, description, func))
+        return func
+    return decorator
+
+# نسخه ثابت توابع تاریخ و یکسان‌سازی ماژول‌های دیگر در زمان نوشتن مراحل؛ عبارت‌های SQL خروجی
+# core.dates.date_key_sql و core.normalize.normalize_*_sql هنگام مرحله ۱۷ هستند و {value} عبارت ورودی است.
+# تابع‌های date_key، normalize_text و normalize_phone تریگرهای پیش از ۱۷ و محاسبه‌های پایتونی مراحل
+# هم با همین عبارت‌ها روی یک اتصال حافظه‌ای اجرا می‌شوند تا ارتقا از نسخه قدیمی به کد فعلی وابسته نباشد
+_DATE_KEY_SQL = """
+    (SELECT CASE WHEN y IS NULL THEN NULL WHEN y < 1700 THEN CASE WHEN m BETWEEN 1 AND 12 AND d BETWEEN 1 AND 31
+    THEN y * 10000 + m * 100 + d END WHEN date(julianday(printf('%04d-%02d-%02d', y, m, d))) IS
+    printf('%04d-%02d-%02d', y, m, d) AND jy + CASE WHEN r > 365 THEN (r - 1) / 365 ELSE 0 END <= 9377 THEN (jy
+    + CASE WHEN r > 365 THEN (r - 1) / 365 ELSE 0 END) * 10000 + CASE WHEN CASE WHEN r > 365 THEN (r - 1) % 365
+    ELSE r END < 186 THEN (1 + (CASE WHEN r > 365 THEN (r - 1) % 365 ELSE r END) / 31) * 100 + 1 + (CASE WHEN r
+    > 365 THEN (r - 1) % 365 ELSE r END) % 31 ELSE (7 + (CASE WHEN r > 365 THEN (r - 1) % 365 ELSE r END - 186)
+    / 30) * 100 + 1 + (CASE WHEN r > 365 THEN (r - 1) % 365 ELSE r END - 186) % 30 END END FROM ( SELECT y, m,
+    d, -1595 + 33 * ((355666 + 365 * y + (y + (m > 2) + 3) / 4 - (y + (m > 2) + 99) / 100 + (y + (m > 2) + 399)
+    / 400 + d + CAST(substr('000031059090120151181212243273304334', m * 3 - 2, 3) AS INTEGER)) / 12053) + 4 *
+    ((355666 + 365 * y + (y + (m > 2) + 3) / 4 - (y + (m > 2) + 99) / 100 + (y + (m > 2) + 399) / 400 + d +
+    CAST(substr('000031059090120151181212243273304334', m * 3 - 2, 3) AS INTEGER)) % 12053 / 1461) AS jy,
+    (355666 + 365 * y + (y + (m > 2) + 3) / 4 - (y + (m > 2) + 99) / 100 + (y + (m > 2) + 399) / 400 + d +
+    CAST(substr('000031059090120151181212243273304334', m * 3 - 2, 3) AS INTEGER)) % 12053 % 1461 AS r FROM (
+    SELECT CASE WHEN substr(p, 1, 1) GLOB '[0-9]' AND substr(p, 2, 1) GLOB '[0-9]' AND substr(p, 3, 1) GLOB
+    '[0-9]' AND substr(p, 4, 1) GLOB '[0-9]' AND substr(p, 5, 1) IN ('/', '-') AND substr(p, 6, 1) GLOB '[0-9]'
+    THEN CAST(substr(p, 1, 4) AS INTEGER) END AS y, CAST(substr(p, 6, (1 + (substr(p, 7, 1) GLOB '[0-9]'))) AS
+    INTEGER) AS m, CASE WHEN substr(p, 6 + (1 + (substr(p, 7, 1) GLOB '[0-9]')), 1) IN ('/', '-') AND substr(p,
+    7 + (1 + (substr(p, 7, 1) GLOB '[0-9]')), 1) GLOB '[0-9]' THEN CAST(substr(p, 7 + (1 + (substr(p, 7, 1) GLOB
+    '[0-9]')), 1 + (substr(p, 8 + (1 + (substr(p, 7, 1) GLOB '[0-9]')), 1) GLOB '[0-9]')) AS INTEGER) ELSE 1 END
+    AS d FROM (SELECT COALESCE(NULLIF(substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t, 1, 1)) * (length(t) >= 1), 1), ''), substr(t, 1, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    2, 1)) * (length(t) >= 2), 1), ''), substr(t, 2, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    3, 1)) * (length(t) >= 3), 1), ''), substr(t, 3, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    4, 1)) * (length(t) >= 4), 1), ''), substr(t, 4, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    5, 1)) * (length(t) >= 5), 1), ''), substr(t, 5, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    6, 1)) * (length(t) >= 6), 1), ''), substr(t, 6, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    7, 1)) * (length(t) >= 7), 1), ''), substr(t, 7, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    8, 1)) * (length(t) >= 8), 1), ''), substr(t, 8, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    9, 1)) * (length(t) >= 9), 1), ''), substr(t, 9, 1)) ||
+    COALESCE(NULLIF(substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(t,
+    10, 1)) * (length(t) >= 10), 1), ''), substr(t, 10, 1)) AS p FROM (SELECT ltrim({value}, char(9, 10, 11, 12,
+    13, 32, 160)) AS t LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0))
+"""
+
+_NORMALIZE_TEXT_SQL = """
+    (SELECT lower(trim(replace(replace(replace(replace(replace(replace(v, char(12), char(32)), char(13),
+    char(32)), char(160), char(32)), ' ', ' ' || char(8204)), char(8204) || ' ', ''), char(8204), ''), ' ')) AS
+    v FROM (SELECT
+    replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(v,
+    char(1629), ''), char(1630), ''), char(1631), ''), char(1648), ''), char(1600), ''), char(8204), ''),
+    char(8205), ''), char(8206), ''), char(8207), ''), char(9), char(32)), char(10), char(32)), char(11),
+    char(32)) AS v FROM (SELECT
+    replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(v,
+    char(1617), ''), char(1618), ''), char(1619), ''), char(1620), ''), char(1621), ''), char(1622), ''),
+    char(1623), ''), char(1624), ''), char(1625), ''), char(1626), ''), char(1627), ''), char(1628), '') AS v
+    FROM (SELECT
+    replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(v,
+    char(1636), char(52)), char(1637), char(53)), char(1638), char(54)), char(1639), char(55)), char(1640),
+    char(56)), char(1641), char(57)), char(1611), ''), char(1612), ''), char(1613), ''), char(1614), ''),
+    char(1615), ''), char(1616), '') AS v FROM (SELECT
+    replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(v,
+    char(1778), char(50)), char(1779), char(51)), char(1780), char(52)), char(1781), char(53)), char(1782),
+    char(54)), char(1783), char(55)), char(1784), char(56)), char(1785), char(57)), char(1632), char(48)),
+    char(1633), char(49)), char(1634), char(50)), char(1635), char(51)) AS v FROM (SELECT
+    replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(replace(v,
+    char(1610), char(1740)), char(1609), char(1740)), char(1603), char(1705)), char(1577), char(1607)),
+    char(1728), char(1607)), char(1571), char(1575)), char(1573), char(1575)), char(1570), char(1575)),
+    char(1649), char(1575)), char(1572), char(1608)), char(1776), char(48)), char(1777), char(49)) AS v FROM
+    (SELECT {value} AS v LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0) LIMIT -1
+    OFFSET 0) LIMIT -1 OFFSET 0))
+"""
+
+_NORMALIZE_PHONE_SQL = """
+    (SELECT CASE WHEN d = '' THEN NULL WHEN substr(d, 1, 4) = '0098' THEN '0' || substr(d, 5) WHEN substr(d, 1,
+    2) = '98' AND (substr(ltrim(phone, char(9, 10, 11, 12, 13, 32, 160)), 1, 1) = '+' OR length(d) = 12) THEN
+    '0' || substr(d, 3) ELSE d END FROM (SELECT phone, substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 1, 1)) * (length(phone) >= 1), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 2, 1)) *
+    (length(phone) >= 2), 1) || substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩',
+    substr(phone, 3, 1)) * (length(phone) >= 3), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 4, 1)) * (length(phone) >= 4), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 5, 1)) *
+    (length(phone) >= 5), 1) || substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩',
+    substr(phone, 6, 1)) * (length(phone) >= 6), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 7, 1)) * (length(phone) >= 7), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 8, 1)) *
+    (length(phone) >= 8), 1) || substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩',
+    substr(phone, 9, 1)) * (length(phone) >= 9), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 10, 1)) * (length(phone) >= 10), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 11, 1)) *
+    (length(phone) >= 11), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 12, 1)) * (length(phone) >= 12), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 13, 1)) *
+    (length(phone) >= 13), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 14, 1)) * (length(phone) >= 14), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 15, 1)) *
+    (length(phone) >= 15), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 16, 1)) * (length(phone) >= 16), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 17, 1)) *
+    (length(phone) >= 17), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 18, 1)) * (length(phone) >= 18), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 19, 1)) *
+    (length(phone) >= 19), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 20, 1)) * (length(phone) >= 20), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 21, 1)) *
+    (length(phone) >= 21), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 22, 1)) * (length(phone) >= 22), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 23, 1)) *
+    (length(phone) >= 23), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 24, 1)) * (length(phone) >= 24), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 25, 1)) *
+    (length(phone) >= 25), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 26, 1)) * (length(phone) >= 26), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 27, 1)) *
+    (length(phone) >= 27), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 28, 1)) * (length(phone) >= 28), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 29, 1)) *
+    (length(phone) >= 29), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 30, 1)) * (length(phone) >= 30), 1) ||
+    substr('012345678901234567890123456789', instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 31, 1)) *
+    (length(phone) >= 31), 1) || substr('012345678901234567890123456789',
+    instr('0123456789۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', substr(phone, 32, 1)) * (length(phone) >= 32), 1) AS d FROM (SELECT
+    {value} AS phone LIMIT -1 OFFSET 0) LIMIT -1 OFFSET 0))
+"""
+
+def _date_key_sql(expr: str) -> str:
+    return _DATE_KEY_SQL.replace("{value}", expr)
+
+def _normalize_text_sql(expr: str) -> str:
+    return _NORMALIZE_TEXT_SQL.replace("{value}", expr)
+
+def _normalize_phone_sql(expr: str) -> str:
+    return _NORMALIZE_PHONE_SQL.replace("{value}", expr)
+
+_EVALUATOR = sqlite3.connect(":memory:", check_same_thread=False)
+_EVALUATOR_LOCK = threading.Lock()
+
+def _evaluate(template: str) -> Callable[[Optional[str]], Any]:
+    query = f"SELECT {template.replace('{value}', '?')}"
+
+    def function(value: Optional[str]) -> Any:
+        with _EVALUATOR_LOCK:
+            return _EVALUATOR.execute(query, (value,)).fetchone()[0]
+    return function
+
+_date_key = _evaluate(_DATE_KEY_SQL)
+_normalize_text = _evaluate(_NORMALIZE_TEXT_SQL)
+_normalize_phone = _evaluate(_NORMALIZE_PHONE_SQL)
+
+def _register_sql_functions(conn: sqlite3.Connection) -> None:
+    """توابعی که تریگرهای نسخه‌های پیش از ۱۷ صدا می‌زنند (تا جایگزینی در مرحله ۱۷)"""
+    conn.create_function("date_key", 1, _date_key, deterministic=True)
+    conn.create_function("normalize_text", 1, _normalize_text, deterministic=True)
+    conn.create_function("normalize_phone", 1, _normalize_phone, deterministic=True)
+
+def _key_today() -> int:
+    return _date_key(date.today().isoformat())
+
+def _month_index(month_key: int) -> int:
+    """شماره ترتیبی ماه yyyymm"""
+    return (month_key // 100) * 12 + (month_key % 100) - 1
+
+def _month_from_index(index: int) -> int:
+    return (index // 12) * 100 + index % 12 + 1
+
+def _add_months(key: int, months: int) -> int:
+    """کلید همان روز در n ماه بعد؛ روز بزرگ‌تر از طول ماه مقصد به آخر ماه محدود می‌شود"""
+    index = (key // 10000) * 12 + (key // 100 % 100 - 1) + months
+    year, month = index // 12, index % 12 + 1
+    last_day = 31 if month <= 6 else 30 if month <= 11 else 29
+    return year * 10000 + month * 100 + min(key % 100, last_day)
+
+def _column_names(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+@migration(1, "جداول و ایندکس‌های پایه")
+def _create_base_schema(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            membership_code TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            family_name TEXT,
+            phone TEXT,
+            account_number TEXT,
+            join_date TEXT NOT NULL,
+            balance REAL DEFAULT 0.0,
+            status TEXT DEFAULT 'فعال'
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            type TEXT NOT NULL,
+            description TEXT,
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            amount REAL NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            installments INTEGER NOT NULL,
+            monthly_payment REAL NOT NULL,
+            status TEXT DEFAULT 'فعال',
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            date TEXT NOT NULL,
+            note TEXT NOT NULL,
+            linked_cell TEXT,  -- ستون جدید برای لینک به سلول
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            description TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_member_date ON transactions(member_id, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_loans_member ON loans(member_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_member_date ON notes(member_id, date)")
+
+@migration(2, "ستون end_date وام‌ها و linked_cell یادداشت‌ها برای دیتابیس‌های قدیمی")
+def _add_legacy_columns(cursor: sqlite3.Cursor) -> None:
+    if "end_date" not in _column_names(cursor, "loans"):
+        cursor.execute("ALTER TABLE loans ADD COLUMN end_date TEXT")
+        logger.info("ستون end_date به جدول loans اضافه شد")
+    if "linked_cell" not in _column_names(cursor, "notes"):
+        cursor.execute("ALTER TABLE notes ADD COLUMN linked_cell TEXT")
+        logger.info("ستون linked_cell به جدول notes اضافه شد")
+
+@migration(3, "تنظیمات پیش‌فرض")
+def _insert_default_settings(cursor: sqlite3.Cursor) -> None:
+    default_settings = [
+        ("share_price", "2000000", "قیمت هر سهم به ریال"),
+        ("monthly_increase", "0", "افزایش ماهانه سهام"),
+        ("loan_factor", "2", "ضریب وام"),
+        ("share_price_start_date", "", "تاریخ شروع قیمت سهام"),
+        ("fund_balance", "0", "موجودی صندوق"),
+        ("backup_enabled", "1", "فعال بودن بکاپ خودکار")
+    ]
+    cursor.executemany(
+        "INSERT OR IGNORE INTO settings (key, value, description) VALUES (?, ?, ?)",
+        default_settings
+    )
+
+@migration(4, "جدول موجودی حساب‌های بانکی صندوق")
+def _create_fund_balances(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS fund_balances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bank_name TEXT NOT NULL,
+            amount REAL NOT NULL
+        )
+    """)
+
+# تریگرهای تجمیع ماهانه به شکلی که مراحل ۵ و ۷ ساخته‌اند؛ سال، ماه و شرط ردیف عبارت‌هایی روی {row} هستند
+def _monthly_rollup_triggers(year: str, month: str, condition: str) -> List[str]:
+    def add(row: str) -> str:
+        return f"""
+            INSERT INTO transaction_monthly (member_id, year, month, type, total, tx_count)
+            SELECT {row}.member_id, {year.format(row=row)}, {month.format(row=row)}, {row}.type, {row}.amount, 1
+            WHERE {condition.format(row=row)}
+            ON CONFLICT (member_id, year, month, type)
+            DO UPDATE SET total = total + excluded.total, tx_count = tx_count + 1;
+        """
+
+    def remove(row: str) -> str:
+        key = (
+            f"member_id = {row}.member_id AND year = {year.format(row=row)} "
+            f"AND month = {month.format(row=row)} AND type = {row}.type"
+        )
+        return f"""
+            UPDATE transaction_monthly SET total = total - {row}.amount, tx_count = tx_count - 1 WHERE {key};
+            DELETE FROM transaction_monthly WHERE {key} AND tx_count <= 0;
+        """
+
+    return [
+        f"CREATE TRIGGER trg_transactions_monthly_insert AFTER INSERT ON transactions BEGIN {add('NEW')} END",
+        f"CREATE TRIGGER trg_transactions_monthly_delete AFTER DELETE ON transactions BEGIN {remove('OLD')} END",
+        f"""
+            CREATE TRIGGER trg_transactions_monthly_update
+            AFTER UPDATE OF member_id, date, amount, type ON transactions
+            BEGIN {remove('OLD')} {add('NEW')} END
+        """,
+    ]
+
+def _fill_monthly_rollup(cursor: sqlite3.Cursor, year: str, month: str, condition: str) -> None:
+    cursor.execute("DELETE FROM transaction_monthly")
+    cursor.execute(f"""
+        INSERT INTO transaction_monthly (member_id, year, month, type, total, tx_count)
+        SELECT member_id, {year.format(row="transactions")}, {month.format(row="transactions")},
+               type, SUM(amount), COUNT(*)
+        FROM transactions
+        WHERE {condition.format(row="transactions")}
+        GROUP BY 1, 2, 3, 4
+    """)
+
+_MONTHLY_TABLE = """
+    CREATE TABLE IF NOT EXISTS transaction_monthly (
+        member_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        total {money} NOT NULL DEFAULT 0,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (member_id, year, month, type)
+    ) WITHOUT ROWID
+"""
+
+# مرحله ۵: سال و ماه از ابتدای متن تاریخ
+_TEXT_YEAR = "CAST(substr({row}.date, 1, 4) AS INTEGER)"
+_TEXT_MONTH = "CAST(substr({row}.date, 6, 2) AS INTEGER)"
+_TEXT_CONDITION = "{row}.member_id IS NOT NULL"
+
+@migration(5, "جدول تجمیع ماهانه تراکنش‌ها با تریگر و پر کردن اولیه آن")
+def _create_monthly_rollup(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(_MONTHLY_TABLE.format(money="REAL"))
+    for ddl in _monthly_rollup_triggers(_TEXT_YEAR, _TEXT_MONTH, _TEXT_CONDITION):
+        cursor.execute(ddl)
+    _fill_monthly_rollup(cursor, _TEXT_YEAR, _TEXT_MONTH, _TEXT_CONDITION)
+
+# تریگرهای member_totals؛ merge مقدار جدید last_activity در upsert و latest عبارت تجمیعی آن روی ستون date است
+def _member_totals_triggers(merge: str, latest: str) -> List[str]:
+    def amount(row: str, type_: str) -> str:
+        return f"CASE WHEN {row}.type = '{type_}' THEN {row}.amount ELSE 0 END"
+
+    def add(row: str) -> str:
+        return f"""
+            INSERT INTO member_totals (member_id, membership_total, loan_total, installment_total, tx_count, last_activity)
+            SELECT {row}.member_id, {amount(row, "عضویت")}, {amount(row, "وام")}, {amount(row, "پرداخت")}, 1, {row}.date
+            WHERE {row}.member_id IS NOT NULL
+            ON CONFLICT (member_id) DO UPDATE SET
+                membership_total = membership_total + excluded.membership_total,
+                loan_total = loan_total + excluded.loan_total,
+                installment_total = installment_total + excluded.installment_total,
+                tx_count = tx_count + 1,
+                last_activity = {merge};
+        """
+
+    def remove(row: str) -> str:
+        return f"""
+            UPDATE member_totals SET
+                membership_total = membership_total - {amount(row, "عضویت")},
+                loan_total = loan_total - {amount(row, "وام")},
+                installment_total = installment_total - {amount(row, "پرداخت")},
+                tx_count = tx_count - 1,
+                last_activity = (SELECT {latest} FROM transactions WHERE member_id = {row}.member_id)
+            WHERE member_id = {row}.member_id;
+        """
+
+    return [
+        f"CREATE TRIGGER trg_transactions_totals_insert AFTER INSERT ON transactions BEGIN {add('NEW')} END",
+        f"CREATE TRIGGER trg_transactions_totals_delete AFTER DELETE ON transactions BEGIN {remove('OLD')} END",
+        f"""
+            CREATE TRIGGER trg_transactions_totals_update
+            AFTER UPDATE OF member_id, date, amount, type ON transactions
+            BEGIN {remove('OLD')} {add('NEW')} END
+        """,
+    ]
+
+def _fill_member_totals(cursor: sqlite3.Cursor, latest: str) -> None:
+    cursor.execute("DELETE FROM member_totals")
+    cursor.execute(f"""
+        INSERT INTO member_totals (member_id, membership_total, loan_total, installment_total, tx_count, last_activity)
+        SELECT member_id,
+               SUM(CASE WHEN type = 'عضویت' THEN amount ELSE 0 END),
+               SUM(CASE WHEN type = 'وام' THEN amount ELSE 0 END),
+               SUM(CASE WHEN type = 'پرداخت' THEN amount ELSE 0 END),
+               COUNT(*),
+               {latest}
+        FROM transactions
+        WHERE member_id IS NOT NULL
+        GROUP BY member_id
+    """)
+
+_MEMBER_TOTALS_TABLE = """
+    CREATE TABLE IF NOT EXISTS member_totals (
+        member_id INTEGER PRIMARY KEY REFERENCES members(id) ON DELETE CASCADE,
+        membership_total {money} NOT NULL DEFAULT 0,
+        loan_total {money} NOT NULL DEFAULT 0,
+        installment_total {money} NOT NULL DEFAULT 0,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        last_activity TEXT
+    )
+"""
+
+# مرحله ۶: آخرین فعالیت با مقایسه متنی تاریخ
+_TEXT_MERGE = "MAX(COALESCE(last_activity, ''), excluded.last_activity)"
+_TEXT_LATEST = "MAX(date)"
+
+@migration(6, "جدول جمع‌های هر عضو (member_totals) با تریگر و پر کردن اولیه آن")
+def _create_member_totals(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(_MEMBER_TOTALS_TABLE.format(money="REAL"))
+    for ddl in _member_totals_triggers(_TEXT_MERGE, _TEXT_LATEST):
+        cursor.execute(ddl)
+    _fill_member_totals(cursor, _TEXT_LATEST)
+
+# جدول ← (ستون متن تاریخ، ستون کلید عددی شمسی yyyymmdd)
+DATE_KEY_COLUMNS = {
+    "transactions": ("date", "date_key"),
+    "loans": ("start_date", "start_date_key"),
+    "notes": ("date", "date_key"),
+}
+
+# مرحله ۷: سال و ماه از تابع date_key (ثبت‌شده روی اتصال در زمان مهاجرت)
+_KEY_YEAR = "date_key({row}.date) / 10000"
+_KEY_MONTH = "date_key({row}.date) / 100 % 100"
+_KEY_CONDITION = "{row}.member_id IS NOT NULL AND date_key({row}.date) IS NOT NULL"
+
+@migration(7, "کلید عددی تاریخ شمسی با ایندکس برای تراکنش‌ها، وام‌ها و یادداشت‌ها")
+def _add_date_keys(cursor: sqlite3.Cursor) -> None:
+    for table, (text_column, key_column) in DATE_KEY_COLUMNS.items():
+        if key_column not in _column_names(cursor, table):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {key_column} INTEGER")
+        # ردیف‌هایی که برنامه کلیدشان را نفرستاده با تریگر تکمیل می‌شوند
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_{key_column}_insert AFTER INSERT ON {table}
+            WHEN NEW.{key_column} IS NULL
+            BEGIN UPDATE {table} SET {key_column} = date_key(NEW.{text_column}) WHERE id = NEW.id; END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_{table}_{key_column}_update AFTER UPDATE OF {text_column} ON {table}
+            BEGIN UPDATE {table} SET {key_column} = date_key(NEW.{text_column}) WHERE id = NEW.id; END
+        """)
+
+        cursor.execute(f"UPDATE {table} SET {key_column} = date_key({text_column}) WHERE {key_column} IS NULL")
+        converted = cursor.rowcount
+        invalid = cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {key_column} IS NULL").fetchone()[0]
+        logger.info(f"کلید تاریخ {converted} ردیف جدول {table} محاسبه شد")
+        if invalid:
+            logger.warning(f"{invalid} ردیف جدول {table} تاریخ نامعتبر دارد و کلید ندارد")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_key ON transactions(date_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_member_date_key ON transactions(member_id, date_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_loans_start_date_key ON loans(start_date_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_member_date_key ON notes(member_id, date_key)")
+
+    # سال و ماه جدول تجمیع هم از این به بعد از کلید شمسی گرفته می‌شود
+    for name in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_transactions_monthly_{name}")
+    for ddl in _monthly_rollup_triggers(_KEY_YEAR, _KEY_MONTH, _KEY_CONDITION):
+        cursor.execute(ddl)
+    _fill_monthly_rollup(cursor, _KEY_YEAR, _KEY_MONTH, _KEY_CONDITION)
+
+def _rebuild_table(cursor: sqlite3.Cursor, table: str, create_sql: str, conversions: Dict[str, str]) -> int:
+    """بازسازی جدول با تعریف جدید (روش پیشنهادی SQLite برای تغییر نوع ستون)
+
+    ایندکس‌ها و تریگرهای جدول و شمارنده AUTOINCREMENT حفظ می‌شوند؛
+    conversions برای هر ستون عبارت تبدیل مقدار قدیمی را مشخص می‌کند.
+    """
+    dependents = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name=? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (table,)).fetchone()
+    columns = _column_names(cursor, table)
+    expressions = [conversions.get(col, col) for col in columns]
+
+    cursor.execute(create_sql.format(table=f"{table}_new"))
+    cursor.execute(f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {', '.join(expressions)} FROM {table}")
+    copied = cursor.rowcount
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for (sql,) in dependents:
+        cursor.execute(sql)
+    if sequence:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name=?", (sequence[0], table))
+    return copied
+
+# ستون‌های مبلغ که از REAL به INTEGER (ریال صحیح) منتقل می‌شوند
+MONEY_TABLES = {
+    "transactions": ("""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            date TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            description TEXT,
+            date_key INTEGER,
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """, ("amount",)),
+    "loans": ("""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER,
+            amount INTEGER NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            installments INTEGER NOT NULL,
+            monthly_payment INTEGER NOT NULL,
+            status TEXT DEFAULT 'فعال',
+            start_date_key INTEGER,
+            FOREIGN KEY (member_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """, ("amount", "monthly_payment")),
+    "fund_balances": ("""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bank_name TEXT NOT NULL,
+            amount INTEGER NOT NULL
+        )
+    """, ("amount",)),
+}
+
+@migration(8, "ذخیره مبالغ به صورت عدد صحیح ریال به جای REAL")
+def _convert_money_to_integer(cursor: sqlite3.Cursor) -> None:
+    for table, (create_sql, money_columns) in MONEY_TABLES.items():
+        conversions = {col: f"CAST(ROUND({col}) AS INTEGER)" for col in money_columns}
+        copied = _rebuild_table(cursor, table, create_sql, conversions)
+        logger.info(f"مبالغ {copied} ردیف جدول {table} به عدد صحیح تبدیل شد")
+
+    # جداول تجمیعی هم با ستون‌های صحیح از نو ساخته می‌شوند؛ تریگرهای آن‌ها روی transactions است
+    # و با بازسازی همان جدول حفظ شده‌اند
+    cursor.execute("DROP TABLE IF EXISTS transaction_monthly")
+    cursor.execute("DROP TABLE IF EXISTS member_totals")
+    cursor.execute(_MONTHLY_TABLE.format(money="INTEGER"))
+    _fill_monthly_rollup(cursor, _KEY_YEAR, _KEY_MONTH, _KEY_CONDITION)
+    cursor.execute(_MEMBER_TOTALS_TABLE.format(money="INTEGER"))
+    _fill_member_totals(cursor, _TEXT_LATEST)
+
+@migration(9, "جدول تاریخچه ماهانه قیمت سهام به جای محاسبه از روی تنظیمات")
+def _create_share_price_history(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS share_price_history (
+            month_key INTEGER PRIMARY KEY,
+            price INTEGER NOT NULL,
+            monthly_increase INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    settings = dict(cursor.execute(
+        "SELECT key, value FROM settings WHERE key IN ('share_price', 'monthly_increase', 'share_price_start_date')"
+    ).fetchall())
+    try:
+        base_price = int(float(settings.get("share_price") or 2000000))
+        monthly_increase = int(float(settings.get("monthly_increase") or 0))
+    except ValueError:
+        logger.warning("تنظیمات قیمت سهام نامعتبر است؛ قیمت پیش‌فرض ثبت شد")
+        base_price, monthly_increase = 2000000, 0
+    start_date = settings.get("share_price_start_date")
+    start_key = _date_key(start_date) if start_date else None
+    # بدون تاریخ شروع، فرمول قبلی افزایش ماهانه را اعمال نمی‌کرد و تاریخچه از ماه جاری شروع می‌شود
+    if not start_date:
+        monthly_increase = 0
+    monthly_increase = max(0, monthly_increase)
+    start = _month_index((start_key or _key_today()) // 100)
+    count = max(1, _month_index(_key_today() // 100) - start + 1)
+    cursor.executemany(
+        "INSERT INTO share_price_history (month_key, price, monthly_increase) VALUES (?, ?, ?)",
+        [(_month_from_index(start + i), base_price + monthly_increase * i, monthly_increase) for i in range(count)]
+    )
+
+def _first_open_loan(loans, key: int) -> Optional[List[int]]:
+    for loan in loans:
+        if loan[1] > key:
+            return None
+        if loan[2] > 0:
+            return loan
+    return None
+
+@migration(10, "اتصال اقساط به وام (loan_id) و جمع پرداخت‌های هر وام")
+def _create_loan_ledger(cursor: sqlite3.Cursor) -> None:
+    if "loan_id" not in _column_names(cursor, "transactions"):
+        cursor.execute("ALTER TABLE transactions ADD COLUMN loan_id INTEGER REFERENCES loans(id) ON DELETE SET NULL")
+    loan_columns = _column_names(cursor, "loans")
+    for column in ("paid_amount", "paid_installments"):
+        if column not in loan_columns:
+            cursor.execute(f"ALTER TABLE loans ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_loan ON transactions(loan_id)")
+
+    # اقساط قدیمی هر عضو به ترتیب تاریخ به قدیمی‌ترین وامی داده می‌شوند که شروع شده و تسویه نشده است
+    loans: Dict[int, List[List[int]]] = {}
+    for loan_id, member_id, amount, start_key, paid in cursor.execute("""
+        SELECT l.id, l.member_id, l.amount, l.start_date_key,
+               COALESCE((SELECT SUM(amount) FROM transactions WHERE loan_id = l.id AND type = 'پرداخت'), 0)
+        FROM loans l
+        WHERE l.member_id IS NOT NULL AND l.start_date_key IS NOT NULL
+        ORDER BY l.member_id, l.start_date_key, l.id
+    """).fetchall():
+        loans.setdefault(member_id, []).append([loan_id, start_key, amount - paid])
+    assignments = []
+    for tx_id, member_id, amount, key in cursor.execute("""
+        SELECT id, member_id, amount, date_key FROM transactions
+        WHERE type = 'پرداخت' AND loan_id IS NULL AND member_id IS NOT NULL AND date_key IS NOT NULL
+        ORDER BY member_id, date_key, id
+    """).fetchall():
+        loan = _first_open_loan(loans.get(member_id, ()), key)
+        if loan is not None:
+            loan[2] -= amount
+            assignments.append((loan[0], tx_id))
+    cursor.executemany("UPDATE transactions SET loan_id = ? WHERE id = ?", assignments)
+    logger.info(f"{len(assignments)} قسط قدیمی به وام‌ها نسبت داده شد")
+
+    def apply(row: str, sign: str) -> str:
+        return f"""
+            UPDATE loans SET
+                paid_amount = paid_amount {sign} {row}.amount,
+                paid_installments = paid_installments {sign} 1
+            WHERE id = {row}.loan_id AND {row}.type = 'پرداخت';
+        """
+
+    cursor.execute("""
+        CREATE TRIGGER trg_transactions_loan_attribute AFTER INSERT ON transactions
+        WHEN NEW.loan_id IS NULL AND NEW.type = 'پرداخت' AND NEW.member_id IS NOT NULL
+        BEGIN
+            UPDATE transactions SET loan_id = (
+                SELECT id FROM loans
+                WHERE member_id = NEW.member_id AND status = 'فعال' AND paid_amount < amount
+                  AND start_date_key <= date_key(NEW.date)
+                ORDER BY start_date_key, id LIMIT 1
+            ) WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_transactions_loan_insert AFTER INSERT ON transactions
+        WHEN NEW.loan_id IS NOT NULL
+        BEGIN {apply("NEW", "+")} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_transactions_loan_delete AFTER DELETE ON transactions
+        WHEN OLD.loan_id IS NOT NULL
+        BEGIN {apply("OLD", "-")} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_transactions_loan_update AFTER UPDATE OF loan_id, amount, type ON transactions
+        BEGIN {apply("OLD", "-")} {apply("NEW", "+")} END
+    """)
+    cursor.execute("""
+        UPDATE loans SET
+            paid_amount = COALESCE((
+                SELECT SUM(amount) FROM transactions WHERE loan_id = loans.id AND type = 'پرداخت'
+            ), 0),
+            paid_installments = (
+                SELECT COUNT(*) FROM transactions WHERE loan_id = loans.id AND type = 'پرداخت'
+            )
+    """)
+
+@migration(11, "جدول اقساط پیش‌محاسبه‌شده وام‌ها (loan_schedule)")
+def _create_loan_schedule(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loan_schedule (
+            loan_id INTEGER NOT NULL REFERENCES loans(id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            due_key INTEGER NOT NULL,
+            expected INTEGER NOT NULL,
+            cumulative_before INTEGER NOT NULL,
+            paid INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (loan_id, seq)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_loan_schedule_due ON loan_schedule(due_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_loan_schedule_open ON loan_schedule(due_key) WHERE paid < expected")
+    cursor.execute("""
+        CREATE TRIGGER trg_loans_schedule_paid AFTER UPDATE OF paid_amount ON loans
+        BEGIN
+            UPDATE loan_schedule
+            SET paid = MAX(0, MIN(expected, NEW.paid_amount - cumulative_before))
+            WHERE loan_id = NEW.id;
+        END
+    """)
+    # مبلغ هر وام به طور مساوی تقسیم و باقی‌مانده به اقساط اول اضافه می‌شود
+    rows = []
+    for loan_id, amount, installments, start_key, paid_amount in cursor.execute("""
+        SELECT id, amount, installments, start_date_key, paid_amount FROM loans
+        WHERE installments > 0 AND amount > 0 AND start_date_key IS NOT NULL
+    """).fetchall():
+        base, extra = divmod(amount, installments)
+        cumulative = 0
+        for seq in range(1, installments + 1):
+            expected = base + (1 if seq <= extra else 0)
+            paid = max(0, min(expected, paid_amount - cumulative))
+            rows.append((loan_id, seq, _add_months(start_key, seq), expected, cumulative, paid))
+            cumulative += expected
+    cursor.executemany(
+        "INSERT INTO loan_schedule (loan_id, seq, due_key, expected, cumulative_before, paid) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+
+# تریگرهای همگام‌سازی FTS؛ columns ستون ایندکس ← عبارت مقدار روی {row}
+def _fts_triggers(table: str, fts: str, columns: Dict[str, str], source_columns: Tuple[str, ...]) -> List[str]:
+    names = ", ".join(columns)
+
+    def values(row: str) -> str:
+        return ", ".join(expr.format(row=row) for expr in columns.values())
+
+    insert = f"INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {values('NEW')});"
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', OLD.id, {values('OLD')});"
+    return [
+        f"CREATE TRIGGER trg_{fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER trg_{fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER trg_{fts}_update AFTER UPDATE OF {', '.join(source_columns)} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+_FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+_MEMBER_SOURCE_COLUMNS = ("name", "family_name", "membership_code", "phone", "account_number")
+
+@migration(12, "ایندکس جستجوی متنی (FTS5) اعضا و یادداشت‌ها")
+def _create_search_index(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+            {", ".join(_MEMBER_SOURCE_COLUMNS)},
+            content='members', content_rowid='id',
+            tokenize='{_FTS_TOKENIZE}', prefix='2 3'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+            note, content='notes', content_rowid='id',
+            tokenize='{_FTS_TOKENIZE}', prefix='2 3'
+        )
+    """)
+    cursor.execute("INSERT INTO members_fts (members_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 5.0, 2.0, 2.0)')")
+    raw = {column: f"{{row}}.{column}" for column in _MEMBER_SOURCE_COLUMNS}
+    for ddl in (
+        _fts_triggers("members", "members_fts", raw, _MEMBER_SOURCE_COLUMNS)
+        + _fts_triggers("notes", "notes_fts", {"note": "{row}.note"}, ("note",))
+    ):
+        cursor.execute(ddl)
+    cursor.execute("INSERT INTO members_fts (members_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+# مرحله ۱۳: متن ایندکس با توابع normalize_text و normalize_phone (ثبت‌شده روی اتصال در زمان مهاجرت)
+_NORMALIZED_NAME = "normalize_text({row}.name || ' ' || COALESCE({row}.family_name, ''))"
+_NORMALIZED_MEMBER_COLUMNS = {
+    "name": _NORMALIZED_NAME,
+    "membership_code": "normalize_text({row}.membership_code)",
+    "phone": "normalize_phone({row}.phone)",
+    "account_number": "normalize_text({row}.account_number)",
+}
+_NORMALIZED_NOTE_COLUMNS = {"note": "normalize_text({row}.note)"}
+
+@migration(13, "کلیدهای یکسان‌شده فارسی (name_key, phone_key) و ایندکس متنی بدون محتوا")
+def _create_normalized_keys(cursor: sqlite3.Cursor) -> None:
+    keys = {"name_key": _NORMALIZED_NAME, "phone_key": "normalize_phone({row}.phone)"}
+    existing = _column_names(cursor, "members")
+    for column in keys:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE members ADD COLUMN {column} TEXT")
+    assignments = ", ".join(f"{column} = {expr.format(row='NEW')}" for column, expr in keys.items())
+    cursor.execute(f"""
+        CREATE TRIGGER trg_members_keys_insert AFTER INSERT ON members
+        BEGIN UPDATE members SET {assignments} WHERE id = NEW.id; END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_members_keys_update AFTER UPDATE OF name, family_name, phone ON members
+        BEGIN UPDATE members SET {assignments} WHERE id = NEW.id; END
+    """)
+    cursor.execute("UPDATE members SET " + ", ".join(f"{column} = {expr.format(row='members')}" for column, expr in keys.items()))
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_name_key ON members(name_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_phone_key ON members(phone_key)")
+
+    # جداول قبلی با محتوای خارجی، متن خام را ایندکس می‌کردند
+    cursor.execute("DROP TABLE IF EXISTS members_fts")
+    cursor.execute("DROP TABLE IF EXISTS notes_fts")
+    for fts, columns in (("members_fts", _NORMALIZED_MEMBER_COLUMNS), ("notes_fts", _NORMALIZED_NOTE_COLUMNS)):
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {", ".join(columns)},
+                content='', tokenize='{_FTS_TOKENIZE}', prefix='2 3'
+            )
+        """)
+    cursor.execute("INSERT INTO members_fts (members_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 2.0)')")
+    for name in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_members_fts_{name}")
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_notes_fts_{name}")
+    for ddl in (
+        _fts_triggers("members", "members_fts", _NORMALIZED_MEMBER_COLUMNS, _MEMBER_SOURCE_COLUMNS)
+        + _fts_triggers("notes", "notes_fts", _NORMALIZED_NOTE_COLUMNS, ("note",))
+    ):
+        cursor.execute(ddl)
+    for fts, table, columns in (
+        ("members_fts", "members", _NORMALIZED_MEMBER_COLUMNS),
+        ("notes_fts", "notes", _NORMALIZED_NOTE_COLUMNS),
+    ):
+        values = ", ".join(expr.format(row=table) for expr in columns.values())
+        cursor.execute(f"INSERT INTO {fts} (rowid, {', '.join(columns)}) SELECT id, {values} FROM {table}")
+
+@migration(14, "ایندکس‌های صفحه‌بندی تراکنش‌ها و وام‌ها بر اساس نوع/وضعیت و تاریخ")
+def _create_ledger_indexes(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_date_key ON transactions(type, date_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_loans_status_start_date_key ON loans(status, start_date_key)")
+
+# جدول ← (شناسه ردیف، عضو، سال، کلید، ستون‌های ثبت‌شونده) در مرحله ۱۵؛ سال با تابع date_key
+_LOGGED_TABLES_V15 = {
+    "members": ("{row}.id", "{row}.id", "NULL", "NULL",
+                ("membership_code", "name", "family_name", "phone", "account_number", "join_date", "balance", "status")),
+    "transactions": ("{row}.id", "{row}.member_id", "date_key({row}.date) / 10000", "NULL",
+                     ("member_id", "date", "amount", "type", "description")),
+    "loans": ("{row}.id", "{row}.member_id", "date_key({row}.start_date) / 10000", "NULL",
+              ("member_id", "amount", "start_date", "end_date", "installments", "monthly_payment", "status")),
+    "notes": ("{row}.id", "{row}.member_id", "date_key({row}.date) / 10000", "NULL",
+              ("member_id", "date", "note", "linked_cell")),
+    "settings": ("NULL", "NULL", "NULL", "{row}.key", ("key", "value", "description")),
+}
+
+@migration(15, "جدول change_log و تریگرهای ثبت تغییرات اعضا، تراکنش‌ها، وام‌ها، یادداشت‌ها و تنظیمات")
+def _create_change_log(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,  -- I / U / D
+            row_id INTEGER,
+            member_id INTEGER,
+            year INTEGER,
+            key TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log_consumers (
+            name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    for table, (*identity, columns) in _LOGGED_TABLES_V15.items():
+        def log(op: str, row: str, where: str = "") -> str:
+            values = ", ".join(expr.format(row=row) for expr in identity)
+            return (
+                f"INSERT INTO change_log (table_name, op, row_id, member_id, year, key) "
+                f"SELECT '{table}', '{op}', {values}{f' WHERE {where}' if where else ''};"
+            )
+        # ویرایشی که عضو یا سال ردیف را عوض کرده جایگاه قبلی را هم ثبت می‌کند
+        moved = " OR ".join(
+            f"({expr.format(row='OLD')}) IS NOT ({expr.format(row='NEW')})" for expr in identity[1:] if expr != "NULL"
+        )
+        update = log("U", "NEW")
+        if moved:
+            update = f"{log('U', 'OLD', moved)} {update}"
+        cursor.execute(f"CREATE TRIGGER trg_{table}_log_insert AFTER INSERT ON {table} BEGIN {log('I', 'NEW')} END")
+        cursor.execute(f"CREATE TRIGGER trg_{table}_log_delete AFTER DELETE ON {table} BEGIN {log('D', 'OLD')} END")
+        cursor.execute(
+            f"CREATE TRIGGER trg_{table}_log_update AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN {update} END"
+        )
+
+# مرحله ۱۶: ترتیب آخرین فعالیت با کلید شمسی تاریخ و سپس متن آن
+_ACTIVITY_ORDER_V16 = "printf('%08d', COALESCE(date_key({value}), 0)) || {value}"
+_KEY_MERGE = (
+    f"CASE WHEN {_ACTIVITY_ORDER_V16.format(value='excluded.last_activity')} "
+    f"> COALESCE({_ACTIVITY_ORDER_V16.format(value='last_activity')}, '') "
+    f"THEN excluded.last_activity ELSE last_activity END"
+)
+_KEY_LATEST = f"substr(MAX({_ACTIVITY_ORDER_V16.format(value='date')}), 9)"
+
+@migration(16, "آخرین فعالیت اعضا بر اساس کلید شمسی تاریخ به جای مقایسه متنی")
+def _order_last_activity_by_key(cursor: sqlite3.Cursor) -> None:
+    for name in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_transactions_totals_{name}")
+    for ddl in _member_totals_triggers(_KEY_MERGE, _KEY_LATEST):
+        cursor.execute(ddl)
+    _fill_member_totals(cursor, _KEY_LATEST)
+
+# مرحله ۱۷: هر کلید (تاریخ شمسی و کلیدهای یکسان‌شده عضو) فقط یک بار حساب می‌شود. برنامه کلید را همراه
+# ردیف می‌نویسد و برای نوشتن بدون کلید (مثلاً از sqlite3 ساده) یک تریگر آن را با SQL خالص پر می‌کند؛
+# تجمیع‌ها، انتساب اقساط، ایندکس متنی و change_log فقط ستون کلید ذخیره‌شده را می‌خوانند. ردیفی که کلیدش
+# هنوز پر نشده در آن‌ها حساب نمی‌شود و پر شدن کلید مثل ویرایش همان ستون اعمال می‌شود؛ تغییرات به صورت
+# افزایشی (کم کردن مقدار قبلی و افزودن مقدار جدید) ثبت می‌شوند تا ترتیب اجرای تریگرها اثری نداشته باشد
+def _date_key_fill_triggers(table: str, text_column: str, key_column: str) -> List[str]:
+    key = _date_key_sql(f"NEW.{text_column}")
+    return [
+        f"""
+            CREATE TRIGGER trg_{table}_{key_column}_insert AFTER INSERT ON {table}
+            WHEN NEW.{key_column} IS NULL
+            BEGIN UPDATE {table} SET {key_column} = {key} WHERE id = NEW.id; END
+        """,
+        # برنامه کلید را همراه تاریخ عوض می‌کند؛ فقط تاریخی که بدون کلید ویرایش شده دوباره حساب می‌شود
+        f"""
+            CREATE TRIGGER trg_{table}_{key_column}_update AFTER UPDATE OF {text_column} ON {table}
+            WHEN NEW.{text_column} IS NOT OLD.{text_column} AND NEW.{key_column} IS OLD.{key_column}
+            BEGIN UPDATE {table} SET {key_column} = {key} WHERE id = NEW.id; END
+        """,
+    ]
+
+# کلید یکسان‌شده ← (ستون‌های منبع، عبارت SQL خالص روی {row})؛ همان core.search.member_keys در پایتون
+_MEMBER_KEYS = {
+    "name_key": (("name", "family_name"), _normalize_text_sql("{row}.name || ' ' || COALESCE({row}.family_name, '')")),
+    "code_key": (("membership_code",), _normalize_text_sql("{row}.membership_code")),
+    "phone_key": (("phone",), _normalize_phone_sql("{row}.phone")),
+    "account_key": (("account_number",), _normalize_text_sql("{row}.account_number")),
+}
+
+def _member_key_fill_triggers() -> List[str]:
+    assignments = ", ".join(f"{column} = {expr.format(row='NEW')}" for column, (_, expr) in _MEMBER_KEYS.items())
+    sources = [source for columns, _ in _MEMBER_KEYS.values() for source in columns]
+    stale = " OR ".join(
+        "(" + " OR ".join(f"NEW.{source} IS NOT OLD.{source}" for source in columns) + f") AND NEW.{column} IS OLD.{column}"
+        for column, (columns, _) in _MEMBER_KEYS.items()
+    )
+    return [
+        f"""
+            CREATE TRIGGER trg_members_keys_insert AFTER INSERT ON members
+            WHEN NEW.name_key IS NULL
+            BEGIN UPDATE members SET {assignments} WHERE id = NEW.id; END
+        """,
+        f"""
+            CREATE TRIGGER trg_members_keys_update AFTER UPDATE OF {', '.join(sources)} ON members
+            WHEN {stale}
+            BEGIN UPDATE members SET {assignments} WHERE id = NEW.id; END
+        """,
+    ]
+
+# ستون ایندکس متنی اعضا ← کلید ذخیره‌شده؛ name_key خالی یعنی کلیدها هنوز پر نشده و ردیف در ایندکس نیست
+_MEMBER_FTS_KEYS = {"name": "name_key", "membership_code": "code_key", "phone": "phone_key", "account_number": "account_key"}
+
+def _member_fts_triggers() -> List[str]:
+    names = ", ".join(_MEMBER_FTS_KEYS)
+
+    def values(row: str) -> str:
+        return ", ".join(f"{row}.{key}" for key in _MEMBER_FTS_KEYS.values())
+
+    insert = f"INSERT INTO members_fts (rowid, {names}) SELECT NEW.id, {values('NEW')} WHERE NEW.name_key IS NOT NULL;"
+    delete = (
+        f"INSERT INTO members_fts (members_fts, rowid, {names}) "
+        f"SELECT 'delete', OLD.id, {values('OLD')} WHERE OLD.name_key IS NOT NULL;"
+    )
+    return [
+        f"CREATE TRIGGER trg_members_fts_insert AFTER INSERT ON members BEGIN {insert} END",
+        f"CREATE TRIGGER trg_members_fts_delete AFTER DELETE ON members BEGIN {delete} END",
+        (
+            f"CREATE TRIGGER trg_members_fts_update AFTER UPDATE OF {', '.join(_MEMBER_FTS_KEYS.values())} ON members "
+            f"BEGIN {delete} {insert} END"
+        ),
+    ]
+
+def _monthly_delta(row: str, sign: str) -> str:
+    """افزودن (+) یا کم کردن (-) یک تراکنش؛ خانه‌ای که به صفر برسد حذف می‌شود"""
+    key = (
+        f"member_id = {row}.member_id AND year = {row}.date_key / 10000 "
+        f"AND month = {row}.date_key / 100 % 100 AND type = {row}.type"
+    )
+    return f"""
+        INSERT INTO transaction_monthly (member_id, year, month, type, total, tx_count)
+        SELECT {row}.member_id, {row}.date_key / 10000, {row}.date_key / 100 % 100, {row}.type, {sign}{row}.amount, {sign}1
+        WHERE {row}.member_id IS NOT NULL AND {row}.date_key IS NOT NULL
+        ON CONFLICT (member_id, year, month, type)
+        DO UPDATE SET total = total + excluded.total, tx_count = tx_count + excluded.tx_count;
+        DELETE FROM transaction_monthly WHERE {key} AND tx_count = 0 AND total = 0;
+    """
+
+def _monthly_key_triggers() -> List[str]:
+    return [
+        f"CREATE TRIGGER trg_transactions_monthly_insert AFTER INSERT ON transactions BEGIN {_monthly_delta('NEW', '+')} END",
+        f"CREATE TRIGGER trg_transactions_monthly_delete AFTER DELETE ON transactions BEGIN {_monthly_delta('OLD', '-')} END",
+        f"""
+            CREATE TRIGGER trg_transactions_monthly_update
+            AFTER UPDATE OF member_id, date_key, amount, type ON transactions
+            BEGIN {_monthly_delta('OLD', '-')} {_monthly_delta('NEW', '+')} END
+        """,
+    ]
+
+def _type_amount(row: str, type_: str) -> str:
+    return f"CASE WHEN {row}.type = '{type_}' THEN {row}.amount ELSE 0 END"
+
+# آخرین فعالیت: تراکنش با بزرگ‌ترین کلید تاریخ و سپس متن تاریخ (جستجوی ایندکسی روی member_id, date_key)
+def _last_activity(member: str) -> str:
+    return f"(SELECT date FROM transactions WHERE member_id = {member} ORDER BY date_key DESC, date DESC LIMIT 1)"
+
+def _totals_add(row: str, activity: str) -> str:
+    return f"""
+        INSERT INTO member_totals (member_id, membership_total, loan_total, installment_total, tx_count, last_activity)
+        SELECT {row}.member_id, {_type_amount(row, "عضویت")}, {_type_amount(row, "وام")},
+               {_type_amount(row, "پرداخت")}, 1, {row}.date
+        WHERE {row}.member_id IS NOT NULL
+        ON CONFLICT (member_id) DO UPDATE SET
+            membership_total = membership_total + excluded.membership_total,
+            loan_total = loan_total + excluded.loan_total,
+            installment_total = installment_total + excluded.installment_total,
+            tx_count = tx_count + 1,
+            last_activity = {activity};
+    """
+
+def _totals_remove(row: str, activity: str) -> str:
+    return f"""
+        UPDATE member_totals SET
+            membership_total = membership_total - {_type_amount(row, "عضویت")},
+            loan_total = loan_total - {_type_amount(row, "وام")},
+            installment_total = installment_total - {_type_amount(row, "پرداخت")},
+            tx_count = tx_count - 1,
+            last_activity = {activity}
+        WHERE member_id = {row}.member_id;
+    """
+
+def _member_totals_key_triggers() -> List[str]:
+    # فقط وقتی ردیف حذف‌شده همان آخرین فعالیت بوده، آخرین فعالیت از تراکنش‌های دیگر عضو دوباره خوانده می‌شود
+    removed = f"CASE WHEN last_activity IS OLD.date THEN {_last_activity('OLD.member_id')} ELSE last_activity END"
+    return [
+        f"""
+            CREATE TRIGGER trg_transactions_totals_insert AFTER INSERT ON transactions
+            BEGIN {_totals_add("NEW", _last_activity("NEW.member_id"))} END
+        """,
+        f"""
+            CREATE TRIGGER trg_transactions_totals_delete AFTER DELETE ON transactions
+            BEGIN {_totals_remove("OLD", removed)} END
+        """,
+        # جمع‌ها به تاریخ بستگی ندارند؛ آخرین فعالیت را تریگر جداگانه تاریخ نگه می‌دارد
+        f"""
+            CREATE TRIGGER trg_transactions_totals_update
+            AFTER UPDATE OF member_id, amount, type ON transactions
+            BEGIN {_totals_remove("OLD", "last_activity")} {_totals_add("NEW", "last_activity")} END
+        """,
+        f"""
+            CREATE TRIGGER trg_transactions_activity_update
+            AFTER UPDATE OF member_id, date_key ON transactions
+            BEGIN
+                UPDATE member_totals SET last_activity = {_last_activity("OLD.member_id")}
+                WHERE member_id = OLD.member_id AND OLD.member_id IS NOT NEW.member_id AND last_activity IS OLD.date;
+                UPDATE member_totals SET last_activity = {_last_activity("NEW.member_id")}
+                WHERE member_id = NEW.member_id;
+            END
+        """,
+    ]
+
+def _attribute_payment(condition: str) -> str:
+    return f"""
+        WHEN NEW.loan_id IS NULL AND NEW.type = 'پرداخت' AND NEW.member_id IS NOT NULL AND {condition}
+        BEGIN
+            UPDATE transactions SET loan_id = (
+                SELECT id FROM loans
+                WHERE member_id = NEW.member_id AND status = 'فعال' AND paid_amount < amount
+                  AND start_date_key <= NEW.date_key
+                ORDER BY start_date_key, id LIMIT 1
+            ) WHERE id = NEW.id;
+        END
+    """
+
+# جدول ← (عضو، سال، ستون‌های ثبت‌شونده)؛ سال از کلید ذخیره‌شده و ستون تاریخ متنی با ستون کلیدش جایگزین
+# شده، چون هر تغییر تاریخ کلید را هم می‌نویسد (برنامه یا تریگر پر کردن کلید)
+_LOGGED_TABLES_V17 = {
+    "transactions": ("{row}.member_id", "{row}.date_key / 10000", ("member_id", "date_key", "amount", "type", "description")),
+    "loans": ("{row}.member_id", "{row}.start_date_key / 10000",
+              ("member_id", "amount", "start_date_key", "end_date", "installments", "monthly_payment", "status")),
+    "notes": ("{row}.member_id", "{row}.date_key / 10000", ("member_id", "date_key", "note", "linked_cell")),
+}
+
+def _log_key_triggers(table: str) -> List[str]:
+    member, year, columns = _LOGGED_TABLES_V17[table]
+
+    def log(op: str, row: str, where: str = "") -> str:
+        return (
+            f"INSERT INTO change_log (table_name, op, row_id, member_id, year, key) "
+            f"SELECT '{table}', '{op}', {row}.id, {member.format(row=row)}, {year.format(row=row)}, NULL"
+            f"{f' WHERE {where}' if where else ''};"
+        )
+
+    moved = " OR ".join(f"({expr.format(row='OLD')}) IS NOT ({expr.format(row='NEW')})" for expr in (member, year))
+    return [
+        f"CREATE TRIGGER trg_{table}_log_insert AFTER INSERT ON {table} BEGIN {log('I', 'NEW')} END",
+        f"CREATE TRIGGER trg_{table}_log_delete AFTER DELETE ON {table} BEGIN {log('D', 'OLD')} END",
+        (
+            f"CREATE TRIGGER trg_{table}_log_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"BEGIN {log('U', 'OLD', moved)} {log('U', 'NEW')} END"
+        ),
+    ]
+
+@migration(17, "کلیدهای تاریخ و جستجو یک بار نوشته می‌شوند و تریگرهای وابسته کلید ذخیره‌شده را می‌خوانند")
+def _read_stored_keys(cursor: sqlite3.Cursor) -> None:
+    for table, (text_column, key_column) in DATE_KEY_COLUMNS.items():
+        for suffix in ("insert", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{key_column}_{suffix}")
+        for ddl in _date_key_fill_triggers(table, text_column, key_column):
+            cursor.execute(ddl)
+        # کلیدهای قدیمی با تابع پایتونی حساب شده‌اند؛ قواعد SQL خالص (مثل ارقام فارسی) برای همه ردیف‌ها اعمال می‌شود
+        cursor.execute(f"UPDATE {table} SET {key_column} = {_date_key_sql(f'{table}.{text_column}')}")
+
+    existing = _column_names(cursor, "members")
+    for column in _MEMBER_KEYS:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE members ADD COLUMN {column} TEXT")
+    for suffix in ("insert", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_members_keys_{suffix}")
+    for ddl in _member_key_fill_triggers():
+        cursor.execute(ddl)
+    cursor.execute(
+        "UPDATE members SET " + ", ".join(f"{column} = {expr.format(row='members')}" for column, (_, expr) in _MEMBER_KEYS.items())
+    )
+
+    # ایندکس‌های متنی با همان قواعد SQL از نو ساخته می‌شوند؛ اعضا از کلیدهای ذخیره‌شده
+    cursor.execute("DROP TABLE IF EXISTS members_fts")
+    cursor.execute("DROP TABLE IF EXISTS notes_fts")
+    for fts, columns in (("members_fts", tuple(_MEMBER_FTS_KEYS)), ("notes_fts", ("note",))):
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                {", ".join(columns)},
+                content='', tokenize='{_FTS_TOKENIZE}', prefix='2 3'
+            )
+        """)
+    cursor.execute("INSERT INTO members_fts (members_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 2.0)')")
+    for name in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_members_fts_{name}")
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_notes_fts_{name}")
+    note = {"note": _normalize_text_sql("{row}.note")}
+    for ddl in _member_fts_triggers() + _fts_triggers("notes", "notes_fts", note, ("note",)):
+        cursor.execute(ddl)
+    cursor.execute(
+        f"INSERT INTO members_fts (rowid, {', '.join(_MEMBER_FTS_KEYS)}) "
+        f"SELECT id, {', '.join(_MEMBER_FTS_KEYS.values())} FROM members"
+    )
+    cursor.execute(f"INSERT INTO notes_fts (rowid, note) SELECT id, {note['note'].format(row='notes')} FROM notes")
+
+    for name in ("monthly_insert", "monthly_delete", "monthly_update", "totals_insert", "totals_delete", "totals_update",
+                 "loan_attribute"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_transactions_{name}")
+    # آخرین فعالیت هر عضو با یک جستجوی ایندکسی (بدون مرتب‌سازی تاریخ‌های هم‌کلید) پیدا می‌شود؛
+    # این ایندکس جستجوهای بازه‌ای (member_id, date_key) ایندکس قبلی را هم پوشش می‌دهد
+    cursor.execute("DROP INDEX IF EXISTS idx_transactions_member_date_key")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_member_activity ON transactions(member_id, date_key, date)")
+    for ddl in _monthly_key_triggers() + _member_totals_key_triggers():
+        cursor.execute(ddl)
+    cursor.execute(
+        f"CREATE TRIGGER trg_transactions_loan_attribute AFTER INSERT ON transactions "
+        f"{_attribute_payment('NEW.date_key IS NOT NULL')}"
+    )
+    # قسطی که بدون کلید تاریخ درج شده، پس از پر شدن کلید به وام نسبت داده می‌شود
+    cursor.execute(
+        f"CREATE TRIGGER trg_transactions_loan_attribute_key AFTER UPDATE OF date_key ON transactions "
+        f"{_attribute_payment('OLD.date_key IS NULL AND NEW.date_key IS NOT NULL')}"
+    )
+    _fill_monthly_rollup(cursor, "{row}.date_key / 10000", "{row}.date_key / 100 % 100",
+                         "{row}.member_id IS NOT NULL AND {row}.date_key IS NOT NULL")
+    _fill_member_totals(cursor, "substr(MAX(printf('%08d', COALESCE(date_key, 0)) || date), 9)")
+
+    for table in _LOGGED_TABLES_V17:
+        for name in ("insert", "delete", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_log_{name}")
+        for ddl in _log_key_triggers(table):
+            cursor.execute(ddl)
+
+# اقساط هر وام با یک CTE بازگشتی از روی ردیف وام ساخته می‌شوند (همان تقسیم core.loan_schedule.build_schedule)؛
+# month_index شماره ماه سررسید از سال صفر است و روز سررسید در ماه‌های کوتاه‌تر محدود می‌شود
+def _schedule_rows(condition: str) -> str:
+    return f"""
+        INSERT INTO loan_schedule (loan_id, seq, due_key, expected, cumulative_before, paid)
+        WITH RECURSIVE installment (loan_id, seq, month_index, expected, cumulative_before) AS (
+            SELECT id, 1, start_date_key / 10000 * 12 + start_date_key / 100 % 100,
+                   amount / installments + (amount % installments > 0), 0
+            FROM loans
+            WHERE {condition} AND installments > 0 AND amount > 0 AND start_date_key IS NOT NULL
+            UNION ALL
+            SELECT i.loan_id, i.seq + 1, i.month_index + 1,
+                   l.amount / l.installments + (l.amount % l.installments > i.seq), i.cumulative_before + i.expected
+            FROM installment i JOIN loans l ON l.id = i.loan_id
+            WHERE i.seq < l.installments
+        )
+        SELECT i.loan_id, i.seq,
+               i.month_index / 12 * 10000 + (i.month_index % 12 + 1) * 100 + MIN(
+                   l.start_date_key % 100,
+                   CASE WHEN i.month_index % 12 < 6 THEN 31 WHEN i.month_index % 12 < 11 THEN 30 ELSE 29 END
+               ),
+               i.expected, i.cumulative_before, MAX(0, MIN(i.expected, l.paid_amount - i.cumulative_before))
+        FROM installment i JOIN loans l ON l.id = i.loan_id;
+    """
+
+@migration(18, "جدول اقساط هر وام با تریگر درج و ویرایش وام ساخته می‌شود")
+def _build_schedule_in_triggers(cursor: sqlite3.Cursor) -> None:
+    # وامی که بدون کلید تاریخ شروع درج شده، پس از پر شدن start_date_key از تریگر ویرایش جدول اقساط می‌گیرد
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_loans_schedule_insert AFTER INSERT ON loans
+        BEGIN {_schedule_rows("id = NEW.id")} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_loans_schedule_update AFTER UPDATE OF amount, installments, start_date_key ON loans
+        WHEN NEW.amount IS NOT OLD.amount OR NEW.installments IS NOT OLD.installments
+          OR NEW.start_date_key IS NOT OLD.start_date_key
+        BEGIN
+            DELETE FROM loan_schedule WHERE loan_id = NEW.id;
+            {_schedule_rows("id = NEW.id")}
+        END
+    """)
+    cursor.execute(_schedule_rows("id NOT IN (SELECT loan_id FROM loan_schedule)"))
+
+@migration(19, "تاریخچه قیمت سهام از ماه اولین تراکنش شروع می‌شود")
+def _seed_share_price_history(cursor: sqlite3.Cursor) -> None:
+    # دیتابیس ارتقایافته بدون تاریخ شروع، تاریخچه را از ماه مهاجرت ۹ شروع کرده بود؛ ماه‌های قبل از آن
+    # با قیمت اولین ردیف (بدون افزایش) ثبت می‌شوند تا ارزش‌گذاری سهام گذشته ردیف صریح داشته باشد
+    first = cursor.execute("SELECT month_key, price FROM share_price_history ORDER BY month_key LIMIT 1").fetchone()
+    earliest = cursor.execute("SELECT MIN(date_key) FROM transactions").fetchone()[0]
+    if first is None or earliest is None or earliest // 100 >= first[0]:
+        return
+    start, end = _month_index(earliest // 100), _month_index(first[0])
+    cursor.executemany(
+        "INSERT INTO share_price_history (month_key, price, monthly_increase) VALUES (?, ?, 0)",
+        [(_month_from_index(index), first[1]) for index in range(start, end)]
+    )
+    logger.info(f"تاریخچه قیمت سهام با {end - start} ماه از ماه {_month_from_index(start)} کامل شد")
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """اجرای مهاجرت‌های باقی‌مانده؛ در حالت به‌روز فقط یک PRAGMA خوانده می‌شود"""
+    # تریگرهای نسخه‌های پیش از ۱۷ توابع پایتونی را صدا می‌زنند و تا جایگزینی باید ثبت شده باشند
+    _register_sql_functions(conn)
+    version = current_version(conn)
+    if version >= latest_version():
+        return version
+
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+        cursor = conn.cursor()
+        try:
+            # قفل نوشتن قبل از بررسی دوباره، تا دو فرایند هم‌زمان یک مرحله را دو بار اجرا نکنند
+            cursor.execute("BEGIN IMMEDIATE")
+            if current_version(conn) >= step.version:
+                conn.rollback()
+                continue
+            step.apply(cursor)
+            cursor.execute(f"PRAGMA user_version = {step.version}")
+            conn.commit()
+            logger.info(f"مهاجرت {step.version} اجرا شد: {step.description}")
+        except Exception as e:
+            conn.rollback()
+            logger.critical(f"خطا در اجرای مهاجرت {step.version} ({step.description}): {str(e)}")
+            raise
+        finally:
+            cursor.close()
+    return current_version(conn)
\ No newline at end of file
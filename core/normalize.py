@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+یکسان‌سازی متن فارسی برای کلیدهای جستجو
+ی و ک عربی، نیم‌فاصله، اعراب، کشیده و ارقام فارسی/عربی به یک شکل واحد تبدیل می‌شوند تا
+«علی‌رضا»، «علیرضا» و «علي‌رضا» یا «۰۹۱۲» و «0912» یک کلید داشته باشند. همان قواعد به صورت
+عبارت SQL خالص (normalize_text_sql و normalize_phone_sql) هم ساخته می‌شوند تا تریگرها بدون تابع
+پایتونی اجرا شوند و نوشتن از هر اتصال SQLite (حتی sqlite3 ساده) کلیدها را درست نگه دارد.
+"""
+
+import re
+import sqlite3
+import string
+from typing import Callable, List, Optional
+
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+_LETTERS = str.maketrans({
+    "ي": "ی", "ى": "ی",
+    "ك": "ک",
+    "ة": "ه", "ۀ": "ه",
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ؤ": "و",
+})
+
+# اعراب، کشیده، نیم‌فاصله و نویسه‌های کنترلی جهت متن حذف می‌شوند
+_REMOVED_CHARS = "".join(map(chr, range(0x064b, 0x0660))) + "\u0670\u0640\u200c\u200d\u200e\u200f"
+_REMOVED = re.compile(f"[{_REMOVED_CHARS}]")
+# نویسه‌های فاصله (شامل فاصله نشکن)؛ عبارت‌های SQL هم دقیقاً همین‌ها را فاصله حساب می‌کنند
+WHITESPACE = "\t\n\x0b\x0c\r \xa0"
+_SPACES = re.compile(f"[{WHITESPACE}]+")
+# lower() در SQLite (بدون ICU) فقط حروف لاتین را کوچک می‌کند؛ کلید پایتون هم همین کار را می‌کند
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_NON_DIGITS = re.compile(r"[^0-9]")
+_PHONE_LIKE = re.compile(r"\+?[\d()\- ]+")
+# عبارت SQL تلفن نویسه‌ها را یکی‌یکی بررسی می‌کند، پس فقط این تعداد نویسه اول خوانده می‌شود
+PHONE_LENGTH = 32
+
+def normalize_digits(text: str) -> str:
+    """تبدیل ارقام فارسی و عربی به ارقام لاتین"""
+    return text.translate(_DIGITS)
+
+def normalize_text(text: Optional[str]) -> Optional[str]:
+    """کلید جستجوی یک متن: حروف یکسان، بدون اعراب و نیم‌فاصله، ارقام لاتین و حروف کوچک"""
+    if text is None:
+        return None
+    text = _REMOVED.sub("", text.translate(_LETTERS).translate(_DIGITS))
+    return _SPACES.sub(" ", text).strip(WHITESPACE).translate(_ASCII_LOWER)
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """کلید شماره تلفن: فقط ارقام لاتین، پیش‌شماره +98 یا 0098 به 0 تبدیل می‌شود"""
+    if phone is None:
+        return None
+    digits = _NON_DIGITS.sub("", normalize_digits(phone)[:PHONE_LENGTH])
+    if digits.startswith("0098"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("98") and (phone.lstrip(WHITESPACE).startswith("+") or len(digits) == 12):
+        digits = "0" + digits[2:]
+    return digits or None
+
+def looks_like_phone(text: str) -> bool:
+    """آیا متن (پس از یکسان‌سازی ارقام) فقط شامل ارقام و نویسه‌های شماره تلفن است"""
+    return bool(_PHONE_LIKE.fullmatch(normalize_digits(text.strip())))
+
+def prefix_upper_bound(prefix: str) -> str:
+    """کران بالای بازه پیشوند برای جستجوی ایندکسی key >= prefix AND key < bound"""
+    return prefix + "\U0010ffff"
+
+# بدنه عبارت‌های SQL معادل توابع بالا؛ تو در تو شدن زیاد replace از عمق مجاز پارسر SQLite
+# بیشتر می‌شود، پس جایگزینی‌ها در چند لایه زیرکوئری و ارقام با instr() نویسه‌به‌نویسه خوانده می‌شوند
+_LAYER_SIZE = 12
+
+def _char(text: str) -> str:
+    return f"char({', '.join(str(ord(c)) for c in text)})" if text else "''"
+
+WHITESPACE_SQL = _char(WHITESPACE)
+
+def layer(query: str) -> str:
+    """زیرکوئری یک لایه محاسبه؛ OFFSET مانع ادغام (flattening) آن در کوئری بیرونی است، وگرنه هر ارجاع
+    به ستون‌های لایه کل عبارت آن را تکرار می‌کند و هزینه با تعداد لایه‌ها نمایی رشد می‌کند"""
+    return f"({query} LIMIT -1 OFFSET 0)"
+
+def _layered_sql(expr: str, steps: List[Callable[[str], str]]) -> str:
+    """زیرکوئری‌های تو در تو که هر کدام چند مرحله را روی ستون v اجرا می‌کنند"""
+    query = f"SELECT {expr} AS v"
+    for start in range(0, len(steps), _LAYER_SIZE):
+        value = "v"
+        for step in steps[start:start + _LAYER_SIZE]:
+            value = step(value)
+        query = f"SELECT {value} AS v FROM {layer(query)}"
+    return f"({query})"
+
+def _replace(source: str, target: str) -> Callable[[str], str]:
+    return lambda value: f"replace({value}, {_char(source)}, {_char(target)})"
+
+# ارقام لاتین، فارسی و عربی به ترتیب؛ جایگاه هر رقم در این متن، رقم لاتینش را در _LATIN_DIGITS نشان می‌دهد
+_DIGIT_CHARS = "0123456789" + "".join(map(chr, _DIGITS))
+_LATIN_DIGITS = "0123456789" * 3
+
+def digit_at_sql(expr: str, position: int) -> str:
+    """رقم لاتین نویسه position ام متن اگر رقم (لاتین، فارسی یا عربی) باشد، وگرنه متن خالی"""
+    found = f"instr('{_DIGIT_CHARS}', substr({expr}, {position}, 1)) * (length({expr}) >= {position})"
+    return f"substr('{_LATIN_DIGITS}', {found}, 1)"
+
+def normalize_text_sql(expr: str) -> str:
+    """عبارت SQL معادل normalize_text برای تریگرها"""
+    # فاصله‌های پشت سر هم با نشانه نیم‌فاصله (که پیش‌تر حذف شده و در متن نمانده) یکی می‌شوند
+    mark = _char("\u200c")
+    steps = (
+        [_replace(chr(source), target) for source, target in _LETTERS.items()]
+        + [_replace(chr(source), chr(target)) for source, target in _DIGITS.items()]
+        + [_replace(char, "") for char in _REMOVED_CHARS]
+        + [_replace(char, " ") for char in WHITESPACE if char != " "]
+        + [
+            lambda value: f"replace({value}, ' ', ' ' || {mark})",
+            lambda value: f"replace({value}, {mark} || ' ', '')",
+            lambda value: f"replace({value}, {mark}, '')",
+            lambda value: f"lower(trim({value}, ' '))",
+        ]
+    )
+    return _layered_sql(expr, steps)
+
+def normalize_phone_sql(expr: str) -> str:
+    """عبارت SQL معادل normalize_phone برای تریگرها"""
+    digits = " || ".join(digit_at_sql("phone", i) for i in range(1, PHONE_LENGTH + 1))
+    return f"""(SELECT CASE
+            WHEN d = '' THEN NULL
+            WHEN substr(d, 1, 4) = '0098' THEN '0' || substr(d, 5)
+            WHEN substr(d, 1, 2) = '98' AND (substr(ltrim(phone, {WHITESPACE_SQL}), 1, 1) = '+' OR length(d) = 12)
+                THEN '0' || substr(d, 3)
+            ELSE d END
+        FROM {layer(f"SELECT phone, {digits} AS d FROM {layer(f'SELECT {expr} AS phone')}")})"""
+
+def register_sql_functions(conn: sqlite3.Connection) -> None:
+    """ثبت normalize_text و normalize_phone روی اتصال (فقط برای تریگرهای نسخه‌های قدیمی در زمان مهاجرت)"""
+    conn.create_function("normalize_text", 1, normalize_text, deterministic=True)
+    conn.create_function("normalize_phone", 1, normalize_phone, deterministic=True)
+
+if __name__ == "__main__":
+    print(normalize_text("علي‌رضا  كريمی"))  # علیرضا کریمی
+    print(normalize_phone("+98 912 ۱۲۳ ۴۵۶۷"))  # 09121234567
\ No newline at end of file
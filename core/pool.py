@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+استخر اتصال‌های اشتراکی SQLite برای کل فرایند برنامه
+هر رشته (thread) یک اتصال ماندگار دارد که با پایان رشته بسته می‌شود و ساختار دیتابیس فقط یک بار آماده می‌شود
+"""
+
+import sqlite3
+import threading
+import logging
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from core.settings_cache import SettingsCache
+
+logger = logging.getLogger(__name__)
+
+class _ThreadToken:
+    """شیء نگهداری‌شده در threading.local؛ با پایان رشته آزاد و اتصال آن رشته بسته می‌شود"""
+
+class ConnectionPool:
+    """نگهداری یک اتصال باز برای هر رشته و هر مسیر دیتابیس"""
+
+    _pools: Dict[str, "ConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path: Union[str, Path], timeout: float = 30):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._bootstrapped = False
+        self.settings = SettingsCache()
+
+    @classmethod
+    def for_path(cls, db_path: Union[str, Path], timeout: float = 30) -> "ConnectionPool":
+        """استخر مشترک مربوط به یک مسیر دیتابیس (در صورت نبود ساخته می‌شود)"""
+        key = str(Path(db_path).resolve())
+        pool = cls._pools.get(key)
+        if pool is None:
+            with cls._pools_lock:
+                pool = cls._pools.get(key)
+                if pool is None:
+                    pool = cls(key, timeout)
+                    cls._pools[key] = pool
+        return pool
+
+    @classmethod
+    def close_all(cls) -> None:
+        """بستن تمام اتصال‌های همه استخرها (هنگام خروج از برنامه)"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    @property
+    def bootstrapped(self) -> bool:
+        return self._bootstrapped
+
+    @property
+    def batch_depth(self) -> int:
+        """عمق batch های باز روی اتصال رشته جاری"""
+        return getattr(self._local, "depth", 0)
+
+    @batch_depth.setter
+    def batch_depth(self, value: int) -> None:
+        self._local.depth = value
+
+    def acquire(self, configure: Optional[Callable[[sqlite3.Connection], None]] = None) -> sqlite3.Connection:
+        """گرفتن اتصال رشته جاری؛ اتصال جدید فقط بار اول ساخته و تنظیم می‌شود"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, check_same_thread=False)
+            if configure:
+                configure(conn)
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+            self._local.refs = 0
+            self._local.token = _ThreadToken()
+            weakref.finalize(self._local.token, self._discard, conn)
+            logger.debug(f"اتصال جدید برای رشته {threading.current_thread().name} ایجاد شد")
+        self._local.refs += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """برگرداندن اتصال؛ اتصال باز می‌ماند و فقط تراکنش نیمه‌کاره لغو می‌شود"""
+        if getattr(self._local, "conn", None) is not conn:
+            return
+        self._local.refs = max(0, self._local.refs - 1)
+        if self._local.refs == 0 and conn.in_transaction:
+            self._local.depth = 0
+            logger.warning("تراکنش بازمانده هنگام آزادسازی اتصال لغو شد")
+            conn.rollback()
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """بستن اتصال رشته‌ای که تمام شده است"""
+        with self._lock:
+            if conn not in self._connections:
+                return
+            self._connections.remove(conn)
+        self.settings.forget(conn)
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"خطا در بستن اتصال دیتابیس: {str(e)}")
+        logger.debug("اتصال رشته پایان‌یافته بسته شد")
+
+    def bootstrap_once(self, initializer: Callable[[], None], force: bool = False) -> None:
+        """اجرای آماده‌سازی ساختار دیتابیس فقط یک بار در طول عمر فرایند"""
+        if self._bootstrapped and not force:
+            return
+        with self._lock:
+            if self._bootstrapped and not force:
+                return
+            initializer()
+            self._bootstrapped = True
+
+    def close(self) -> None:
+        """بستن همه اتصال‌های این استخر"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._bootstrapped = False
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"خطا در بستن اتصال دیتابیس: {str(e)}")
+        self._local = threading.local()
+        self.settings.invalidate()
+        logger.debug(f"اتصال‌های دیتابیس {self.db_path} بسته شد")
\ No newline at end of file
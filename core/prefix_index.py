@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+ایندکس پیشوندی درون‌حافظه برای پیشنهاد خودکار اعضا
+کلیدهای یکسان‌شده (نام کامل و هر کلمه آن، کد عضویت، تلفن) در یک آرایه مرتب نگهداری و با bisect
+جستجو می‌شوند؛ هر پیشنهاد چند جستجوی دودویی است و به دیتابیس نیاز ندارد.
+به‌روزرسانی فقط کلیدهای اعضای تغییرکرده را درج یا حذف می‌کند.
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.database import DatabaseManager
+from core.normalize import looks_like_phone, normalize_phone, normalize_text, prefix_upper_bound
+
+logger = logging.getLogger(__name__)
+
+# (name_key, membership_code, phone_key, name)
+MemberRow = Tuple[Optional[str], str, Optional[str], str]
+
+class MemberPrefixIndex:
+    """آرایه مرتب (کلید، شناسه عضو) با درج و حذف جزئی"""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._ids: List[int] = []
+        self._rows: Dict[int, MemberRow] = {}
+
+    @classmethod
+    def load(cls, db: Optional[DatabaseManager] = None) -> "MemberPrefixIndex":
+        index = cls()
+        index.refresh(db)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def _member_keys(row: MemberRow) -> List[str]:
+        name_key, code, phone_key, _ = row
+        keys = []
+        if name_key:
+            words = name_key.split(" ")
+            # نام کامل و هر ادامه آن از کلمه دوم به بعد (مثلاً جستجو با نام خانوادگی)
+            keys.extend(" ".join(words[i:]) for i in range(len(words)))
+        if code:
+            keys.append(normalize_text(code))
+        if phone_key:
+            keys.append(phone_key)
+            if phone_key.startswith("0"):
+                keys.append(phone_key[1:])
+        return list(dict.fromkeys(key for key in keys if key))
+
+    def _insert(self, member_id: int, row: MemberRow) -> None:
+        for key in self._member_keys(row):
+            position = bisect_left(self._keys, key)
+            # برای کلیدهای برابر، ترتیب شناسه‌ها حفظ می‌شود
+            while position < len(self._keys) and self._keys[position] == key and self._ids[position] < member_id:
+                position += 1
+            self._keys.insert(position, key)
+            self._ids.insert(position, member_id)
+        self._rows[member_id] = row
+
+    def _remove(self, member_id: int) -> None:
+        row = self._rows.pop(member_id, None)
+        if row is None:
+            return
+        for key in self._member_keys(row):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._ids[position] == member_id:
+                    del self._keys[position]
+                    del self._ids[position]
+                    break
+                position += 1
+
+    def _rebuild(self, rows: Dict[int, MemberRow]) -> None:
+        pairs = sorted((key, member_id) for member_id, row in rows.items() for key in self._member_keys(row))
+        self._keys = [key for key, _ in pairs]
+        self._ids = [member_id for _, member_id in pairs]
+        self._rows = dict(rows)
+
+    @staticmethod
+    def read_rows(db: DatabaseManager, member_ids: Optional[Iterable[int]] = None) -> Dict[int, MemberRow]:
+        """خواندن ردیف‌های لازم برای ایندکس (قابل اجرا در رشته پس‌زمینه)"""
+        query = "SELECT id, name_key, membership_code, phone_key, name FROM members"
+        params: tuple = ()
+        if member_ids is not None:
+            params = tuple(member_ids)
+            if not params:
+                return {}
+            query += f" WHERE id IN ({', '.join('?' * len(params))})"
+        return {row[0]: tuple(row[1:]) for row in db.execute_query(query, params, fetch=True)}
+
+    def apply_rows(self, rows: Dict[int, MemberRow], member_ids: Optional[Iterable[int]] = None) -> int:
+        """اعمال ردیف‌های خوانده‌شده با read_rows؛ با member_ids فقط همان اعضا بررسی می‌شوند
+
+        تعداد اعضای درج‌شده، ویرایش‌شده یا حذف‌شده را برمی‌گرداند.
+        """
+        if not self._rows and member_ids is None:
+            self._rebuild(rows)
+            logger.debug(f"ایندکس پیشوندی {len(rows)} عضو ساخته شد")
+            return len(rows)
+
+        checked = list(member_ids) if member_ids is not None else set(self._rows) | set(rows)
+        changed = 0
+        for member_id in checked:
+            row = rows.get(member_id)
+            if self._rows.get(member_id) == row:
+                continue
+            self._remove(member_id)
+            if row is not None:
+                self._insert(member_id, row)
+            changed += 1
+        if changed:
+            logger.debug(f"ایندکس پیشوندی: {changed} عضو به‌روز شد")
+        return changed
+
+    def refresh(self, db: Optional[DatabaseManager] = None, member_ids: Optional[Iterable[int]] = None) -> int:
+        """همگام‌سازی با جدول members؛ با member_ids فقط همان اعضا خوانده می‌شوند"""
+        if db is None:
+            with DatabaseManager() as db:
+                return self.refresh(db, member_ids)
+        if member_ids is not None:
+            member_ids = list(member_ids)
+        return self.apply_rows(self.read_rows(db, member_ids), member_ids)
+
+    def _scan(self, prefix: str, found: Dict[int, None], limit: int) -> None:
+        position = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix_upper_bound(prefix), position)
+        while position < end and len(found) < limit:
+            found.setdefault(self._ids[position])
+            position += 1
+
+    def suggest(self, text: str, limit: int = 10) -> List[int]:
+        """شناسه اعضایی که یکی از کلیدهایشان با متن شروع می‌شود (نتایج دقیق‌تر اول)"""
+        prefix = normalize_text(text or "")
+        if not prefix:
+            return []
+        found: Dict[int, None] = {}
+        self._scan(prefix, found, limit)
+        if looks_like_phone(text):
+            phone = normalize_phone(prefix)
+            if phone and phone != prefix:
+                self._scan(phone, found, limit)
+        return list(found)
+
+    def label(self, member_id: int) -> str:
+        """متن نمایشی پیشنهاد: نام و کد عضویت"""
+        _, code, _, name = self._rows[member_id]
+        return f"{name} ({code})"
+
+if __name__ == "__main__":
+    index = MemberPrefixIndex.load()
+    print(f"تعداد اعضا: {len(index)}")
+    print([index.label(member_id) for member_id in index.suggest("ع")])
\ No newline at end of file
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+تصویر (snapshot) گزارش اعضا و جمع‌های صندوق
+ردیف همه اعضا با یک کوئری روی member_totals خوانده و جمع‌ها در همان گذر محاسبه می‌شود؛
+پس از تغییر چند عضو فقط ردیف همان اعضا دوباره خوانده و اختلافشان به جمع‌ها اعمال می‌شود،
+پس جمع کل صندوق بدون پیمایش دوباره همه اعضا به‌روز می‌ماند.
+"""
+
+import time
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+_REPORT_QUERY = """
+    SELECT m.id, m.name, m.membership_code,
+           COALESCE(t.membership_total, 0), COALESCE(t.loan_total, 0), COALESCE(t.installment_total, 0)
+    FROM members m LEFT JOIN member_totals t ON t.member_id = m.id
+"""
+
+class ReportRow(NamedTuple):
+    member_id: int
+    name: str
+    code: str
+    assets: int
+    loans: int
+    installments: int
+
+    @property
+    def debt(self) -> int:
+        """مانده قابل پرداخت عضو (جمع وام منهای جمع اقساط)"""
+        return max(0, self.loans - self.installments)
+
+class ReportSnapshot:
+    """ردیف‌های گزارش به ترتیب شناسه و جمع‌های نگهداری‌شده دارایی، وام و اقساط"""
+
+    def __init__(self, rows: Iterable[ReportRow]):
+        self.rows: Dict[int, ReportRow] = {}
+        self.assets = self.loans = self.installments = 0
+        for row in rows:
+            self._add(row)
+
+    @classmethod
+    def load(cls, db: Optional[DatabaseManager] = None) -> "ReportSnapshot":
+        if db is None:
+            with DatabaseManager() as db:
+                return cls.load(db)
+        start = time.perf_counter()
+        rows = db.execute_query(f"{_REPORT_QUERY} ORDER BY m.id", fetch=True)
+        snapshot = cls(ReportRow(*row) for row in rows)
+        logger.info(
+            f"گزارش {len(snapshot.rows)} عضو با یک کوئری در {(time.perf_counter() - start) * 1000:.1f} میلی‌ثانیه ساخته شد"
+        )
+        return snapshot
+
+    def _add(self, row: ReportRow) -> None:
+        self.rows[row.member_id] = row
+        self.assets += row.assets
+        self.loans += row.loans
+        self.installments += row.installments
+
+    def _remove(self, member_id: int) -> Optional[ReportRow]:
+        row = self.rows.pop(member_id, None)
+        if row is not None:
+            self.assets -= row.assets
+            self.loans -= row.loans
+            self.installments -= row.installments
+        return row
+
+    def apply(self, db: DatabaseManager, member_ids: Iterable[int]) -> Tuple[List[ReportRow], List[int]]:
+        """خواندن دوباره ردیف اعضای داده‌شده و اعمال اختلاف به جمع‌ها
+
+        خروجی (ردیف‌های تغییرکرده یا جدید، شناسه اعضای حذف‌شده) است؛ عضو جدید به انتهای ترتیب می‌رود.
+        """
+        member_ids = list(member_ids)
+        if not member_ids:
+            return [], []
+        start = time.perf_counter()
+        rows = db.execute_query(
+            f"{_REPORT_QUERY} WHERE m.id IN ({', '.join('?' * len(member_ids))})", tuple(member_ids), fetch=True
+        )
+        found = {row[0]: ReportRow(*row) for row in rows}
+        changed, removed = [], []
+        for member_id in member_ids:
+            row = found.get(member_id)
+            old = self.rows.get(member_id)
+            if row is None:
+                if old is not None:
+                    self._remove(member_id)
+                    removed.append(member_id)
+                continue
+            if row == old:
+                continue
+            if old is not None:
+                # جایگزینی در جای قبلی تا ترتیب ردیف‌ها حفظ شود
+                self.assets += row.assets - old.assets
+                self.loans += row.loans - old.loans
+                self.installments += row.installments - old.installments
+                self.rows[member_id] = row
+            else:
+                self._add(row)
+            changed.append(row)
+        logger.debug(
+            f"{len(member_ids)} عضو از {len(self.rows)} عضو گزارش در "
+            f"{(time.perf_counter() - start) * 1000:.1f} میلی‌ثانیه به‌روزرسانی شد"
+        )
+        return changed, removed
+
+    def totals(self, fund_balance: int) -> dict:
+        """جمع‌های گزارش؛ اختلاف حساب = مانده کل - دارایی اعضا - موجودی صندوق"""
+        total_debt = self.loans - self.installments
+        return {
+            "assets": self.assets,
+            "loans": self.loans,
+            "installments": self.installments,
+            "debt": total_debt,
+            "fund_balance": fund_balance,
+            "balance_diff": total_debt - self.assets - fund_balance,
+        }
\ No newline at end of file
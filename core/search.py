@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+جستجوی متنی اعضا و یادداشت‌ها با FTS5
+جداول members_fts و notes_fts بدون محتوا (contentless) هستند و متن یکسان‌شده (core.normalize)
+را با تریگر ایندکس می‌کنند. هر کلمه ورودی کاربر پس از همان یکسان‌سازی به صورت پیشوندی جستجو و
+نتایج با bm25 مرتب می‌شوند، پس زمان جستجو به تعداد نتایج بستگی دارد نه به تعداد کل اعضا.
+کلیدهای یکسان‌شده عضو (name_key، code_key، phone_key، account_key) همراه ردیف ذخیره می‌شوند؛ ایندکس
+متنی از همین ستون‌ها پر می‌شود و name_key و phone_key برای یافتن دقیق (find_member) ایندکس معمولی هم دارند.
+"""
+
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+
+from core.normalize import looks_like_phone, normalize_phone, normalize_text, normalize_text_sql
+
+logger = logging.getLogger(__name__)
+
+# ستون ایندکس متنی اعضا ← کلید ذخیره‌شده در جدول members
+MEMBER_SEARCH_COLUMNS = {
+    "name": "name_key",
+    "membership_code": "code_key",
+    "phone": "phone_key",
+    "account_number": "account_key",
+}
+
+# سقف نتایج نمایش‌داده‌شده؛ کاربر با کلمات بیشتر نتیجه را محدود می‌کند
+SEARCH_LIMIT = 200
+
+def member_keys(
+    name: str, family_name: Optional[str] = None, membership_code: Optional[str] = None,
+    phone: Optional[str] = None, account_number: Optional[str] = None
+) -> Dict[str, Optional[str]]:
+    """کلیدهای یکسان‌شده یک عضو برای نوشتن همراه ردیف (ستون ← مقدار)
+
+    همان مقدارهایی است که تریگر برای ردیفِ نوشته‌شده بدون کلید با SQL خالص حساب می‌کند.
+    """
+    return {
+        "name_key": normalize_text(f"{name} {family_name or ''}"),
+        "code_key": normalize_text(membership_code),
+        "phone_key": normalize_phone(phone),
+        "account_key": normalize_text(account_number),
+    }
+
+def rebuild_search_index(cursor: sqlite3.Cursor) -> None:
+    """بازسازی کامل ایندکس‌های متنی از روی کلیدهای اعضا و متن یادداشت‌ها"""
+    cursor.execute("INSERT INTO members_fts (members_fts) VALUES ('delete-all')")
+    cursor.execute(
+        f"INSERT INTO members_fts (rowid, {', '.join(MEMBER_SEARCH_COLUMNS)}) "
+        f"SELECT id, {', '.join(MEMBER_SEARCH_COLUMNS.values())} FROM members WHERE name_key IS NOT NULL"
+    )
+    cursor.execute("INSERT INTO notes_fts (notes_fts) VALUES ('delete-all')")
+    cursor.execute(f"INSERT INTO notes_fts (rowid, note) SELECT id, {normalize_text_sql('notes.note')} FROM notes")
+    logger.info("ایندکس جستجوی اعضا و یادداشت‌ها بازسازی شد")
+
+def match_expression(text: str) -> Optional[str]:
+    """عبارت MATCH پیشوندی از متن یکسان‌شده کاربر؛ همه کلمات باید وجود داشته باشند"""
+    terms = []
+    for term in (text or "").split():
+        # شماره تلفن با خط تیره یا پیش‌شماره مثل ستون تلفن به ارقام خالص تبدیل می‌شود
+        term = normalize_phone(term) if looks_like_phone(term) else normalize_text(term)
+        term = (term or "").replace('"', '')
+        if term:
+            terms.append(term)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_members(cursor: sqlite3.Cursor, text: str, limit: Optional[int] = None) -> List[int]:
+    """شناسه اعضای منطبق با متن، به ترتیب میزان انطباق"""
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    query = "SELECT rowid FROM members_fts WHERE members_fts MATCH ? ORDER BY rank"
+    params = (expression,)
+    if limit is not None:
+        query += " LIMIT ?"
+        params += (limit,)
+    return [row[0] for row in cursor.execute(query, params).fetchall()]
+
+def search_notes(cursor: sqlite3.Cursor, text: str, member_id: Optional[int] = None) -> List[int]:
+    """شناسه یادداشت‌های منطبق (در صورت نیاز فقط یادداشت‌های یک عضو)، به ترتیب انطباق"""
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    query = """
+        SELECT notes.id FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+        WHERE notes_fts MATCH ?
+    """
+    params = (expression,)
+    if member_id is not None:
+        query += " AND notes.member_id = ?"
+        params += (member_id,)
+    query += " ORDER BY notes_fts.rank"
+    return [row[0] for row in cursor.execute(query, params).fetchall()]
+
+def find_member(cursor: sqlite3.Cursor, text: str) -> Optional[int]:
+    """عضو با کد عضویت، نام کامل یا شماره تلفن دقیقاً برابر (جستجوی ایندکسی روی کلیدها)"""
+    code = (text or "").strip()
+    name_key, phone_key = normalize_text(code), normalize_phone(code)
+    row = cursor.execute("""
+        SELECT id FROM members WHERE membership_code = ?
+        UNION ALL SELECT id FROM members WHERE name_key = ?
+        UNION ALL SELECT id FROM members WHERE phone_key = ?
+        LIMIT 1
+    """, (code, name_key, phone_key)).fetchone()
+    return row[0] if row else None
\ No newline at end of file
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+حافظه موقت جدول settings برای هر دیتابیس
+کل جدول یک بار خوانده می‌شود و خواندن‌های بعدی فقط جستجو در دیکشنری است.
+نوشتن از set_setting مستقیماً در حافظه ثبت می‌شود؛ تغییرات اتصال‌ها یا فرایندهای دیگر
+با PRAGMA data_version (که فقط با commit اتصال‌های دیگر تغییر می‌کند) تشخیص داده می‌شود.
+"""
+
+import sqlite3
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class SettingsCache:
+    """نگهداری مقادیر settings مشترک بین همه اتصال‌های یک استخر"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Optional[Dict[str, str]] = None
+        # آخرین data_version دیده‌شده برای هر اتصال
+        self._versions: Dict[int, int] = {}
+
+    def _refresh(self, conn: sqlite3.Connection, revalidate: bool) -> Dict[str, str]:
+        if not revalidate:
+            with self._lock:
+                if self._values is not None:
+                    return self._values
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            if self._values is not None and self._versions.get(id(conn)) == version:
+                return self._values
+        rows = conn.execute("SELECT key, value FROM settings").fetchall()
+        with self._lock:
+            self._values = dict(rows)
+            self._versions[id(conn)] = version
+            logger.debug(f"{len(rows)} تنظیم در حافظه موقت بارگذاری شد")
+            return self._values
+
+    def get(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        default: Any = None,
+        cast: Optional[Callable[[str], Any]] = None,
+        revalidate: bool = True
+    ) -> Any:
+        """مقدار تنظیم؛ در صورت cast مقدار تبدیل می‌شود و اگر نامعتبر باشد default برمی‌گردد
+
+        با revalidate=False بررسی data_version انجام نمی‌شود (برای خواندن‌های پشت سر هم).
+        """
+        value = self._refresh(conn, revalidate).get(key)
+        if value is None:
+            return default
+        if cast is None:
+            return value
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            logger.warning(f"مقدار تنظیم {key} نامعتبر است: {value}")
+            return default
+
+    def put(self, key: str, value: str) -> None:
+        """ثبت مستقیم مقدار جدید بعد از نوشتن در دیتابیس"""
+        with self._lock:
+            if self._values is not None:
+                self._values[key] = value
+
+    def forget(self, conn: sqlite3.Connection) -> None:
+        """حذف data_version اتصال بسته‌شده تا اتصال بعدی با همان id آن را به ارث نبرد"""
+        with self._lock:
+            self._versions.pop(id(conn), None)
+
+    def invalidate(self) -> None:
+        """دور ریختن حافظه موقت (مثلاً بعد از لغو تراکنش یا بستن اتصال‌ها)"""
+        with self._lock:
+            self._values = None
+            self._versions.clear()
\ No newline at end of file
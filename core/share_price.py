@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+تاریخچه ماهانه قیمت سهام
+برای هر ماه شمسی (کلید yyyymm) قیمت همان ماه و افزایش ماهانه‌ای که از آن به بعد اعمال می‌شود
+نگهداری می‌شود. قیمت ماه‌های بعد از آخرین ردیف با همان افزایش برون‌یابی می‌شود، پس تغییر
+تنظیمات فقط ماه‌های بعد از تاریخ شروع جدید را بازنویسی می‌کند و قیمت‌های گذشته حفظ می‌شوند.
+قیمت ماه‌های قبل از اولین ردیف همان قیمت اولین ردیف است (مهاجرت ۱۹ این ماه‌ها را تا اولین تراکنش ثبت می‌کند).
+"""
+
+import sqlite3
+import logging
+from typing import List, Optional, Tuple
+
+from core.dates import date_key, key_today
+
+logger = logging.getLogger(__name__)
+
+def month_of(key: int) -> int:
+    """کلید ماه (yyyymm) از کلید تاریخ (yyyymmdd)"""
+    return key // 100
+
+def month_index(month_key: int) -> int:
+    """شماره ترتیبی ماه برای محاسبه فاصله بین دو ماه"""
+    return (month_key // 100) * 12 + (month_key % 100) - 1
+
+def month_from_index(index: int) -> int:
+    return (index // 12) * 100 + index % 12 + 1
+
+def current_month() -> int:
+    return month_of(key_today())
+
+def build_schedule(base_price: int, monthly_increase: int, start_month: int, until_month: int) -> List[Tuple[int, int, int]]:
+    """ردیف‌های (ماه، قیمت، افزایش) از ماه شروع تا until_month (حداقل یک ردیف)"""
+    monthly_increase = max(0, monthly_increase)
+    start = month_index(start_month)
+    count = max(1, month_index(until_month) - start + 1)
+    return [
+        (month_from_index(start + i), base_price + monthly_increase * i, monthly_increase)
+        for i in range(count)
+    ]
+
+def rewrite_share_price_history(
+    cursor: sqlite3.Cursor,
+    base_price: int,
+    monthly_increase: int,
+    start_date: Optional[str] = None
+) -> int:
+    """بازنویسی قیمت‌ها از ماه شروع به بعد؛ ماه‌های قبل از آن دست نمی‌خورند"""
+    start_key = date_key(start_date) if start_date else None
+    start_month = month_of(start_key) if start_key else current_month()
+    rows = build_schedule(base_price, monthly_increase, start_month, current_month())
+    cursor.execute("DELETE FROM share_price_history WHERE month_key >= ?", (start_month,))
+    cursor.executemany(
+        "INSERT INTO share_price_history (month_key, price, monthly_increase) VALUES (?, ?, ?)",
+        rows
+    )
+    logger.info(f"تاریخچه قیمت سهام از ماه {start_month} با {len(rows)} ردیف بازنویسی شد")
+    return len(rows)
+
+def _extrapolate(row: Optional[Tuple[int, int, int]], month_key: int) -> Optional[int]:
+    if row is None:
+        return None
+    row_month, price, increase = row
+    return price + increase * max(0, month_index(month_key) - month_index(row_month))
+
+def price_at(cursor: sqlite3.Cursor, month_key: int) -> Optional[int]:
+    """قیمت سهم در یک ماه با یک جستجوی کلید اصلی؛ قبل از اولین ردیف، قیمت اولین ماه"""
+    row = cursor.execute(
+        "SELECT month_key, price, monthly_increase FROM share_price_history "
+        "WHERE month_key <= ? ORDER BY month_key DESC LIMIT 1",
+        (month_key,)
+    ).fetchone()
+    if row is None:
+        row = cursor.execute(
+            "SELECT month_key, price, 0 FROM share_price_history ORDER BY month_key LIMIT 1"
+        ).fetchone()
+    return _extrapolate(row, month_key)
\ No newline at end of file
@@ -8,18 +8,37 @@ import os
 import shutil
 import re
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Union, Optional, Tuple
 import logging
 from jdatetime import datetime as jdatetime
 from core.config import AppConfig, BACKUP_DIR
 from core.database import DatabaseManager
+from core.analytics import PortfolioEngine
+from core.normalize import normalize_digits
 
 logger = logging.getLogger(__name__)
 
+_PERSIAN_DIGITS = str.maketrans("0123456789-", "۰۱۲۳۴۵۶۷۸۹-")
+
 def unformat_persian_number(text: str) -> str:
-    """حذف فرمت‌های فارسی از اعداد"""
-    persian_digits = str.maketrans("۰۱۲۳۴۵۶۷۸۹-", "0123456789-")
-    return text.translate(persian_digits).replace(',', '').replace('٬', '')
+    """حذف فرمت‌های فارسی از اعداد؛ جداکننده هزارگان (, و ٬) حذف و ممیز فارسی (٫) به نقطه تبدیل می‌شود"""
+    return normalize_digits(text).replace(',', '').replace('٬', '').replace('٫', '.')
+
+def parse_amount(value: Union[int, float, str, None]) -> int:
+    """تبدیل مبلغ (عدد یا متن با ارقام فارسی و جداکننده) به عدد صحیح ریال"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = unformat_persian_number(value).strip()
+        if not value:
+            return 0
+    try:
+        return int(Decimal(str(value)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError) as e:
+        raise ValueError(f"مبلغ نامعتبر: {value}") from e
 
 def format_persian_number(
     number: Union[int, float, str], 
@@ -34,7 +53,8 @@ def format_persian_number(
             if not number.strip():  # اگه خالی باشه
                 return "۰"
             number = float(unformat_persian_number(number))
-        else:
+        elif not isinstance(number, int):
+            # اعداد صحیح (مبالغ ریالی) بدون تبدیل به float و از دست رفتن دقت قالب‌بندی می‌شوند
             number = float(number) if number is not None else 0
 
         # اگر عدد صفر باشه
@@ -42,9 +62,7 @@ def format_persian_number(
             formatted = "۰"
         else:
             # فقط اعداد صحیح رو نشون می‌دیم چون پروژه‌ات اعشار نمی‌خواد
-            formatted = "{:,}".format(int(number)).replace(',', '٬')
-            persian_digits = str.maketrans("0123456789-", "۰۱۲۳۴۵۶۷۸۹-")
-            formatted = formatted.translate(persian_digits)
+            formatted = "{:,}".format(int(number)).replace(',', '٬').translate(_PERSIAN_DIGITS)
 
         # اضافه کردن واحد پول اگه لازم باشه
         if with_currency:
@@ -64,40 +82,21 @@ def validate_phone_number(phone: str) -> bool:
     return re.match(r"^(\+98|0)?9\d{9}$", phone) is not None
 
 def calculate_loan_capacity(member_id: int) -> int:
-    """محاسبه وام قابل دریافت (هماهنگ با main_window.py)"""
+    """محاسبه وام قابل دریافت (سهام کامل × قیمت سهم × ضریب وام، منهای وام‌های فعال) با PortfolioEngine"""
     try:
-        with DatabaseManager() as db:
-            shares, total_invested = calculate_member_shares(member_id)
-            share_price = int(float(db.get_setting("share_price", "2000000")))
-            loan_factor = int(float(db.get_setting("loan_factor", "2")))
-            max_loan = shares * share_price * loan_factor
-            
-            active_loans = int(db.execute_query(
-                "SELECT COALESCE(SUM(amount), 0) FROM loans WHERE member_id=? AND status='فعال'",
-                (member_id,), fetch=True
-            )[0][0])
-            
-            return max(0, max_loan - active_loans)
+        engine = PortfolioEngine.load(member_ids=[member_id])
+        return int(engine.capacity[0]) if len(engine) else 0
     except Exception as e:
         logger.error(f"خطا در محاسبه وام قابل دریافت برای عضو {member_id}: {str(e)}")
         return 0
 
 def calculate_member_shares(member_id: int) -> Tuple[int, int]:
-    """محاسبه تعداد سهام و ارزش آن"""
+    """محاسبه تعداد سهام کامل و جمع عضویت با PortfolioEngine"""
     try:
-        with DatabaseManager() as db:
-            share_price = int(float(db.get_setting("share_price", "2000000")))
-            if share_price <= 0:
-                return (0, 0)
-                
-            investments = db.execute_query(
-                "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type='عضویت'",
-                (member_id,), fetch=True
-            )[0][0]
-            investments = int(float(investments))
-            
-            shares = investments // share_price
-            return (shares, investments)
+        engine = PortfolioEngine.load(member_ids=[member_id])
+        if not len(engine):
+            return (0, 0)
+        return (int(engine.whole_shares[0]), int(engine.membership[0]))
     except Exception as e:
         logger.error(f"خطا در محاسبه سهام عضو {member_id}: {str(e)}")
         return (0, 0)
@@ -179,6 +178,9 @@ if __name__ == "__main__":
     print(format_persian_number("0"))  # ۰
     print(format_persian_number("1000000"))  # ۱٬۰۰۰٬۰۰۰
     print(unformat_persian_number("۱٬۲۳۴٬۵۶۷"))  # 1234567
+    print(parse_amount("۱٬۲۳۴٬۵۶۷.۵"))  # 1234568
+    print(parse_amount("۱٬۲۳۴٬۵۶۷٫۴"))  # 1234567
+    assert parse_amount("۱٬۲۳۴٬۵۶۷٫۵") == parse_amount("1,234,567.5") == 1234568
     print(get_persian_date("2025/04/02"))  # ۱۴۰۴/۰۱/۱۳ (تقریبی)
     print(validate_phone_number("09123456789"))  # True
     print(generate_membership_code("M005"))  # M006
@@ -17,14 +17,15 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import QTimer
 
 from ui.main_window import MainWindow
+from ui.workers import BackupWorker
 from core.database import DatabaseManager
+from core.pool import ConnectionPool
 from core.config import (
     AppConfig,
     LOG_DIR,
     ICON_DIR,
     BASE_DIR,
-    DatabaseConfig,
-    BACKUP_DIR
+    DatabaseConfig
 )
 
 def setup_logging() -> logging.Logger:
@@ -104,10 +105,13 @@ def handle_uncaught_exceptions(exc_type, exc_value, exc_traceback):
     QMessageBox.critical(None, "خطای سیستمی", error_msg)
     
     try:
-        with DatabaseManager() as db:
-            backup_path = BACKUP_DIR / f"emergency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            db.backup_db(str(backup_path))
-            logger.info(f"بکاپ اضطراری ایجاد شد: {backup_path}")
+        # پشتیبان در رشته پشتیبان‌گیری ساخته می‌شود؛ قبل از خروج تا پایان آن صبر می‌کنیم
+        worker = BackupWorker.instance()
+        worker.request("emergency")
+        if worker.flush(timeout=30):
+            logger.info("بکاپ اضطراری ایجاد شد")
+        else:
+            logger.error("بکاپ اضطراری در زمان مقرر تمام نشد")
     except Exception as e:
         logger.error(f"خطا در ایجاد بکاپ اضطراری: {str(e)}")
     
@@ -119,6 +123,8 @@ def setup_application() -> QApplication:
     app.setApplicationName(AppConfig.APP_NAME)
     app.setApplicationVersion(AppConfig.APP_VERSION)
     app.setOrganizationName(AppConfig.ORGANIZATION)
+    app.aboutToQuit.connect(BackupWorker.shutdown)
+    app.aboutToQuit.connect(ConnectionPool.close_all)
     
     icon_path = ICON_DIR / "app_icon.png"
     if icon_path.exists():
@@ -152,6 +158,8 @@ def main():
                     sys.exit(1)
             else:
                 logger.info("دیتابیس سالم است")
+            # خودآزمایی جمع‌های نگهداری‌شده هر عضو (در صورت اختلاف بازسازی می‌شود)
+            db.verify_member_totals(repair=True)
         
         logger.info("ایجاد رابط کاربری اصلی...")
         window = MainWindow()
@@ -165,10 +173,8 @@ def main():
         if AppConfig.SYSTEM.get("auto_backup", False):
             interval = AppConfig.SYSTEM.get("backup_interval", 24) * 3600 * 1000
             def auto_backup():
-                with DatabaseManager() as db:
-                    backup_path = BACKUP_DIR / f"auto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                    db.backup_db(str(backup_path))
-                    logger.info(f"بکاپ خودکار ایجاد شد: {backup_path}")
+                BackupWorker.instance().request("auto")
+                logger.info("درخواست بکاپ خودکار ثبت شد")
             
             timer = QTimer()
             timer.timeout.connect(auto_backup)
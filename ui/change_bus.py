@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""گذرگاه اعلان تغییرات؛ رویدادهای یک دور حلقه رویداد Qt ادغام و یک بار به مشترک‌ها تحویل داده می‌شوند
+
+با follow_log تغییرات ثبت‌شده در change_log (از جمله نوشته‌های اتصال‌ها و فرایندهای دیگر) هم
+از جایگاه آخرین خوانده‌شده برداشته و در همان دور منتشر می‌شوند. خواندن دوره‌ای و فشرده‌سازی change_log
+در رشته DataLoader انجام می‌شود تا رشته رابط کاربری منتظر پایگاه داده نماند.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from core.changes import Change
+from core.database import DatabaseManager
+from ui.workers import DataLoader
+
+logger = logging.getLogger(__name__)
+
+# نام مصرف‌کننده رابط کاربری در change_log_consumers
+LOG_CONSUMER = "ui"
+POLL_INTERVAL_MS = 1000
+# بعد از تأیید این تعداد ردیف، change_log تا جایگاه کندترین مصرف‌کننده فشرده می‌شود
+COMPACT_EVERY_ENTRIES = 1000
+
+class ChangeBus(QObject):
+    """انتشار Change ها؛ changed فهرست بدون تکرار تغییرات یک دور را می‌فرستد"""
+    changed = pyqtSignal(list)
+
+    _instance: Optional["ChangeBus"] = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending: Dict[Change, None] = {}
+        # آیا از آخرین تحویل اعلان صریحی رسیده که باید با change_log یکی شود
+        self._published = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._flush)
+        self._consumer: Optional[str] = None
+        self._seq = 0
+        self._uncompacted = 0
+        self._loader: Optional[DataLoader] = None
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._poll)
+
+    @classmethod
+    def instance(cls) -> "ChangeBus":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def publish(self, *changes: Change) -> None:
+        """ثبت تغییرات؛ تحویل در دور بعدی حلقه رویداد انجام می‌شود"""
+        self._published = True
+        self._enqueue(changes)
+
+    def _enqueue(self, changes) -> None:
+        for change in changes:
+            self._pending.setdefault(change)
+        if self._pending and not self._timer.isActive():
+            self._timer.start()
+
+    def follow_log(self, consumer: str = LOG_CONSUMER, interval_ms: int = POLL_INTERVAL_MS) -> None:
+        """خواندن change_log از آخرین شماره فعلی؛ تغییرات قبلی در بارگذاری کامل دیده شده‌اند و فشرده می‌شوند"""
+        try:
+            with DatabaseManager() as db:
+                db.register_change_consumer(consumer)
+                self._seq = db.latest_change_seq()
+                db.acknowledge_changes(consumer, self._seq)
+        except Exception as e:
+            logger.error(f"خطا در آماده‌سازی change_log: {str(e)}")
+            return
+        self._consumer = consumer
+        self._uncompacted = 0
+        if self._loader is None:
+            self._loader = DataLoader({"log": self._fetch_log, "compact": self._compact})
+            self._loader.loaded.connect(self._on_log_loaded)
+        self._loader.request({"compact": None})
+        self._poll_timer.start(interval_ms)
+
+    def stop_log(self) -> None:
+        self._poll_timer.stop()
+        self._consumer = None
+        if self._loader is not None:
+            self._loader.stop()
+            self._loader = None
+
+    def flush(self) -> None:
+        """تحویل فوری تغییرات در انتظار"""
+        self._timer.stop()
+        self._flush()
+
+    @staticmethod
+    def _fetch_log(db: DatabaseManager, args: tuple) -> tuple:
+        """(seq شروع، آخرین seq، تغییرات) بعد از seq شروع؛ در رشته DataLoader اجرا می‌شود"""
+        consumer, start = args
+        seq, changes = db.get_changes_since(start)
+        if seq != start:
+            db.acknowledge_changes(consumer, seq)
+        return start, seq, changes
+
+    @staticmethod
+    def _compact(db: DatabaseManager, args: None) -> int:
+        return db.compact_change_log()
+
+    def _advance(self, seq: int) -> None:
+        # شمارش ردیف‌های تأییدشده؛ با رسیدن به آستانه فشرده‌سازی در رشته DataLoader زمان‌بندی می‌شود
+        self._uncompacted += seq - self._seq
+        self._seq = seq
+        if self._uncompacted >= COMPACT_EVERY_ENTRIES and self._loader is not None:
+            self._loader.request({"compact": None})
+            self._uncompacted = 0
+
+    def _read_log(self) -> List[Change]:
+        # خواندن همگام هنگام تحویل، تا اعلان صریح و ردیف change_log همان ذخیره در یک دور یکی شوند
+        if self._consumer is None:
+            return []
+        try:
+            with DatabaseManager() as db:
+                start, seq, changes = self._fetch_log(db, (self._consumer, self._seq))
+        except Exception as e:
+            logger.error(f"خطا در خواندن change_log: {str(e)}")
+            return []
+        self._advance(seq)
+        return changes
+
+    def _poll(self) -> None:
+        if self._consumer is not None and self._loader is not None and not self._loader.is_loading("log"):
+            self._loader.request({"log": (self._consumer, self._seq)})
+
+    def _on_log_loaded(self, part: str, generation: int, result) -> None:
+        if part != "log" or self._consumer is None:
+            return
+        start, seq, changes = result
+        # اگر در این فاصله تحویل همگام جلوتر رفته، این نتیجه تکراری است و دور بعد جبران می‌شود
+        if start != self._seq:
+            return
+        self._advance(seq)
+        self._enqueue(changes)
+
+    def _flush(self) -> None:
+        # تغییرات همین ذخیره در change_log هم هست؛ با اعلان صریح یکی می‌شوند
+        if self._published:
+            self._published = False
+            for change in self._read_log():
+                self._pending.setdefault(change)
+        if not self._pending:
+            return
+        changes, self._pending = list(self._pending), {}
+        logger.debug(f"اعلان {len(changes)} تغییر: {', '.join(map(str, changes))}")
+        self.changed.emit(changes)
\ No newline at end of file
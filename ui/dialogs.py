@@ -2,7 +2,9 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QMessageBox
 from PyQt5.QtCore import Qt
 from core.database import DatabaseManager
-from core.utils import get_persian_date, unformat_persian_number
+from core.utils import get_persian_date, unformat_persian_number, parse_amount
+from core.changes import member_changed, setting_changed, SHARE_SETTINGS
+from ui.change_bus import ChangeBus
 from datetime import datetime
 import logging
 
@@ -109,13 +111,14 @@ class AddMemberDialog(QDialog):
                 else:
                     code = self._generate_unique_code(db)
 
-                self.member_id = db.execute_query(
-                    "INSERT INTO members (membership_code, name, phone, account_number, join_date, balance, status) "
-                    "VALUES (?, ?, ?, ?, ?, 0, ?) RETURNING id",
-                    (code, name, phone, account, join_date, status),
-                    fetch=True
-                )[0][0]
+                self.member_id = db.add_member(
+                    name, code, phone=phone, account_number=account, join_date=join_date, status=status
+                )
+                if self.member_id is None:
+                    QMessageBox.warning(self, "⚠️ خطا", "این کد عضویت قبلاً ثبت شده است.")
+                    return
 
+            ChangeBus.instance().publish(member_changed(self.member_id))
             QMessageBox.information(self, "✅ موفق", f"عضو جدید با کد {code} ثبت شد.")
             self.accept()
         except Exception as e:
@@ -226,11 +229,13 @@ class SharePriceDialog(QDialog):
             return
 
         try:
-            with DatabaseManager() as db:
+            with DatabaseManager() as db, db.batch():
                 db.set_setting("share_price", str(price), "قیمت پایه سهام")
                 db.set_setting("monthly_increase", str(increase), "افزایش ماهانه سهام")
                 db.set_setting("loan_factor", str(loan_factor), "ضریب وام")  # به صورت رشته ذخیره می‌شه
                 db.set_setting("share_price_start_date", start_date, "تاریخ شروع قیمت سهام")
+                db.set_share_price_schedule(parse_amount(price), parse_amount(increase), start_date)
+            ChangeBus.instance().publish(*(setting_changed(key) for key in sorted(SHARE_SETTINGS)))
             QMessageBox.information(self, "✅ موفق", "تنظیمات قیمت سهام ذخیره شد.")
             self.accept()
         except Exception as e:
@@ -1,34 +1,62 @@
 # -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import (
-    QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget,
-    QTreeWidgetItem, QPushButton, QLineEdit, QLabel, QMessageBox, QHeaderView,
-    QTabBar, QDialog, QComboBox, QDateEdit
+    QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,
+    QPushButton, QLineEdit, QLabel, QMessageBox, QHeaderView,
+    QTabBar, QDialog, QComboBox, QDateEdit, QCompleter, QTableView, QAbstractItemView
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QDate
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import Qt, pyqtSignal, QDate, QTimer, QStringListModel
+from PyQt5.QtGui import QFont
 from core.database import DatabaseManager
 from core.config import AppConfig
-from core.utils import format_persian_number, get_persian_date
+from core.utils import format_persian_number
+from core.dates import gregorian_range, year_range
+from core.changes import MEMBER, LOANS, SHARE_SETTINGS, affected_members, changed_settings, changed_years, member_changed
+from core.search import match_expression, SEARCH_LIMIT
+from core.prefix_index import MemberPrefixIndex
 from ui.member_tab import MemberTab
 from ui.report_tab import ReportTab
 from ui.dialogs import SharePriceDialog, AddMemberDialog
+from ui.workers import BackupWorker, DataLoader
+from ui.change_bus import ChangeBus
+from ui.models import MemberTableModel, MemberFilterProxy, ButtonDelegate, TransactionTableModel, LoanTableModel
 import logging
-from datetime import datetime
 import sys
 
 class MainWindow(QMainWindow):
     update_report = pyqtSignal()
     update_all = pyqtSignal()
 
+    MEMBERS_QUERY = """
+        SELECT m.id, m.name, m.membership_code, m.phone, m.account_number, m.join_date, m.status,
+               COALESCE(t.membership_total, 0)
+        FROM members m LEFT JOIN member_totals t ON t.member_id = m.id
+    """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle(f"{AppConfig.APP_NAME} 🏛️ - نسخه {AppConfig.APP_VERSION}")
         self.setGeometry(100, 100, 1400, 900)
         self.member_tabs = {}
-        self.is_refreshing = False
+        self.member_index = MemberPrefixIndex()
+        self._suggestions = {}
         self._setup_ui()
+        # خواندن و قالب‌بندی در رشته بارگذار؛ فقط اعمال نتیجه روی مدل‌ها در رشته رابط کاربری انجام می‌شود
+        self.data_loader = DataLoader({
+            "members": self._fetch_members,
+            "member_index": lambda db, _: MemberPrefixIndex.read_rows(db),
+            "transactions": lambda db, filters: self.transactions_model.prepare(db, *filters),
+            "loans": lambda db, filters: self.loans_model.prepare(db, *filters),
+            "report": lambda db, _: ReportTab.fetch_report(db),
+        }, self)
+        self.data_loader.loaded.connect(self._on_data_loaded)
+        self.data_loader.failed.connect(self._on_data_failed)
+        ChangeBus.instance().changed.connect(self._on_changes)
+        ChangeBus.instance().follow_log()
         self.update_report.connect(self.reports_tab.load_data)
         self.update_all.connect(self._refresh_all)
+        backup_worker = BackupWorker.instance()
+        backup_worker.backup_finished.connect(self._on_backup_finished)
+        backup_worker.backup_failed.connect(self._on_backup_failed)
         self._initial_load()
 
     def _get_styles(self):
@@ -84,34 +112,18 @@ class MainWindow(QMainWindow):
                     background-color: #455A64;
                 }
             """,
-            "edit_button": """
-                QPushButton {
-                    background-color: #0288D1;
-                    color: white;
-                    border: none;
-                    padding: 3px;
-                    border-radius: 3px;
-                    font-family: 'B Nazanin';
-                    font-size: 12px;
-                    min-width: 25px;
-                    max-width: 25px;
-                }
-                QPushButton:hover {
-                    background-color: #0277BD;
-                }
-            """,
-            "tree_view": """
-                QTreeWidget {
+            "table_view": """
+                QTableView {
                     font-family: 'B Nazanin';
                     font-size: 14px;
                     alternate-background-color: #FAFAFA;
                     border: 1px solid #E0E0E0;
                 }
-                QTreeWidget::item {
+                QTableView::item {
                     padding: 5px;
                     border-bottom: 1px solid #EEEEEE;
                 }
-                QTreeWidget::item:selected {
+                QTableView::item:selected {
                     background: #E3F2FD;
                     color: #000000;
                 }
@@ -182,8 +194,18 @@ class MainWindow(QMainWindow):
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("🔍 جستجوی عضو (نام، کد، تلفن)...")
         self.search_box.setStyleSheet(self._get_styles()["line_edit"])
-        self.search_box.textChanged.connect(self._search_members)
         self.search_box.returnPressed.connect(self._open_member_by_search)
+        # جستجو و پیشنهادها فقط پس از مکث در تایپ اجرا می‌شوند
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(AppConfig.SEARCH["debounce_ms"])
+        self.search_timer.timeout.connect(self._on_search_timeout)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.suggestion_model = QStringListModel(self)
+        self.member_completer = QCompleter(self.suggestion_model, self)
+        self.member_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.member_completer.activated[str].connect(self._on_member_suggestion)
+        self.search_box.setCompleter(self.member_completer)
         toolbar.addWidget(self.btn_new_member)
         toolbar.addWidget(self.btn_formula)
         toolbar.addWidget(self.share_price_label)
@@ -192,17 +214,32 @@ class MainWindow(QMainWindow):
         toolbar.addWidget(self.search_box)
         layout.addLayout(toolbar)
         
-        self.members_table = QTreeWidget()
-        self.members_table.setHeaderLabels([
-            "🔢 شماره", "👤 نام و نام خانوادگی", "📌 کد عضویت", "📱 تلفن", 
-            "🏦 شماره حساب", "📅 تاریخ عضویت", "⚡ وضعیت", "📈 تعداد سهام", "✏️"
-        ])
-        self.members_table.setStyleSheet(self._get_styles()["tree_view"])
+        # مدل ستونی + پروکسی جستجو؛ جدول فقط ردیف‌های قابل مشاهده را از مدل می‌خواند
+        self.members_model = MemberTableModel(self)
+        self.members_proxy = MemberFilterProxy(self)
+        self.members_proxy.setSourceModel(self.members_model)
+        self.members_table = QTableView()
+        self.members_table.setModel(self.members_proxy)
+        self.members_table.setStyleSheet(self._get_styles()["table_view"])
+        self.members_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.members_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.members_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.members_table.setAlternatingRowColors(True)
+        self.members_table.setShowGrid(False)
+        self.members_table.setMouseTracking(True)
+        self.members_table.verticalHeader().hide()
+        self.members_table.verticalHeader().setDefaultSectionSize(32)
+        self.members_table.setSortingEnabled(True)
+        self.members_table.sortByColumn(0, Qt.AscendingOrder)
         self.members_table.setColumnWidth(0, 80)
         self.members_table.setColumnWidth(1, 250)
         self.members_table.setColumnWidth(2, 120)
-        self.members_table.setColumnWidth(8, 40)
-        self.members_table.itemDoubleClicked.connect(self._on_member_double_clicked)
+        self.members_table.setColumnWidth(MemberTableModel.EDIT_COLUMN, 40)
+        self.members_table.horizontalHeader().setStretchLastSection(False)
+        self.edit_delegate = ButtonDelegate("✏️", parent=self)
+        self.edit_delegate.clicked.connect(lambda index: self._edit_member(index.data(Qt.UserRole)))
+        self.members_table.setItemDelegateForColumn(MemberTableModel.EDIT_COLUMN, self.edit_delegate)
+        self.members_table.doubleClicked.connect(self._on_member_double_clicked)
         layout.addWidget(self.members_table)
         
         return tab
@@ -237,13 +274,15 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.end_date)
         filter_layout.addWidget(refresh_btn)
         filter_layout.addStretch()
+        self.trans_count_label = QLabel()
+        filter_layout.addWidget(self.trans_count_label)
         layout.addLayout(filter_layout)
         
-        self.transactions_table = QTreeWidget()
-        self.transactions_table.setHeaderLabels([
-            "🔢 شماره", "📅 تاریخ", "👤 عضو", "💰 مبلغ", "📋 نوع", "📝 توضیحات"
-        ])
-        self.transactions_table.setStyleSheet(self._get_styles()["tree_view"])
+        self.transactions_model = TransactionTableModel(self)
+        self.transactions_model.count_changed.connect(
+            lambda loaded, total: self._show_row_count(self.trans_count_label, loaded, total)
+        )
+        self.transactions_table = self._create_paged_table(self.transactions_model)
         self.transactions_table.setColumnWidth(0, 80)
         self.transactions_table.setColumnWidth(1, 120)
         self.transactions_table.setColumnWidth(2, 200)
@@ -257,7 +296,8 @@ class MainWindow(QMainWindow):
         
         filter_layout = QHBoxLayout()
         self.loan_filter_status = QComboBox()
-        self.loan_filter_status.addItems(["🏦 همه وام‌ها", "✅ وام‌های فعال", "✔️ وام‌های تسویه‌شده"])
+        for text, status in (("🏦 همه وام‌ها", None), ("✅ وام‌های فعال", "فعال"), ("✔️ وام‌های تسویه‌شده", "تسویه‌شده")):
+            self.loan_filter_status.addItem(text, status)
         self.loan_filter_status.setStyleSheet("font-family: 'B Nazanin'; font-size: 14px; padding: 5px;")
         self.loan_start_date = QDateEdit()
         self.loan_start_date.setCalendarPopup(True)
@@ -279,14 +319,15 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.loan_end_date)
         filter_layout.addWidget(refresh_btn)
         filter_layout.addStretch()
+        self.loan_count_label = QLabel()
+        filter_layout.addWidget(self.loan_count_label)
         layout.addLayout(filter_layout)
         
-        self.loans_table = QTreeWidget()
-        self.loans_table.setHeaderLabels([
-            "🔢 شماره", "👤 عضو", "💰 مبلغ", "📅 تاریخ اعطا", "📅 تاریخ تسویه",
-            "📋 تعداد اقساط", "💵 قسط ماهانه", "⚡ وضعیت"
-        ])
-        self.loans_table.setStyleSheet(self._get_styles()["tree_view"])
+        self.loans_model = LoanTableModel(self)
+        self.loans_model.count_changed.connect(
+            lambda loaded, total: self._show_row_count(self.loan_count_label, loaded, total)
+        )
+        self.loans_table = self._create_paged_table(self.loans_model)
         self.loans_table.setColumnWidth(0, 80)
         self.loans_table.setColumnWidth(1, 200)
         self.loans_table.setColumnWidth(3, 120)
@@ -295,113 +336,77 @@ class MainWindow(QMainWindow):
         
         return tab
 
-    def _load_members(self):
-        try:
-            self.members_table.clear()
-            query = "SELECT id, name, membership_code, phone, account_number, join_date, status FROM members ORDER BY join_date DESC"
-            with DatabaseManager() as db:
-                members = db.execute_query(query, fetch=True)
-                for idx, member in enumerate(members, 1):
-                    item = QTreeWidgetItem(self.members_table)
-                    shares = self._calculate_shares(member[0])
-                    item.setText(0, str(idx))
-                    item.setText(1, member[1])
-                    item.setText(2, member[2])
-                    item.setText(3, member[3] or "-")
-                    item.setText(4, member[4] or "-")
-                    item.setText(5, get_persian_date(member[5]))
-                    item.setText(6, member[6])
-                    item.setText(7, format_persian_number(str(shares)))
-                    if member[6] == "غیرفعال":
-                        item.setForeground(6, QColor("#D32F2F"))
-                    else:
-                        item.setForeground(6, QColor("#388E3C"))
-                    item.setData(0, Qt.UserRole, member[0])
-
-                    edit_btn = QPushButton("✏️")
-                    edit_btn.setStyleSheet(self._get_styles()["edit_button"])
-                    edit_btn.clicked.connect(lambda _, mid=member[0]: self._edit_member(mid))
-                    self.members_table.setItemWidget(item, 8, edit_btn)
-        except Exception as e:
-            logging.error(f"خطا در بارگذاری اعضا: {str(e)}")
-            QMessageBox.critical(self, "❌ خطا", "خطا در بارگذاری لیست اعضا")
+    def _create_paged_table(self, model):
+        """جدول فقط‌خواندنی برای مدل‌های صفحه‌ای؛ با رسیدن پیمایش به انتها صفحه بعد خوانده می‌شود"""
+        table = QTableView()
+        table.setModel(model)
+        table.setStyleSheet(self._get_styles()["table_view"])
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.setShowGrid(False)
+        table.verticalHeader().hide()
+        table.verticalHeader().setDefaultSectionSize(32)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _show_row_count(label, loaded, total):
+        label.setText(f"📊 نمایش {format_persian_number(str(loaded))} از {format_persian_number(str(total))}")
+
+    @classmethod
+    def _fetch_members(cls, db, _):
+        members = db.execute_query(cls.MEMBERS_QUERY + " ORDER BY m.join_date DESC", fetch=True)
+        share_price = db.get_share_price()
+        return MemberTableModel.prepare(members, share_price, preformat=True)
+
+    def _transactions_filter(self):
+        start_key, end_key = gregorian_range(self.start_date.date().toPyDate(), self.end_date.date().toPyDate())
+        filter_type = self.trans_filter_type.currentText().split()[1] if self.trans_filter_type.currentIndex() > 0 else None
+        return start_key, end_key, filter_type
+
+    def _loans_filter(self):
+        start_key, end_key = gregorian_range(self.loan_start_date.date().toPyDate(), self.loan_end_date.date().toPyDate())
+        return start_key, end_key, self.loan_filter_status.currentData()
 
     def _load_transactions(self):
         try:
-            self.transactions_table.clear()
-            with DatabaseManager() as db:
-                start_date = self.start_date.date().toString("yyyy/MM/dd")
-                end_date = self.end_date.date().toString("yyyy/MM/dd")
-                filter_type = self.trans_filter_type.currentText().split()[1] if self.trans_filter_type.currentIndex() > 0 else None
-                query = """
-                    SELECT t.id, t.date, m.name, t.amount, t.type, t.description 
-                    FROM transactions t JOIN members m ON t.member_id = m.id
-                    WHERE t.date BETWEEN ? AND ?
-                """
-                params = [start_date, end_date]
-                if filter_type:
-                    query += " AND t.type = ?"
-                    params.append(filter_type)
-                query += " ORDER BY t.id DESC"
-                transactions = db.execute_query(query, params, fetch=True)
-                for idx, trans in enumerate(transactions, 1):
-                    item = QTreeWidgetItem(self.transactions_table)
-                    amount = float(trans[3]) if trans[3] else 0
-                    item.setText(0, str(idx))
-                    item.setText(1, get_persian_date(trans[1]))
-                    item.setText(2, trans[2])
-                    item.setText(3, format_persian_number(str(amount)))
-                    item.setText(4, trans[4])
-                    item.setText(5, trans[5] if trans[5] else "-")
-                    if trans[4] == "عضویت":
-                        item.setForeground(3, QColor("#388E3C"))
-                    elif trans[4] == "پرداخت":
-                        item.setForeground(3, QColor("#1976D2"))
-                    elif trans[4] == "وام":
-                        item.setForeground(3, QColor("#D32F2F"))
+            self.data_loader.request({"transactions": self._transactions_filter()})
         except Exception as e:
             logging.error(f"خطا در بارگذاری تراکنش‌ها: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در بارگذاری تراکنش‌ها:\n{str(e)}")
 
     def _load_loans(self):
         try:
-            self.loans_table.clear()
-            with DatabaseManager() as db:
-                start_date = self.loan_start_date.date().toString("yyyy/MM/dd")
-                end_date = self.loan_end_date.date().toString("yyyy/MM/dd")
-                filter_status = self.loan_filter_status.currentText().split()[1] if self.loan_filter_status.currentIndex() > 0 else None
-                query = """
-                    SELECT l.id, m.name, l.amount, l.start_date, l.end_date,
-                    l.installments, l.monthly_payment, l.status 
-                    FROM loans l JOIN members m ON l.member_id = m.id
-                    WHERE l.start_date BETWEEN ? AND ?
-                """
-                params = [start_date, end_date]
-                if filter_status:
-                    query += " AND l.status = ?"
-                    params.append(filter_status)
-                query += " ORDER BY l.id DESC"
-                loans = db.execute_query(query, params, fetch=True)
-                for idx, loan in enumerate(loans, 1):
-                    item = QTreeWidgetItem(self.loans_table)
-                    amount = float(loan[2]) if loan[2] else 0
-                    monthly_payment = float(loan[6]) if loan[6] else 0
-                    item.setText(0, str(idx))
-                    item.setText(1, loan[1])
-                    item.setText(2, format_persian_number(str(amount)))
-                    item.setText(3, get_persian_date(loan[3]))
-                    item.setText(4, get_persian_date(loan[4]) if loan[4] else "-")
-                    item.setText(5, str(loan[5]))
-                    item.setText(6, format_persian_number(str(monthly_payment)))
-                    item.setText(7, loan[7])
-                    if loan[7] == "فعال":
-                        item.setForeground(7, QColor("#1976D2"))
-                    else:
-                        item.setForeground(7, QColor("#388E3C"))
+            self.data_loader.request({"loans": self._loans_filter()})
         except Exception as e:
             logging.error(f"خطا در بارگذاری وام‌ها: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در بارگذاری وام‌ها:\n{str(e)}")
 
+    def _on_data_loaded(self, part, generation, payload):
+        # نتیجه‌ای که در صف سیگنال مانده و درخواست تازه‌تری جایش را گرفته، نادیده گرفته می‌شود
+        if not self.data_loader.is_current(part, generation):
+            return
+        if part == "members":
+            self.members_model.set_prepared(payload)
+            # حفظ مرتب‌سازی انتخاب‌شده کاربر پس از بارگذاری دوباره
+            header = self.members_table.horizontalHeader()
+            self.members_proxy.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+            self.share_price_label.setText(f"💰 قیمت سهام: {format_persian_number(str(payload['share_price']))} تومان")
+        elif part == "member_index":
+            self.member_index.apply_rows(payload)
+        elif part == "transactions":
+            self.transactions_model.set_prepared(payload)
+        elif part == "loans":
+            self.loans_model.set_prepared(payload)
+        elif part == "report":
+            self.reports_tab.show_report(payload)
+
+    def _on_data_failed(self, part, error):
+        if part == "members":
+            self.share_price_label.setText("💰 قیمت سهام: نامشخص")
+        self.statusBar().showMessage(f"❌ خطا در بارگذاری داده‌ها: {error}", 10000)
+
     def _edit_member(self, member_id):
         from PyQt5.QtWidgets import QFormLayout
         dialog = QDialog(self)
@@ -440,74 +445,45 @@ class MainWindow(QMainWindow):
             return
         try:
             with DatabaseManager() as db:
-                db.execute_query(
-                    "UPDATE members SET name=?, phone=?, account_number=? WHERE id=?",
-                    (name, phone, account, member_id), fetch=False
-                )
-            self._refresh_all()
+                db.update_member(member_id, name=name, phone=phone, account_number=account)
+            ChangeBus.instance().publish(member_changed(member_id))
             dialog.accept()
             QMessageBox.information(self, "✅ موفق", "اطلاعات با موفقیت ویرایش شد!")
         except Exception as e:
             logging.error(f"خطا در ویرایش عضو {member_id}: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در ذخیره:\n{str(e)}")
 
-    def _calculate_shares(self, member_id):
-        try:
-            with DatabaseManager() as db:
-                investments = db.execute_query(
-                    "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type='عضویت'",
-                    (member_id,), fetch=True
-                )[0][0] or 0
-                share_price = self._get_current_share_price()
-                return investments / share_price if share_price > 0 else 0
-        except Exception as e:
-            logging.error(f"خطا در محاسبه سهام: {str(e)}")
-            return 0
+    def _on_member_double_clicked(self, index):
+        member_id = index.data(Qt.UserRole)
+        self.open_member_tab(member_id)
 
-    def _calculate_loan_capacity(self, member_id):
-        try:
-            with DatabaseManager() as db:
-                shares = self._calculate_shares(member_id)
-                share_price = self._get_current_share_price()
-                loan_factor = float(db.get_setting("loan_factor", "2"))
-                return int(shares * loan_factor * share_price)
-        except Exception as e:
-            logging.error(f"خطا در محاسبه ظرفیت وام: {str(e)}")
-            return 0
+    def _on_search_timeout(self):
+        self._update_suggestions()
+        self._search_members()
 
-    def _get_current_share_price(self):
-        try:
-            with DatabaseManager() as db:
-                base_price = float(db.get_setting("share_price", "2000000"))
-                monthly_increase = float(db.get_setting("monthly_increase", "0"))
-                start_date_str = db.get_setting("share_price_start_date", None)
-                if not start_date_str:
-                    return int(base_price)
-                start_date = datetime.strptime(start_date_str, "%Y/%m/%d")
-                now = datetime.now()
-                months_passed = (now.year - start_date.year) * 12 + (now.month - start_date.month)
-                current_price = base_price + (monthly_increase * months_passed)
-                return int(max(current_price, base_price))
-        except Exception as e:
-            logging.error(f"خطا در محاسبه قیمت فعلی سهام: {str(e)}")
-            return int(float(db.get_setting("share_price", "2000000")))
+    def _update_suggestions(self):
+        """پیشنهادهای خودکار از ایندکس پیشوندی درون‌حافظه (بدون کوئری دیتابیس)"""
+        member_ids = self.member_index.suggest(self.search_box.text(), AppConfig.SEARCH["suggestions"])
+        self._suggestions = {self.member_index.label(member_id): member_id for member_id in member_ids}
+        self.suggestion_model.setStringList(list(self._suggestions))
+        if self._suggestions and self.search_box.hasFocus():
+            self.member_completer.complete()
 
-    def _on_member_double_clicked(self, item):
-        member_id = item.data(0, Qt.UserRole)
-        self.open_member_tab(member_id)
+    def _on_member_suggestion(self, label):
+        member_id = self._suggestions.get(label)
+        if member_id:
+            self.open_member_tab(member_id)
+            self.search_box.clear()
 
     def _open_member_by_search(self):
         search_text = self.search_box.text().strip()
-        if not search_text:
+        if not search_text or search_text in self._suggestions:
             return
         try:
             with DatabaseManager() as db:
-                member = db.execute_query(
-                    "SELECT id FROM members WHERE membership_code=? OR name=?",
-                    (search_text, search_text), fetch=True
-                )
-                if member:
-                    self.open_member_tab(member[0][0])
+                member_id = db.find_member(search_text)
+                if member_id:
+                    self.open_member_tab(member_id)
                     self.search_box.clear()
                 else:
                     QMessageBox.warning(self, "⚠️ خطا", "عضو با این کد یا نام یافت نشد!")
@@ -520,8 +496,6 @@ class MainWindow(QMainWindow):
             self.tabs.setCurrentWidget(self.member_tabs[member_id])
             return
         tab = MemberTab(member_id, self)
-        tab.update_parent_report.connect(self.reports_tab.load_data)
-        tab.update_parent_all.connect(self._refresh_all)
         with DatabaseManager() as db:
             member_name = db.execute_query(
                 "SELECT name FROM members WHERE id=?",
@@ -532,83 +506,107 @@ class MainWindow(QMainWindow):
         self.member_tabs[member_id] = tab
 
     def _add_new_member(self):
-        dialog = AddMemberDialog(self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.update_all.emit()
+        # دیالوگ‌ها تغییرات ذخیره‌شده را روی ChangeBus اعلام می‌کنند
+        AddMemberDialog(self).exec_()
 
     def _show_share_price_dialog(self):
-        dialog = SharePriceDialog(self)
-        if dialog.exec_() == QDialog.Accepted:
-            self.update_all.emit()
+        SharePriceDialog(self).exec_()
 
     def _search_members(self):
+        """محدود کردن جدول اعضا به نتایج جستجوی متنی، به ترتیب میزان انطباق"""
         search_text = self.search_box.text().strip()
-        if not search_text:
-            self._load_members()
+        if match_expression(search_text) is None:
+            self.members_proxy.set_ranking(None)
+            self.members_table.sortByColumn(0, Qt.AscendingOrder)
             return
-        query = """
-            SELECT id, name, membership_code, phone, account_number, join_date, status 
-            FROM members 
-            WHERE (name LIKE ? OR membership_code LIKE ? OR phone LIKE ?)
-            ORDER BY join_date DESC
-        """
-        params = (f"%{search_text}%", f"%{search_text}%", f"%{search_text}%")
         try:
-            self.members_table.clear()
             with DatabaseManager() as db:
-                members = db.execute_query(query, params, fetch=True)
-                for idx, member in enumerate(members, 1):
-                    item = QTreeWidgetItem(self.members_table)
-                    shares = self._calculate_shares(member[0])
-                    item.setText(0, str(idx))
-                    item.setText(1, member[1])
-                    item.setText(2, member[2])
-                    item.setText(3, member[3] or "-")
-                    item.setText(4, member[4] or "-")
-                    item.setText(5, get_persian_date(member[5]))
-                    item.setText(6, member[6])
-                    item.setText(7, format_persian_number(str(shares)))
-                    if member[6] == "غیرفعال":
-                        item.setForeground(6, QColor("#D32F2F"))
-                    else:
-                        item.setForeground(6, QColor("#388E3C"))
-                    item.setData(0, Qt.UserRole, member[0])
-
-                    edit_btn = QPushButton("✏️")
-                    edit_btn.setStyleSheet(self._get_styles()["edit_button"])
-                    edit_btn.clicked.connect(lambda _, mid=member[0]: self._edit_member(mid))
-                    self.members_table.setItemWidget(item, 8, edit_btn)
+                member_ids = db.search_members(search_text, SEARCH_LIMIT)
+            self.members_proxy.set_ranking(member_ids)
+            self.members_table.sortByColumn(0, Qt.AscendingOrder)
         except Exception as e:
             logging.error(f"خطا در جستجوی اعضا: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", "خطا در انجام جستجو")
 
     def _initial_load(self):
-        self._load_members()
-        self._load_transactions()
-        self._load_loans()
-        self.reports_tab.load_data()
-        try:
-            current_price = self._get_current_share_price()
-            self.share_price_label.setText(f"💰 قیمت سهام: {format_persian_number(str(current_price))} تومان")
-        except Exception as e:
-            logging.error(f"خطا در به‌روزرسانی قیمت سهام: {str(e)}")
-            self.share_price_label.setText("💰 قیمت سهام: نامشخص")
+        self._refresh_all()
 
     def _refresh_all(self):
-        if self.is_refreshing:
-            return
-        self.is_refreshing = True
+        """بارگذاری دوباره همه بخش‌ها در پس‌زمینه؛ بارگذاری ناتمام قبلی لغو می‌شود"""
         try:
-            self._load_members()
-            self._load_transactions()
-            self._load_loans()
-            self.reports_tab.load_data()
-            current_price = self._get_current_share_price()
-            self.share_price_label.setText(f"💰 قیمت سهام: {format_persian_number(str(current_price))} تومان")
+            self.data_loader.request({
+                "members": None,
+                "member_index": None,
+                "transactions": self._transactions_filter(),
+                "loans": self._loans_filter(),
+                "report": None,
+            })
         except Exception as e:
             logging.error(f"خطا در به‌روزرسانی کامل: {str(e)}")
-        finally:
-            self.is_refreshing = False
+
+    def _on_changes(self, changes):
+        """به‌روزرسانی هدفمند: فقط ردیف‌ها و جمع‌های متأثر از تغییرات دوباره خوانده می‌شوند
+
+        بخشی که بارگذاری کاملش هنوز در جریان است به جای به‌روزرسانی جزئی دوباره درخواست می‌شود،
+        تا نتیجه کهنه آن بعداً روی تغییر تازه نوشته نشود.
+        """
+        member_ids = affected_members(changes)
+        profile_ids = affected_members(changes, (MEMBER,))
+        settings = changed_settings(changes)
+        reload = {}
+        try:
+            with DatabaseManager() as db:
+                if member_ids:
+                    if self.data_loader.is_loading("members"):
+                        reload["members"] = None
+                    else:
+                        ids = sorted(member_ids)
+                        rows = db.execute_query(
+                            f"{self.MEMBERS_QUERY} WHERE m.id IN ({', '.join('?' * len(ids))})", tuple(ids), fetch=True
+                        )
+                        inserted = self.members_model.update_members(rows, ids)
+                        # ترتیب ستون شماره با ویرایش ردیف‌ها عوض نمی‌شود؛ فقط ردیف تازه یا ستون داده نیاز به مرتب‌سازی دارد
+                        header = self.members_table.horizontalHeader()
+                        column = header.sortIndicatorSection()
+                        if inserted or column not in (0, MemberTableModel.EDIT_COLUMN):
+                            self.members_proxy.sort(column, header.sortIndicatorOrder())
+                if profile_ids:
+                    if self.data_loader.is_loading("member_index"):
+                        reload["member_index"] = None
+                    else:
+                        self.member_index.refresh(db, profile_ids)
+                if member_ids or "fund_balance" in settings:
+                    if self.data_loader.is_loading("report"):
+                        reload["report"] = None
+                    else:
+                        self.reports_tab.update_members(db, member_ids)
+                if settings & SHARE_SETTINGS:
+                    share_price = db.get_share_price()
+                    self.members_model.set_share_price(share_price)
+                    self.share_price_label.setText(f"💰 قیمت سهام: {format_persian_number(str(share_price))} تومان")
+        except Exception as e:
+            logging.error(f"خطا در به‌روزرسانی پس از تغییرات: {str(e)}")
+            reload.update(members=None, member_index=None, report=None)
+
+        # صفحه اول جدول‌های تراکنش و وام ارزان است؛ فقط اگر بازه فیلتر متأثر باشد دوباره خوانده می‌شود
+        if member_ids:
+            transactions_filter = self._transactions_filter()
+            years = changed_years(changes)
+            if profile_ids or years is None or any(
+                year_range(year)[0] <= transactions_filter[1] and year_range(year)[1] >= transactions_filter[0]
+                for year in years
+            ):
+                reload["transactions"] = transactions_filter
+        if member_ids or affected_members(changes, (LOANS,)):
+            reload["loans"] = self._loans_filter()
+        if reload:
+            self.data_loader.request(reload)
+
+    def _on_backup_finished(self, path):
+        self.statusBar().showMessage("💾 نسخه پشتیبان ذخیره شد", 5000)
+
+    def _on_backup_failed(self, error):
+        self.statusBar().showMessage(f"❌ خطا در پشتیبان‌گیری: {error}", 10000)
 
     def close_tab(self, index):
         if index < 4:
@@ -627,6 +625,7 @@ class MainWindow(QMainWindow):
                 del self.member_tabs[member_id]
                 break
         self.tabs.removeTab(index)
+        widget.deleteLater()
 
     def closeEvent(self, event):
         reply = QMessageBox.question(
@@ -635,6 +634,9 @@ class MainWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
+            self.data_loader.stop()
+            self.reports_tab.delinquency_worker.stop()
+            ChangeBus.instance().stop_log()
             event.accept()
         else:
             event.ignore()
@@ -8,11 +8,16 @@ from PyQt5.QtWidgets import (
     QComboBox, QFrame, QLineEdit, QStyledItemDelegate, 
     QMenu, QDialog, QFileDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QColor, QFont
 from core.database import DatabaseManager
-from core.config import AppConfig, BACKUP_DIR
-from core.utils import format_persian_number, get_persian_date, calculate_loan_capacity, validate_phone_number
+from core.config import AppConfig
+from core.utils import format_persian_number, get_persian_date, validate_phone_number, parse_amount
+from core.analytics import PortfolioEngine
+from core.dates import key_from_jalali, year_range
+from core.changes import member_changed, transactions_changed, affected_members, changed_settings, SHARE_SETTINGS
+from ui.workers import BackupWorker
+from ui.change_bus import ChangeBus
 import logging
 from datetime import datetime
 import os
@@ -32,8 +37,6 @@ class PersianNumberDelegate(QStyledItemDelegate):
         super().paint(painter, option, index)
 
 class MemberTab(QWidget):
-    update_parent_report = pyqtSignal()
-    update_parent_all = pyqtSignal()
     table_changed = False
 
     def __init__(self, member_id, parent=None):
@@ -47,6 +50,7 @@ class MemberTab(QWidget):
         self.auto_save_timer.start(30000)
         self.setup_ui()
         self.load_data()
+        ChangeBus.instance().changed.connect(self._on_changes)
 
     def setup_ui(self):
         main_layout = QHBoxLayout(self)
@@ -87,7 +91,12 @@ class MemberTab(QWidget):
                 border-radius: 4px;
             }
         """)
-        self.note_search.textChanged.connect(self.filter_notes)
+        # جستجوی متنی یادداشت‌ها فقط پس از مکث در تایپ اجرا می‌شود
+        self.note_search_timer = QTimer(self)
+        self.note_search_timer.setSingleShot(True)
+        self.note_search_timer.setInterval(AppConfig.SEARCH["debounce_ms"])
+        self.note_search_timer.timeout.connect(self.filter_notes)
+        self.note_search.textChanged.connect(self.note_search_timer.start)
         notes_header.addWidget(self.note_search)
 
         left_layout.addLayout(notes_header)
@@ -409,32 +418,7 @@ class MemberTab(QWidget):
     def load_data(self):
         try:
             with DatabaseManager() as db:
-                member = db.execute_query(
-                    "SELECT name, membership_code, phone, account_number, status FROM members WHERE id=?",
-                    (self.member_id,),
-                    fetch=True
-                )[0]
-                membership_amount = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='عضویت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                share_price = float(self.parent()._get_current_share_price())
-                shares = membership_amount / share_price if share_price > 0 else 0
-                shares_text = str(int(shares)) if shares.is_integer() else f"{shares:.2f}"
-
-                self.name_label.setText(f"👤 نام: {member[0]}")
-                self.code_label.setText(f"{member[1]}")
-                self.shares_label.setText(f"📊 سهام: {format_persian_number(shares_text)} واحد")
-                self.phone_label.setText(f"📞 تلفن: {member[2] or '-'}")
-                self.account_label.setText(f"💳 حساب: {member[3] or '-'}")
-
-                status_color = "#D32F2F" if member[4] == "غیرفعال" else "#388E3C"
-                self.name_label.setStyleSheet(f"font-family: 'B Nazanin'; font-size: 18px; font-weight: bold; color: {status_color};")
-
-                loan_capacity = calculate_loan_capacity(self.member_id)
-                self.loan_capacity_label.setText(f"🏦 وام قابل دریافت: {format_persian_number(str(loan_capacity))} تومان")
-
+                self.load_summary(db)
                 saved_year = db.get_setting(f"last_year_member_{self.member_id}", self.current_year)
                 self.year_combo.setCurrentText(saved_year)
                 self.load_transactions_for_year(saved_year)
@@ -445,29 +429,52 @@ class MemberTab(QWidget):
             logging.error(f"خطا در بارگذاری اطلاعات عضو {self.member_id}: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در بارگذاری اطلاعات:\n{str(e)}")
 
+    def load_summary(self, db):
+        """اطلاعات پایه، سهام و سقف وام عضو (بدون دست زدن به جدول ماهانه ویرایش‌نشده)"""
+        member = db.execute_query(
+            "SELECT name, membership_code, phone, account_number, status FROM members WHERE id=?",
+            (self.member_id,),
+            fetch=True
+        )[0]
+        # سهام و سقف وام با همان موتور و قیمت سهمی که فهرست اعضا و گزارش‌ها استفاده می‌کنند
+        engine = PortfolioEngine.load(db, member_ids=[self.member_id])
+        shares = float(engine.shares[0]) if len(engine) else 0.0
+        shares_text = str(int(shares)) if shares.is_integer() else f"{shares:.2f}"
+
+        self.name_label.setText(f"👤 نام: {member[0]}")
+        self.code_label.setText(f"{member[1]}")
+        self.shares_label.setText(f"📊 سهام: {format_persian_number(shares_text)} واحد")
+        self.phone_label.setText(f"📞 تلفن: {member[2] or '-'}")
+        self.account_label.setText(f"💳 حساب: {member[3] or '-'}")
+
+        status_color = "#D32F2F" if member[4] == "غیرفعال" else "#388E3C"
+        self.name_label.setStyleSheet(f"font-family: 'B Nazanin'; font-size: 18px; font-weight: bold; color: {status_color};")
+
+        loan_capacity = int(engine.capacity[0]) if len(engine) else 0
+        self.loan_capacity_label.setText(f"🏦 وام قابل دریافت: {format_persian_number(str(loan_capacity))} تومان")
+
+    def _on_changes(self, changes):
+        if self.member_id not in affected_members(changes) and not changed_settings(changes) & SHARE_SETTINGS:
+            return
+        try:
+            with DatabaseManager() as db:
+                self.load_summary(db)
+        except Exception as e:
+            logging.error(f"خطا در به‌روزرسانی اطلاعات عضو {self.member_id}: {str(e)}")
+
     def load_transactions_for_year(self, year):
         try:
             with DatabaseManager() as db:
                 self.transactions_table.blockSignals(True)
                 self.transactions_table.clearContents()
-                total_membership = total_loan = total_installment = 0.0
+                total_membership = total_loan = total_installment = 0
 
-                total_loan_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='وام'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_installment_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='پرداخت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_membership_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='عضویت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
+                totals = db.get_member_totals(self.member_id)
+                total_loan_all = totals['loan']
+                total_installment_all = totals['installment']
+                total_membership_all = totals['membership']
 
+                monthly = db.get_monthly_grid(self.member_id, year)
                 for row in range(12):
                     month = f"{year}/{str(row + 1).zfill(2)}"
                     date_item = QTableWidgetItem(month)
@@ -475,12 +482,7 @@ class MemberTab(QWidget):
                     self.transactions_table.setItem(row, 3, date_item)
 
                     for col, type_ in enumerate(["پرداخت", "وام", "عضویت"]):
-                        amount_result = db.execute_query(
-                            "SELECT SUM(amount) FROM transactions WHERE member_id=? AND date LIKE ? AND type=?",
-                            (self.member_id, f"{month}%", type_),
-                            fetch=True
-                        )
-                        amount = amount_result[0][0] if amount_result and amount_result[0][0] is not None else 0.0
+                        amount = monthly[row].get(type_, 0)
                         item = QTableWidgetItem(str(amount))
                         if col == 1 and amount > 0:
                             item.setForeground(QColor("#D32F2F"))
@@ -503,7 +505,7 @@ class MemberTab(QWidget):
                 if total_loan_all > 0 and total_loan_all == total_installment_all:
                     for row in range(11, -1, -1):
                         installment_item = self.transactions_table.item(row, 0)
-                        if installment_item and float(installment_item.text()) > 0:
+                        if installment_item and parse_amount(installment_item.text()) > 0:
                             installment_item.setBackground(QColor("#C8E6C9"))
                             break
 
@@ -516,58 +518,36 @@ class MemberTab(QWidget):
     def save_table_data(self):
         try:
             year = self.year_combo.currentText()
-            with DatabaseManager() as db:
-                db.execute_query("DELETE FROM transactions WHERE member_id=? AND date LIKE ?", (self.member_id, f"{year}/%"), fetch=False)
-                total_loan = total_installment = total_membership = 0.0
-                for row in range(12):
-                    month = f"{year}/{str(row + 1).zfill(2)}"
-                    for col, type_ in enumerate(["پرداخت", "وام", "عضویت"]):
-                        item = self.transactions_table.item(row, col)
-                        amount = float(item.text().replace('٬', '')) if item and item.text() else 0.0
-                        if amount:
-                            db.execute_query(
-                                "INSERT INTO transactions (member_id, date, amount, type, description) VALUES (?, ?, ?, ?, 'ثبت از تب عضو')",
-                                (self.member_id, f"{month}/01", amount, type_),
-                                fetch=False
-                            )
-                        if col == 1:
-                            total_loan += amount
-                        elif col == 0:
-                            total_installment += amount
-                        else:
-                            total_membership += amount
-
-                total_loan_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='وام'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_installment_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='پرداخت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_membership_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='عضویت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
+            grid = []
+            for row in range(12):
+                cells = {}
+                for col, type_ in enumerate(["پرداخت", "وام", "عضویت"]):
+                    item = self.transactions_table.item(row, col)
+                    cells[type_] = parse_amount(item.text()) if item else 0
+                grid.append(cells)
+
+            # فقط خانه‌های تغییرکرده به همراه تنظیمات در یک تراکنش (یک commit) ذخیره می‌شوند
+            with DatabaseManager() as db, db.batch():
+                db.save_monthly_grid(self.member_id, year, grid)
+
+                totals = db.get_member_totals(self.member_id)
+                total_loan_all = totals['loan']
+                total_installment_all = totals['installment']
+                total_membership_all = totals['membership']
 
                 balance = total_loan_all - total_installment_all
                 db.set_setting(f"balance_{self.member_id}_{year}", str(balance), f"مانده سال {year} برای عضو {self.member_id}")
                 db.set_setting(f"last_year_member_{self.member_id}", year, f"آخرین سال انتخاب‌شده برای عضو {self.member_id}")
-                backup_path = BACKUP_DIR / f"transactions_{self.member_id}_{year}.bak"
-                db.backup_db(str(backup_path))
+            BackupWorker.instance().request(f"transactions_{self.member_id}_{year}")
 
-                self.total_installment_label.setText(format_persian_number(str(total_installment_all)))
-                self.total_loan_label.setText(format_persian_number(str(total_loan_all)))
-                self.total_membership_label.setText(format_persian_number(str(total_membership_all)))
-                self.balance_label.setText(f"💰 مانده: {format_persian_number(str(balance))} تومان")
+            self.total_installment_label.setText(format_persian_number(str(total_installment_all)))
+            self.total_loan_label.setText(format_persian_number(str(total_loan_all)))
+            self.total_membership_label.setText(format_persian_number(str(total_membership_all)))
+            self.balance_label.setText(f"💰 مانده: {format_persian_number(str(balance))} تومان")
 
-                self.table_changed = False
-                self.update_parent_report.emit()
-                self.update_parent_all.emit()
-                QMessageBox.information(self, "✅ موفق", "تغییرات با موفقیت ذخیره شد!")
+            self.table_changed = False
+            ChangeBus.instance().publish(transactions_changed(self.member_id, year))
+            QMessageBox.information(self, "✅ موفق", "تغییرات با موفقیت ذخیره شد!")
             return True
         except Exception as e:
             logging.error(f"خطا در ذخیره اطلاعات تب عضو {self.member_id}: {str(e)}")
@@ -582,7 +562,7 @@ class MemberTab(QWidget):
             item = self.transactions_table.item(row, col)
             if not item:
                 return
-            value = float(item.text().replace('٬', '')) if item.text() else 0.0
+            value = parse_amount(item.text())
             if value < 0:
                 QMessageBox.warning(self, "⚠️ خطا", "مقدار نمی‌تواند منفی باشد!")
                 self.load_transactions_for_year(self.year_combo.currentText())
@@ -593,21 +573,10 @@ class MemberTab(QWidget):
             self.transactions_table.setItem(row, col, new_item)
 
             with DatabaseManager() as db:
-                total_loan_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='وام'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_installment_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='پرداخت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
-                total_membership_all = float(db.execute_query(
-                    "SELECT SUM(amount) FROM transactions WHERE member_id=? AND type='عضویت'",
-                    (self.member_id,),
-                    fetch=True
-                )[0][0] or 0)
+                totals = db.get_member_totals(self.member_id)
+                total_loan_all = totals['loan']
+                total_installment_all = totals['installment']
+                total_membership_all = totals['membership']
 
             self.total_installment_label.setText(format_persian_number(str(total_installment_all)))
             self.total_loan_label.setText(format_persian_number(str(total_loan_all)))
@@ -696,9 +665,9 @@ class MemberTab(QWidget):
             return
         try:
             with DatabaseManager() as db:
-                db.execute_query("UPDATE members SET phone=?, account_number=? WHERE id=?", (phone, account, self.member_id), fetch=False)
-                backup_path = BACKUP_DIR / f"member_{self.member_id}_{get_persian_date().replace('/', '_')}.bak"
-                db.backup_db(str(backup_path))
+                db.update_member(self.member_id, phone=phone, account_number=account)
+            BackupWorker.instance().request(f"member_{self.member_id}")
+            ChangeBus.instance().publish(member_changed(self.member_id))
             self.phone_label.setText(f"📞 تلفن: {phone or '-'}")
             self.account_label.setText(f"💳 حساب: {account or '-'}")
             dialog.accept()
@@ -713,8 +682,8 @@ class MemberTab(QWidget):
             year = self.year_combo.currentText()
             with DatabaseManager() as db:
                 notes = db.execute_query(
-                    "SELECT id, note, date, linked_cell FROM notes WHERE member_id=? AND date LIKE ? ORDER BY date DESC",
-                    (self.member_id, f"{year}/%"),
+                    "SELECT id, note, date, linked_cell FROM notes WHERE member_id=? AND date_key BETWEEN ? AND ? ORDER BY date_key DESC",
+                    (self.member_id, *year_range(year)),
                     fetch=True
                 )
                 self.notes_table.setRowCount(len(notes))
@@ -743,10 +712,20 @@ class MemberTab(QWidget):
             QMessageBox.critical(self, "❌ خطا", f"خطا در بارگذاری یادداشت‌ها:\n{str(e)}")
 
     def filter_notes(self):
-        search_text = self.note_search.text().lower()
+        search_text = self.note_search.text().strip()
+        if not search_text:
+            for row in range(self.notes_table.rowCount()):
+                self.notes_table.setRowHidden(row, False)
+            return
+        try:
+            with DatabaseManager() as db:
+                matched = set(db.search_notes(search_text, self.member_id))
+        except Exception as e:
+            logging.error(f"خطا در جستجوی یادداشت‌ها: {str(e)}")
+            return
         for row in range(self.notes_table.rowCount()):
-            note_text = self.notes_table.item(row, 1).text().lower()
-            self.notes_table.setRowHidden(row, search_text not in note_text)
+            note_id = self.notes_table.item(row, 1).data(Qt.UserRole)
+            self.notes_table.setRowHidden(row, note_id not in matched)
 
     def show_note_dialog(self):
         row = self.transactions_table.currentRow()
@@ -795,8 +774,8 @@ class MemberTab(QWidget):
             linked_cell = f"ردیف {row + 1} ({self.transactions_table.item(row, 3).text()})"
             with DatabaseManager() as db:
                 db.execute_query(
-                    "INSERT INTO notes (member_id, date, note, linked_cell) VALUES (?, ?, ?, ?)",
-                    (self.member_id, month, note_text.strip(), linked_cell),
+                    "INSERT INTO notes (member_id, date, date_key, note, linked_cell) VALUES (?, ?, ?, ?, ?)",
+                    (self.member_id, month, key_from_jalali(year, row + 1), note_text.strip(), linked_cell),
                     fetch=False
                 )
             QMessageBox.information(self, "✅ موفق", "یادداشت با موفقیت ثبت شد!")
@@ -904,7 +883,7 @@ class MemberTab(QWidget):
         if row + 1 < 12:
             new_item = QTableWidgetItem(value)
             if col == 1:
-                new_item.setForeground(QColor("#D32F2F" if float(value.replace('٬', '')) > 0 else "#388E3C"))
+                new_item.setForeground(QColor("#D32F2F" if parse_amount(value) > 0 else "#388E3C"))
             self.transactions_table.setItem(row + 1, col, new_item)
             self.update_balance(row + 1, col)
 
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""مدل‌های Qt برای فهرست‌های بزرگ؛ فقط ردیف‌های قابل مشاهده قالب‌بندی و رسم می‌شوند"""
+
+from abc import ABCMeta, abstractmethod
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QRectF, QPointF, pyqtSignal, QEvent
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+
+from core.database import DatabaseManager
+from core.ledger import PAGE_SIZE, PageKey, page_key
+from core.utils import format_persian_number, get_persian_date
+
+class MemberTableModel(QAbstractTableModel):
+    """فهرست اعضا با ذخیره ستونی؛ متن تاریخ و سهام هر ردیف هنگام اولین نمایش ساخته می‌شود
+
+    مرتب‌سازی با sorted پایتون روی ستون‌ها انجام می‌شود، نه با مقایسه‌های تکی data() در پروکسی.
+    """
+
+    HEADERS = [
+        "🔢 شماره", "👤 نام و نام خانوادگی", "📌 کد عضویت", "📱 تلفن",
+        "🏦 شماره حساب", "📅 تاریخ عضویت", "⚡ وضعیت", "📈 تعداد سهام", "✏️"
+    ]
+    EDIT_COLUMN = 8
+    _INACTIVE = QColor("#D32F2F")
+    _ACTIVE = QColor("#388E3C")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._set_columns(self.prepare([], 0))
+
+    @staticmethod
+    def _format_values(join_date, total: int, share_price: int) -> tuple:
+        shares = total / share_price if share_price > 0 else 0
+        return get_persian_date(join_date), format_persian_number(str(shares))
+
+    @classmethod
+    def prepare(cls, rows: Sequence[Sequence], share_price: int, preformat: bool = False) -> dict:
+        """ساخت ستون‌ها از ردیف‌ها بدون تماس با Qt؛ با preformat متن همه ردیف‌ها از پیش ساخته می‌شود
+
+        برای اجرا در رشته پس‌زمینه و تحویل نتیجه به set_prepared.
+        """
+        columns = list(zip(*rows)) if rows else [()] * 8
+        formatted: Dict[int, tuple] = {}
+        if preformat:
+            formatted = {
+                member_id: cls._format_values(join_date, total, share_price)
+                for member_id, join_date, total in zip(columns[0], columns[5], columns[7])
+            }
+        return {"columns": columns, "share_price": share_price, "formatted": formatted}
+
+    def _set_columns(self, prepared: dict) -> None:
+        columns = prepared["columns"]
+        self._ids = array("q", columns[0])
+        self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses = (
+            list(column) for column in columns[1:7]
+        )
+        self._totals = array("q", columns[7])
+        # ترتیب بارگذاری (تاریخ عضویت نزولی) برای ستون شماره
+        self._order = array("q", range(len(self._ids)))
+        self._share_price = prepared["share_price"]
+        self._formatted: Dict[int, tuple] = prepared["formatted"]
+
+    def set_members(self, rows: Sequence[Sequence], share_price: int) -> None:
+        """ردیف‌ها: (id, name, code, phone, account, join_date, status, membership_total)"""
+        self.set_prepared(self.prepare(rows, share_price))
+
+    def set_prepared(self, prepared: dict) -> None:
+        self.beginResetModel()
+        self._set_columns(prepared)
+        self.endResetModel()
+
+    def update_members(self, rows: Sequence[Sequence], member_ids: Iterable[int]) -> bool:
+        """به‌روزرسانی هدفمند: ردیف اعضای member_ids با rows جایگزین، اضافه یا (در صورت نبود) حذف می‌شود
+
+        ردیف تازه در جای خود در ترتیب بارگذاری (تاریخ عضویت نزولی) درج می‌شود؛ خروجی True یعنی ردیفی
+        اضافه شده و اگر مرتب‌سازی دیگری برقرار است باید دوباره اعمال شود.
+        """
+        found = {row[0]: row for row in rows}
+        inserted = False
+        for member_id in member_ids:
+            try:
+                position = self._ids.index(member_id)
+            except ValueError:
+                position = None
+            row = found.get(member_id)
+            self._formatted.pop(member_id, None)
+            if position is None and row is None:
+                continue
+            if position is None:
+                # رتبه ردیف تازه: پس از اعضای با تاریخ عضویت جدیدتر؛ رتبه بقیه یکی جلو می‌رود
+                join_date = row[5] or ""
+                position = sum(1 for value in self._join_dates if (value or "") > join_date)
+                self._order = array("q", (order + 1 if order >= position else order for order in self._order))
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._ids.insert(position, row[0])
+                for values, value in zip(
+                    (self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses), row[1:7]
+                ):
+                    values.insert(position, value)
+                self._totals.insert(position, row[7])
+                self._order.insert(position, position)
+                self.endInsertRows()
+                inserted = True
+            elif row is None:
+                self.beginRemoveRows(QModelIndex(), position, position)
+                for values in (
+                    self._ids, self._names, self._codes, self._phones, self._accounts,
+                    self._join_dates, self._statuses, self._totals, self._order
+                ):
+                    del values[position]
+                self.endRemoveRows()
+            else:
+                for values, value in zip(
+                    (self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses), row[1:7]
+                ):
+                    values[position] = value
+                self._totals[position] = row[7]
+                self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.HEADERS) - 1))
+        return inserted
+
+    def set_share_price(self, share_price: int) -> None:
+        """قیمت سهم جدید؛ فقط متن‌های قالب‌بندی‌شده دور ریخته و ستون سهام دوباره رسم می‌شود"""
+        if share_price == self._share_price:
+            return
+        self._share_price = share_price
+        self._formatted.clear()
+        if self._ids:
+            self.dataChanged.emit(self.index(0, 5), self.index(len(self._ids) - 1, 7))
+
+    def member_id(self, row: int) -> int:
+        return self._ids[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def _format(self, row: int) -> tuple:
+        member_id = self._ids[row]
+        formatted = self._formatted.get(member_id)
+        if formatted is None:
+            formatted = self._format_values(self._join_dates[row], self._totals[row], self._share_price)
+            self._formatted[member_id] = formatted
+        return formatted
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(row + 1)
+            if column == 1:
+                return self._names[row]
+            if column == 2:
+                return self._codes[row]
+            if column == 3:
+                return self._phones[row] or "-"
+            if column == 4:
+                return self._accounts[row] or "-"
+            if column == 5:
+                return self._format(row)[0]
+            if column == 6:
+                return self._statuses[row]
+            if column == 7:
+                return self._format(row)[1]
+            return None
+        if role == Qt.UserRole:
+            return self._ids[row]
+        if role == Qt.ForegroundRole and column == 6:
+            return self._INACTIVE if self._statuses[row] == "غیرفعال" else self._ACTIVE
+        return None
+
+    def _sort_key(self, column: int, rank: Optional[Dict[int, int]]):
+        if column in (0, self.EDIT_COLUMN):
+            if rank is not None:
+                return lambda row: (rank.get(self._ids[row], len(rank)), self._order[row])
+            return self._order.__getitem__
+        if column == 7:
+            return self._totals.__getitem__
+        values = (None, self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses)[column]
+        return lambda row: values[row] or ""
+
+    def sort(self, column: int, order=Qt.AscendingOrder, rank: Optional[Dict[int, int]] = None) -> None:
+        """مرتب‌سازی ستون‌ها؛ برای ستون شماره، rank (شناسه ← رتبه جستجو) بر ترتیب بارگذاری مقدم است"""
+        permutation = sorted(
+            range(len(self._ids)), key=self._sort_key(column, rank), reverse=order == Qt.DescendingOrder
+        )
+        self.layoutAboutToBeChanged.emit()
+        self._ids, self._totals, self._order = (
+            array("q", (values[i] for i in permutation)) for values in (self._ids, self._totals, self._order)
+        )
+        self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses = (
+            [values[i] for i in permutation]
+            for values in (self._names, self._codes, self._phones, self._accounts, self._join_dates, self._statuses)
+        )
+        new_rows = array("q", [0]) * len(permutation)
+        for new_row, old_row in enumerate(permutation):
+            new_rows[old_row] = new_row
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_rows[index.row()], index.column()) for index in persistent]
+        )
+        self.layoutChanged.emit()
+
+class MemberFilterProxy(QSortFilterProxyModel):
+    """محدود کردن فهرست به نتایج جستجو؛ مرتب‌سازی به مدل اصلی سپرده می‌شود"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rank: Optional[Dict[int, int]] = None
+
+    def set_ranking(self, member_ids: Optional[Iterable[int]]) -> None:
+        """فقط اعضای داده‌شده نمایش داده می‌شوند؛ None یعنی همه اعضا"""
+        self._rank = None if member_ids is None else {member_id: i for i, member_id in enumerate(member_ids)}
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        if self._rank is None:
+            return True
+        return self.sourceModel().member_id(source_row) in self._rank
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # پروکسی ترتیب مدل اصلی را حفظ می‌کند (sortColumn == -1)
+        self.sourceModel().sort(column, order, self._rank)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # شماره ردیف همیشه ترتیب نمایش فعلی است
+        if role == Qt.DisplayRole and index.isValid() and index.column() == 0:
+            return str(index.row() + 1)
+        return super().data(index, role)
+
+class _ModelABCMeta(type(QAbstractTableModel), ABCMeta):
+    """متاکلاس مشترک Qt و ABC؛ ساختن مدلی که متدهای abstractmethod را تعریف نکرده خطا می‌دهد"""
+
+class KeysetTableModel(QAbstractTableModel, metaclass=_ModelABCMeta):
+    """جدول فقط‌خواندنی که صفحه به صفحه (canFetchMore/fetchMore) با صفحه‌بندی کلیدی پر می‌شود
+
+    فقط صفحه‌هایی که کاربر تا آن‌ها پیمایش کرده خوانده و قالب‌بندی می‌شوند؛ تعداد کل ردیف‌ها
+    با یک COUNT جداگانه به دست می‌آید. زیرکلاس‌ها HEADERS، _fetch، _count و _format_row را تعریف می‌کنند.
+    """
+    # (تعداد بارگذاری‌شده، تعداد کل)
+    count_changed = pyqtSignal(int, int)
+    HEADERS: List[str] = []
+
+    def __init__(self, parent=None, page_size: int = PAGE_SIZE):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.total = 0
+        self._filter: tuple = ()
+        self._cells: List[tuple] = []
+        self._colors: List[Dict[int, QColor]] = []
+        self._after: Optional[PageKey] = None
+        self._exhausted = True
+
+    @abstractmethod
+    def _fetch(self, db: DatabaseManager, filters: tuple, after: Optional[PageKey], limit: int) -> List[tuple]:
+        """یک صفحه ردیف بعد از کلید after"""
+
+    @abstractmethod
+    def _count(self, db: DatabaseManager, filters: tuple) -> int:
+        """تعداد کل ردیف‌های فیلتر"""
+
+    @abstractmethod
+    def _format_row(self, row: tuple) -> Tuple[tuple, Dict[int, QColor]]:
+        """متن ستون‌های 1 به بعد و رنگ ستون‌ها برای یک ردیف دیتابیس"""
+
+    def prepare(self, db: DatabaseManager, *filters) -> dict:
+        """شمارش کل و صفحه اول قالب‌بندی‌شده برای یک فیلتر؛ به وضعیت مدل دست نمی‌زند
+
+        برای اجرا در رشته پس‌زمینه و تحویل نتیجه به set_prepared.
+        """
+        rows = self._fetch(db, filters, None, self.page_size)
+        formatted = [self._format_row(row) for row in rows]
+        return {
+            "filter": filters,
+            "total": self._count(db, filters),
+            "cells": [cells for cells, _ in formatted],
+            "colors": [colors for _, colors in formatted],
+            "after": page_key(rows[-1]) if rows else None,
+            "exhausted": len(rows) < self.page_size,
+        }
+
+    def set_filter(self, *filters) -> None:
+        """خواندن دوباره از ابتدا با فیلتر جدید"""
+        with DatabaseManager() as db:
+            prepared = self.prepare(db, *filters)
+        self.set_prepared(prepared)
+
+    def set_prepared(self, prepared: dict) -> None:
+        self.beginResetModel()
+        self._filter = prepared["filter"]
+        self.total = prepared["total"]
+        self._cells, self._colors = prepared["cells"], prepared["colors"]
+        self._after, self._exhausted = prepared["after"], prepared["exhausted"]
+        self.endResetModel()
+        self.count_changed.emit(len(self._cells), self.total)
+
+    def _append(self, rows: List[tuple]) -> None:
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            self._after = page_key(rows[-1])
+        for row in rows:
+            cells, colors = self._format_row(row)
+            self._cells.append(cells)
+            self._colors.append(colors)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+        with DatabaseManager() as db:
+            rows = self._fetch(db, self._filter, self._after, self.page_size)
+        if not rows:
+            self._exhausted = True
+            return
+        first = len(self._cells)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._append(rows)
+        self.endInsertRows()
+        self.count_changed.emit(len(self._cells), self.total)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._cells)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            return str(row + 1) if column == 0 else self._cells[row][column - 1]
+        if role == Qt.ForegroundRole:
+            return self._colors[row].get(column)
+        return None
+
+class TransactionTableModel(KeysetTableModel):
+    """تراکنش‌های یک بازه تاریخ (و نوع) به ترتیب تاریخ نزولی؛ فیلتر: (start_key, end_key, tx_type)"""
+
+    HEADERS = ["🔢 شماره", "📅 تاریخ", "👤 عضو", "💰 مبلغ", "📋 نوع", "📝 توضیحات"]
+    _TYPE_COLORS = {"عضویت": QColor("#388E3C"), "پرداخت": QColor("#1976D2"), "وام": QColor("#D32F2F")}
+
+    def _fetch(self, db, filters, after, limit):
+        return db.get_transactions_page(*filters, after=after, limit=limit)
+
+    def _count(self, db, filters):
+        return db.count_transactions(*filters)
+
+    def _format_row(self, row):
+        _, date, name, amount, tx_type, description, _ = row
+        cells = (get_persian_date(date), name, format_persian_number(str(amount or 0)), tx_type, description or "-")
+        color = self._TYPE_COLORS.get(tx_type)
+        return cells, {3: color} if color is not None else {}
+
+class LoanTableModel(KeysetTableModel):
+    """وام‌های اعطاشده در یک بازه تاریخ (و وضعیت) به ترتیب تاریخ اعطای نزولی؛ فیلتر: (start_key, end_key, status)"""
+
+    HEADERS = [
+        "🔢 شماره", "👤 عضو", "💰 مبلغ", "📅 تاریخ اعطا", "📅 تاریخ تسویه",
+        "📋 تعداد اقساط", "💵 قسط ماهانه", "⚡ وضعیت"
+    ]
+    _ACTIVE = QColor("#1976D2")
+    _SETTLED = QColor("#388E3C")
+
+    def _fetch(self, db, filters, after, limit):
+        return db.get_loans_page(*filters, after=after, limit=limit)
+
+    def _count(self, db, filters):
+        return db.count_loans(*filters)
+
+    def _format_row(self, row):
+        _, name, amount, start_date, end_date, installments, monthly_payment, status, _ = row
+        cells = (
+            name, format_persian_number(str(amount or 0)), get_persian_date(start_date),
+            get_persian_date(end_date) if end_date else "-", str(installments),
+            format_persian_number(str(monthly_payment or 0)), status
+        )
+        return cells, {7: self._ACTIVE if status == "فعال" else self._SETTLED}
+
+class ButtonDelegate(QStyledItemDelegate):
+    """رسم یک دکمه کوچک در سلول به جای ساختن QPushButton برای هر ردیف"""
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, text: str, color: str = "#0288D1", hover_color: str = "#0277BD", parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.color = QColor(color)
+        self.hover_color = QColor(hover_color)
+
+    def _button_rect(self, rect) -> QRectF:
+        size = min(rect.width(), rect.height()) - 4
+        return QRectF(rect.center().x() - size / 2 + 1, rect.center().y() - size / 2 + 1, size, size)
+
+    def paint(self, painter, option, index):
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.hover_color if option.state & QStyle.State_MouseOver else self.color)
+        button = self._button_rect(option.rect)
+        painter.drawRoundedRect(button, 3, 3)
+        painter.setPen(Qt.white)
+        painter.drawText(button, Qt.AlignCenter, self.text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() == QEvent.MouseButtonRelease and self._button_rect(option.rect).contains(QPointF(event.pos())):
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
\ No newline at end of file
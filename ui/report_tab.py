@@ -3,8 +3,14 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget, QTre
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QColor
 from core.database import DatabaseManager
-from core.utils import format_persian_number, get_persian_date
+from core.utils import format_persian_number, get_persian_date, parse_amount
+from core.report import ReportRow, ReportSnapshot
+from core.dates import format_key
+from core.changes import setting_changed
+from ui.workers import DelinquencyWorker
+from ui.change_bus import ChangeBus
 import logging
+from functools import lru_cache
 
 class FundBalanceDialog(QDialog):
     def __init__(self, parent=None):
@@ -96,7 +102,7 @@ class FundBalanceDialog(QDialog):
                 for bank, amount in balances:
                     item = QTreeWidgetItem(self.table)
                     item.setText(0, bank)
-                    item.setText(1, format_persian_number(str(amount)))  # عدد اعشاری هم نگه می‌داره
+                    item.setText(1, format_persian_number(str(amount)))
                     item.setFlags(item.flags() | Qt.ItemIsEditable)
         except Exception as e:
             logging.error(f"خطا در بارگذاری موجودی‌های صندوق: {str(e)}")
@@ -121,41 +127,102 @@ class FundBalanceDialog(QDialog):
         for i in range(self.table.topLevelItemCount()):
             item = self.table.topLevelItem(i)
             bank = item.text(0).strip()
-            amount_text = item.text(1).strip().replace('٬', '')
+            amount_text = item.text(1).strip()
             if not bank or not amount_text:
                 QMessageBox.warning(self, "⚠️ خطا", "نام بانک و مبلغ نمی‌توانند خالی باشند!")
                 return
             try:
-                amount = float(amount_text)
+                amount = parse_amount(amount_text)
                 total += amount
                 balances.append((bank, amount))
             except ValueError:
                 QMessageBox.warning(self, "⚠️ خطا", "مبلغ باید عدد باشد!")
                 return
         try:
-            with DatabaseManager() as db:
-                db.execute_query("DROP TABLE IF EXISTS fund_balances")
-                db.execute_query("""
-                    CREATE TABLE IF NOT EXISTS fund_balances (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        bank_name TEXT NOT NULL,
-                        amount REAL NOT NULL
-                    )
-                """)
-                for bank, amount in balances:
-                    db.execute_query("INSERT INTO fund_balances (bank_name, amount) VALUES (?, ?)", (bank, amount))
+            with DatabaseManager() as db, db.batch():
+                db.execute_query("DELETE FROM fund_balances")
+                db.execute_many("INSERT INTO fund_balances (bank_name, amount) VALUES (?, ?)", balances)
                 db.set_setting("fund_balance", str(total), "موجودی صندوق")
+            ChangeBus.instance().publish(setting_changed("fund_balance"))
             QMessageBox.information(self, "✅ موفق", f"موجودی صندوق: {format_persian_number(str(total))} تومان")
-            self.parent.load_data()
             self.accept()
         except Exception as e:
             logging.error(f"خطا در ذخیره موجودی صندوق: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در ذخیره:\n{str(e)}")
 
+class DelinquencyDialog(QDialog):
+    """فهرست اعضای دارای قسط معوق به ترتیب روزهای تأخیر و مبلغ"""
+    def __init__(self, records, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("⏰ اقساط معوق")
+        self.setMinimumSize(800, 500)
+        self.setStyleSheet("background: #F5F5F5; border-radius: 8px;")
+        self.parent = parent
+        self.init_ui(records)
+
+    def init_ui(self, records):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        total = sum(record.amount for record in records)
+        summary = QLabel(
+            f"👥 {format_persian_number(len(records))} عضو   "
+            f"⚠️ جمع معوقات: {format_persian_number(total, with_currency=True)}"
+        )
+        summary.setStyleSheet("font-family: 'B Nazanin'; font-size: 16px; font-weight: bold; color: #D32F2F;")
+        layout.addWidget(summary)
+
+        self.table = QTreeWidget()
+        self.table.setHeaderLabels([
+            "🔢 رتبه", "👤 نام عضو", "📌 کد عضویت", "📞 تلفن", "🏦 وام", "📄 قسط معوق",
+            "💵 مبلغ معوق", "📅 قدیمی‌ترین سررسید", "⏳ روز تأخیر"
+        ])
+        self.table.header().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setStyleSheet("""
+            QTreeWidget {
+                font-family: 'B Nazanin';
+                font-size: 14px;
+                border: 1px solid #E0E0E0;
+            }
+            QHeaderView::section {
+                background-color: #D32F2F;
+                color: white;
+                padding: 5px;
+            }
+        """)
+        items = []
+        for rank, record in enumerate(records, 1):
+            item = QTreeWidgetItem([
+                format_persian_number(rank),
+                record.name,
+                record.membership_code,
+                record.phone or "-",
+                format_persian_number(record.loans),
+                format_persian_number(record.installments),
+                format_persian_number(record.amount),
+                format_key(record.oldest_due_key),
+                format_persian_number(record.days_late)
+            ])
+            item.setData(0, Qt.UserRole, record.member_id)
+            items.append(item)
+        self.table.addTopLevelItems(items)
+        self.table.itemDoubleClicked.connect(self._on_member_double_clicked)
+        layout.addWidget(self.table)
+
+    def _on_member_double_clicked(self, item, column):
+        if hasattr(self.parent, '_on_member_double_clicked'):
+            self.parent._on_member_double_clicked(item, column)
+
 class ReportTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.delinquency_worker = DelinquencyWorker(self)
+        self.delinquency_worker.scan_finished.connect(self._on_delinquency_finished)
+        self.delinquency_worker.scan_failed.connect(self._on_delinquency_failed)
+        self._member_items = {}
+        self._snapshot = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -232,6 +299,20 @@ class ReportTab(QWidget):
             QPushButton:hover { background: #0277BD; }
         """)
         fund_btn.clicked.connect(self.show_fund_balance)
+        self.delinquency_btn = QPushButton("⏰ اقساط معوق")
+        self.delinquency_btn.setStyleSheet("""
+            QPushButton {
+                background: #D32F2F;
+                color: white;
+                font-family: 'B Nazanin';
+                font-size: 14px;
+                padding: 8px;
+                border-radius: 4px;
+            }
+            QPushButton:hover { background: #C62828; }
+            QPushButton:disabled { background: #BDBDBD; }
+        """)
+        self.delinquency_btn.clicked.connect(self.show_delinquency)
         refresh_btn = QPushButton("🔄 بروزرسانی")
         refresh_btn.setStyleSheet("""
             QPushButton {
@@ -247,56 +328,84 @@ class ReportTab(QWidget):
         refresh_btn.clicked.connect(self.load_data)
         buttons_layout.addStretch()
         buttons_layout.addWidget(fund_btn)
+        buttons_layout.addWidget(self.delinquency_btn)
         buttons_layout.addWidget(refresh_btn)
         summary_layout.addLayout(buttons_layout)
 
         layout.addWidget(summary_frame)
 
+    @staticmethod
+    def fetch_report(db: DatabaseManager) -> dict:
+        """ساخت تصویر گزارش و متن ردیف‌ها بدون تماس با ویجت‌ها (قابل اجرا در رشته پس‌زمینه)"""
+        snapshot = ReportSnapshot.load(db)
+        # مبالغ بسیار تکراری‌اند (صفر، مبالغ گرد عضویت)؛ هر مقدار یک بار قالب‌بندی می‌شود
+        formatter = lru_cache(maxsize=None)(format_persian_number)
+        return {
+            "snapshot": snapshot,
+            "members": [
+                (row.member_id, [str(idx)] + ReportTab._member_texts(row, formatter))
+                for idx, row in enumerate(snapshot.rows.values(), 1)
+            ],
+            "fund_balance": db.get_setting("fund_balance", 0, parse_amount),
+        }
+
+    @staticmethod
+    def _member_texts(row: ReportRow, formatter=format_persian_number) -> list:
+        return [row.name, row.code, formatter(row.assets), formatter(row.debt), formatter(row.installments)]
+
+    def show_report(self, report: dict) -> None:
+        """نمایش نتیجه fetch_report؛ تصویر گزارش برای به‌روزرسانی‌های بعدی نگه داشته می‌شود"""
+        items = []
+        self._member_items = {}
+        for member_id, texts in report["members"]:
+            item = QTreeWidgetItem(texts)
+            item.setData(0, Qt.UserRole, member_id)  # ذخیره member_id برای دابل‌کلیک
+            items.append(item)
+            self._member_items[member_id] = item
+        self.members_table.clear()
+        self.members_table.addTopLevelItems(items)
+        self._snapshot = report["snapshot"]
+        self.show_totals(self._snapshot.totals(report["fund_balance"]))
+
+    def update_members(self, db: DatabaseManager, member_ids) -> None:
+        """به‌روزرسانی هدفمند ردیف اعضای تغییرکرده؛ جمع‌ها با اختلاف همین ردیف‌ها به‌روز می‌شوند"""
+        if self._snapshot is None:
+            return
+        changed, removed = self._snapshot.apply(db, member_ids)
+        for member_id in removed:
+            item = self._member_items.pop(member_id, None)
+            if item is not None:
+                self.members_table.takeTopLevelItem(self.members_table.indexOfTopLevelItem(item))
+        for row in changed:
+            texts = self._member_texts(row)
+            item = self._member_items.get(row.member_id)
+            if item is None:
+                # ردیف‌ها به ترتیب شناسه‌اند؛ عضو جدید در انتها
+                item = QTreeWidgetItem([str(self.members_table.topLevelItemCount() + 1)] + texts)
+                item.setData(0, Qt.UserRole, row.member_id)
+                self.members_table.addTopLevelItem(item)
+                self._member_items[row.member_id] = item
+            else:
+                for column, text in enumerate(texts, 1):
+                    item.setText(column, text)
+        self.show_totals(self._snapshot.totals(db.get_setting("fund_balance", 0, parse_amount)))
+
+    def show_totals(self, report: dict) -> None:
+        self.total_assets_label.setText(f"📊 کل موجودی اعضا: {format_persian_number(str(report['assets']))} تومان")
+        self.total_loans_label.setText(f"🏦 کل وام پرداختی: {format_persian_number(str(report['loans']))} تومان")
+        self.total_installments_label.setText(f"💵 اقساط پرداخت‌شده: {format_persian_number(str(report['installments']))} تومان")
+        self.total_debt_label.setText(f"⚠️ مانده قابل پرداخت: {format_persian_number(str(report['debt']))} تومان")
+        self.balance_diff_label.setText(f"🔄 اختلاف حساب: {format_persian_number(str(report['balance_diff']))} تومان")
+        self.fund_balance_label.setText(f"💰 موجودی صندوق: {format_persian_number(str(report['fund_balance']))} تومان")
+
     def load_data(self):
+        # در پنجره اصلی گزارش همراه بقیه داده‌ها در پس‌زمینه بارگذاری می‌شود
+        if hasattr(self.parent, 'update_all'):
+            self.parent.update_all.emit()
+            return
         try:
             with DatabaseManager() as db:
-                members = db.execute_query("SELECT id, name, membership_code FROM members", fetch=True)
-                self.members_table.clear()
-                total_assets = total_loans = total_installments = 0
-
-                for idx, (member_id, name, code) in enumerate(members, 1):
-                    assets = float(db.execute_query(
-                        "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type='عضویت'",
-                        (member_id,), fetch=True)[0][0])
-                    loans = float(db.execute_query(
-                        "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type='وام'",
-                        (member_id,), fetch=True)[0][0])
-                    installments = float(db.execute_query(
-                        "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE member_id=? AND type='پرداخت'",
-                        (member_id,), fetch=True)[0][0])
-                    debt = max(0, loans - installments)
-
-                    item = QTreeWidgetItem(self.members_table)
-                    item.setText(0, str(idx))
-                    item.setText(1, name)
-                    item.setText(2, code)
-                    item.setText(3, format_persian_number(str(assets)))
-                    item.setText(4, format_persian_number(str(debt)))
-                    item.setText(5, format_persian_number(str(installments)))
-                    item.setData(0, Qt.UserRole, member_id)  # ذخیره member_id برای دابل‌کلیک
-
-                    total_assets += assets
-                    total_loans += loans
-                    total_installments += installments
-
-                total_debt = total_loans - total_installments
-                fund_balance = float(db.get_setting("fund_balance", "0"))
-                balance_diff = total_debt - total_assets - fund_balance  # اصلاح منطق
-
-                self.total_assets_label.setText(f"📊 کل موجودی اعضا: {format_persian_number(str(total_assets))} تومان")
-                self.total_loans_label.setText(f"🏦 کل وام پرداختی: {format_persian_number(str(total_loans))} تومان")
-                self.total_installments_label.setText(f"💵 اقساط پرداخت‌شده: {format_persian_number(str(total_installments))} تومان")
-                self.total_debt_label.setText(f"⚠️ مانده قابل پرداخت: {format_persian_number(str(total_debt))} تومان")
-                self.balance_diff_label.setText(f"🔄 اختلاف حساب: {format_persian_number(str(balance_diff))} تومان")
-                self.fund_balance_label.setText(f"💰 موجودی صندوق: {format_persian_number(str(fund_balance))} تومان")
-
-                if hasattr(self.parent, 'update_all'):
-                    self.parent.update_all.emit()
+                self.show_report(self.fetch_report(db))
         except Exception as e:
             logging.error(f"خطا در بارگذاری گزارشات: {str(e)}")
             QMessageBox.critical(self, "❌ خطا", f"خطا در بارگذاری گزارشات:\n{str(e)}")
@@ -308,4 +417,26 @@ class ReportTab(QWidget):
 
     def show_fund_balance(self):
         dialog = FundBalanceDialog(self)
-        dialog.exec_()
\ No newline at end of file
+        dialog.exec_()
+
+    def show_delinquency(self):
+        """بررسی اقساط معوق در پس‌زمینه؛ نتیجه پس از پایان در پنجره جدا نمایش داده می‌شود"""
+        if self.delinquency_worker.start():
+            self.delinquency_btn.setEnabled(False)
+            self.delinquency_btn.setText("⏳ در حال بررسی...")
+
+    def _reset_delinquency_button(self):
+        self.delinquency_btn.setEnabled(True)
+        self.delinquency_btn.setText("⏰ اقساط معوق")
+
+    def _on_delinquency_finished(self, records):
+        self._reset_delinquency_button()
+        if not records:
+            QMessageBox.information(self, "✅ اقساط معوق", "هیچ قسط معوقی وجود ندارد.")
+            return
+        dialog = DelinquencyDialog(records, self)
+        dialog.exec_()
+
+    def _on_delinquency_failed(self, error):
+        self._reset_delinquency_button()
+        QMessageBox.critical(self, "❌ خطا", f"خطا در بررسی اقساط معوق:\n{error}")
\ No newline at end of file
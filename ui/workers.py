@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""کارگرهای پس‌زمینه برای کارهای طولانی که نباید حلقه رویداد Qt را متوقف کنند"""
+
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.database import DatabaseManager
+from core.delinquency import scan_delinquency
+
+logger = logging.getLogger(__name__)
+
+class BackupWorker(QObject):
+    """رشته اختصاصی پشتیبان‌گیری با صف درخواست و ادغام درخواست‌های پشت سر هم
+
+    درخواست‌هایی که در فاصله debounce ثانیه از هم برسند یک نسخه پشتیبان می‌شوند؛
+    سقف max_files هم در همین رشته اعمال می‌شود.
+    """
+    backup_finished = pyqtSignal(str)
+    backup_failed = pyqtSignal(str)
+
+    _instance: Optional["BackupWorker"] = None
+
+    def __init__(self, debounce: float = 2.0, parent=None):
+        super().__init__(parent)
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._last_request = 0.0
+        self._busy = False
+        self._flush = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="backup-worker", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> "BackupWorker":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def shutdown(cls, timeout: float = 30.0) -> None:
+        """اجرای درخواست‌های باقی‌مانده و توقف رشته (هنگام خروج از برنامه)"""
+        if cls._instance is not None:
+            cls._instance.stop(timeout)
+            cls._instance = None
+
+    def request(self, label: str = "backup") -> None:
+        """ثبت درخواست پشتیبان؛ فوراً برمی‌گردد"""
+        with self._cond:
+            self._pending.append(label)
+            self._last_request = time.monotonic()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """اجرای فوری درخواست‌های در صف و انتظار تا پایان آن‌ها"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush = True
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._flush = False
+            return not (self._pending or self._busy)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next_job(self) -> Optional[List[str]]:
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            # صبر تا آرام شدن درخواست‌ها؛ ده ذخیره پشت سر هم فقط یک پشتیبان تولید می‌کند
+            while self._running and not self._flush:
+                remaining = self._last_request + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            labels, self._pending = self._pending, []
+            self._busy = True
+            return labels
+
+    def _run(self) -> None:
+        while True:
+            labels = self._next_job()
+            if labels is None:
+                return
+            label = labels[-1] if len(set(labels)) == 1 else "batch"
+            try:
+                with DatabaseManager() as db:
+                    path = db.snapshot(label)
+                if len(labels) > 1:
+                    logger.info(f"{len(labels)} درخواست پشتیبان در یک نسخه ادغام شد")
+                self.backup_finished.emit(path)
+            except Exception as e:
+                logger.error(f"خطا در پشتیبان‌گیری پس‌زمینه: {str(e)}")
+                self.backup_failed.emit(str(e))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+class DelinquencyWorker(QObject):
+    """رشته اختصاصی بررسی اقساط معوق کل صندوق با یک اتصال ماندگار؛ در هر لحظه فقط یک اجرا"""
+    scan_finished = pyqtSignal(list)
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        # تاریخ مبنای درخواست در صف (None یعنی امروز)
+        self._pending: List[Optional[int]] = []
+        self._busy = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="delinquency-worker", daemon=True)
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        with self._cond:
+            return self._busy or bool(self._pending)
+
+    def start(self, as_of_key: Optional[int] = None) -> bool:
+        """شروع بررسی؛ اگر اجرای قبلی هنوز تمام نشده باشد False برمی‌گردد"""
+        with self._cond:
+            if not self._running or self._busy or self._pending:
+                return False
+            self._pending.append(as_of_key)
+            self._cond.notify_all()
+            return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next_job(self) -> Optional[Tuple[Optional[int]]]:
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return None
+            self._busy = True
+            return (self._pending.pop(),)
+
+    def _run(self) -> None:
+        with DatabaseManager() as db:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                try:
+                    self.scan_finished.emit(scan_delinquency(db, as_of_key=job[0]))
+                except Exception as e:
+                    logger.error(f"خطا در بررسی اقساط معوق: {str(e)}")
+                    self.scan_failed.emit(str(e))
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+
+class DataLoader(QObject):
+    """بارگذاری بخش‌های داده پنجره اصلی در یک رشته با اتصال خواندنی خودش
+
+    هر بخش (مثلاً اعضا یا گزارش) یک تابع fetch(db, args) دارد که داده را می‌خواند و قالب‌بندی می‌کند.
+    درخواست تازه برای یک بخش، نسخه (generation) آن را بالا می‌برد: درخواست‌های در صف ادغام می‌شوند،
+    کوئری در حال اجرای همان بخش قطع (interrupt) می‌شود و نتیجه کهنه هرگز تحویل داده نمی‌شود.
+    """
+    # (بخش، نسخه، داده)
+    loaded = pyqtSignal(str, int, object)
+    # (بخش، پیام خطا)
+    failed = pyqtSignal(str, str)
+    idle = pyqtSignal()
+
+    def __init__(self, fetchers: Dict[str, Callable[[DatabaseManager, Any], Any]], parent=None):
+        super().__init__(parent)
+        # ترتیب بخش‌ها ترتیب اجرا در هر دور است
+        self._fetchers = dict(fetchers)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Any] = {}
+        self._generations: Dict[str, int] = {part: 0 for part in self._fetchers}
+        self._current: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="data-loader", daemon=True)
+        self._thread.start()
+
+    def request(self, parts: Dict[str, Any]) -> None:
+        """زمان‌بندی بارگذاری بخش‌ها با آرگومان‌هایشان؛ بارگذاری‌های قبلی همان بخش‌ها لغو می‌شوند"""
+        with self._cond:
+            for part, args in parts.items():
+                self._generations[part] += 1
+                self._pending[part] = args
+            if self._current in parts and self._conn is not None:
+                self._conn.interrupt()
+            self._cond.notify_all()
+
+    def is_current(self, part: str, generation: int) -> bool:
+        """آیا نتیجه این نسخه هنوز جدیدترین درخواست بخش است"""
+        with self._cond:
+            return self._generations[part] == generation and part not in self._pending
+
+    def is_loading(self, part: str) -> bool:
+        """آیا بارگذاری این بخش در صف یا در حال اجراست"""
+        with self._cond:
+            return part in self._pending or self._current == part
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._current is not None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """انتظار تا خالی شدن صف (مثلاً پیش از خروج)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            if self._conn is not None and self._current is not None:
+                self._conn.interrupt()
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next_job(self):
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return None
+            part = next(part for part in self._fetchers if part in self._pending)
+            self._current = part
+            return part, self._pending.pop(part), self._generations[part]
+
+    def _run(self) -> None:
+        with DatabaseManager() as db:
+            self._conn = db.conn
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                part, args, generation = job
+                try:
+                    result = self._fetchers[part](db, args)
+                except sqlite3.OperationalError as e:
+                    if "interrupted" in str(e):
+                        logger.debug(f"بارگذاری {part} لغو شد")
+                        self._requeue_if_current(part, args, generation)
+                    else:
+                        logger.error(f"خطا در بارگذاری {part}: {str(e)}")
+                        self.failed.emit(part, str(e))
+                except Exception as e:
+                    logger.error(f"خطا در بارگذاری {part}: {str(e)}")
+                    self.failed.emit(part, str(e))
+                else:
+                    if self.is_current(part, generation):
+                        self.loaded.emit(part, generation, result)
+                with self._cond:
+                    self._current = None
+                    finished = not self._pending
+                    self._cond.notify_all()
+                if finished:
+                    self.idle.emit()
+
+    def _requeue_if_current(self, part: str, args: Any, generation: int) -> None:
+        # قطع کوئری ممکن است به بخش بعدی برسد؛ اگر درخواست تازه‌تری نیامده، دوباره اجرا می‌شود
+        with self._cond:
+            if self._generations[part] == generation and part not in self._pending:
+                self._pending[part] = args
+                self._cond.notify_all()
\ No newline at end of file